@@ -0,0 +1,72 @@
+"""Report how the conversions in `modules.convert` scale with the number of eruptions.
+
+For each size, the time of each conversion is printed together with its peak memory,
+as measured by `tracemalloc`, in units of the size of its output arrays. The random
+numbers are drawn as float64 before they are cast to float32, which accounts for the
+extra memory of the conversions that draw random numbers. `totalemission_to_vei` keeps
+the float64 logarithm of the float32 emissions to give the same VEI as before, and
+returns int8.
+
+Run with
+
+    python benchmarks/bench_convert.py --max-size 10000000
+"""
+
+import time
+import tracemalloc
+from functools import partial
+from typing import Callable
+
+import click
+import numpy as np
+from volcano_cooking.modules import convert
+
+
+def _measure(func: Callable[[], object], out_bytes: int) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / out_bytes
+
+
+@click.command()
+@click.option("--max-size", type=int, default=10**7, show_default=True)
+def main(max_size: int) -> None:
+    """Time the conversions for sizes from 1000 up to `max-size` eruptions."""
+    print("size        function                    time (s)  ns/eruption  peak/output")
+    n = 1000
+    while n <= max_size:
+        rng = np.random.default_rng(0)
+        veis = rng.integers(0, 7, n).astype(np.int8)
+        tes = convert.vei_to_totalemission(veis, rng=rng)
+        miihs, mxihs = rng.uniform(0, 30, (2, n)).astype(np.float32)
+        cases: dict[str, tuple[Callable[[], object], int]] = {
+            "vei_to_totalemission": (
+                partial(convert.vei_to_totalemission, veis, rng=rng),
+                4 * n,
+            ),
+            "totalemission_to_vei": (partial(convert.totalemission_to_vei, tes), n),
+            "vei_to_injectionheights": (
+                partial(convert.vei_to_injectionheights, veis, rng=rng),
+                8 * n,
+            ),
+            "order_injection_heights": (
+                partial(convert.order_injection_heights, miihs, mxihs),
+                4 * n,
+            ),
+        }
+        for name, (func, out_bytes) in cases.items():
+            elapsed, peak = _measure(func, out_bytes)
+            print(
+                f"{n:<10d}  {name:26s}  {elapsed:8.3f}  {elapsed / n * 1e9:11.1f}",
+                end="",
+            )
+            print(f"  {peak:11.2f}")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Time the sampling tables of `GenerateEmpirical`.
+
+The tables of a catalogue are made once and saved next to it, so this reports the time
+to make them, to load them from the saved file, and to draw eruptions from them.
+
+Run with
+
+    python benchmarks/bench_empirical.py --size 1000000
+"""
+
+import os
+import time
+
+import click
+from volcano_cooking.modules.create import create_empirical
+
+
+@click.command()
+@click.option("--size", type=int, default=10**6, show_default=True)
+@click.option(
+    "--file",
+    type=click.Path(exists=True),
+    default=create_empirical.CATALOGUE,
+    show_default=True,
+)
+def main(size: int, file: str) -> None:
+    """Time making, loading and drawing from the sampling tables of `file`."""
+    cache = create_empirical._cache_file(os.path.abspath(file))
+    if os.path.isfile(cache):
+        os.remove(cache)
+    start = time.perf_counter()
+    create_empirical.empirical_tables(file)
+    print(f"make (s)  {time.perf_counter() - start:8.4f}")
+    create_empirical._load_tables.cache_clear()
+    start = time.perf_counter()
+    tables = create_empirical.empirical_tables(file)
+    print(f"load (s)  {time.perf_counter() - start:8.4f}")
+    start = time.perf_counter()
+    tables.draw(size, rng=0)
+    print(f"draw (s)  {time.perf_counter() - start:8.4f}  ({size} eruptions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Report the file size, write time and read-back error of each forcing output format.
+
+The same synthetic catalogue as in `bench_workers.py` is written with each of the
+formats in `create.FRC_FORMATS`. The read-back error is the largest absolute difference
+from the uncompressed CDF5 file, relative to the largest value of `stratvolc`. The
+files are deleted when the benchmark is done.
+
+Run with
+
+    python benchmarks/bench_formats.py --size 200
+"""
+
+import os
+import tempfile
+import time
+
+import click
+import netCDF4
+import numpy as np
+from bench_workers import _make_inputs
+from volcano_cooking.modules import create
+
+
+def _max_error(file: str, reference: str) -> tuple[float, float]:
+    err = vmax = 0.0
+    with netCDF4.Dataset(file) as f, netCDF4.Dataset(reference) as ref:
+        n = len(ref.dimensions["time"])
+        for t0 in range(0, n, 64):
+            a = ref["stratvolc"][t0 : t0 + 64].filled(0)
+            b = f["stratvolc"][t0 : t0 + 64].filled(0)
+            err = max(err, float(np.max(np.abs(a - b), initial=0)))
+            vmax = max(vmax, float(np.max(a, initial=0)))
+    return err, vmax
+
+
+@click.command()
+@click.option("--size", type=int, default=200, show_default=True)
+@click.option("--vei-spread/--no-vei-spread", default=True, show_default=True)
+def main(size: int, vei_spread: bool) -> None:
+    """Time `CesmFrc.save_to_file` with each output format."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        in_file, coords_file = _make_inputs(size)
+        frc = create.CesmFrc(in_file, coords_file, vei_spread=vei_spread)
+        frc.make_dataset()
+        print(f"{size} eruptions, {len(frc.block_dates)} dates")
+        print("format      size (MB)  time (s)  rel. error")
+        files = {}
+        for out_format in ("cdf5", *(f for f in create.FRC_FORMATS if f != "cdf5")):
+            out_dir = os.path.join(tmp, out_format)
+            os.makedirs(out_dir)
+            start = time.perf_counter()
+            files[out_format] = frc.save_to_file(out_dir, out_format=out_format)
+            elapsed = time.perf_counter() - start
+            err, vmax = _max_error(files[out_format], files["cdf5"])
+            mb = os.path.getsize(files[out_format]) / 2**20
+            print(f"{out_format:10s}  {mb:9.1f}  {elapsed:8.2f}  {err / vmax:10.1e}")
+        for file in files.values():
+            os.remove(file)
+
+
+if __name__ == "__main__":
+    main()
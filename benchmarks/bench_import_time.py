@@ -0,0 +1,80 @@
+"""Time how long the command line entry points take to import.
+
+Each module is imported in a fresh interpreter started with `python -X importtime`, and
+the cumulative time of the module itself is reported, together with the heavy
+dependencies that were imported along with it.
+
+Run with
+
+    python benchmarks/bench_import_time.py --repeat 5
+"""
+
+import subprocess
+import sys
+
+import click
+
+ENTRY_POINTS = (
+    "volcano_cooking.__main__",
+    "volcano_cooking.view_force",
+    "volcano_cooking.sparse_to_lin",
+    "volcano_cooking.verify_frc",
+)
+HEAVY = (
+    "xarray",
+    "scipy",
+    "matplotlib",
+    "superposedpulses",
+    "cftime",
+    "netCDF4",
+    "pandas",
+)
+
+
+def import_time(module: str) -> tuple[float, list[str]]:
+    """Import a module in a fresh interpreter.
+
+    Parameters
+    ----------
+    module : str
+        Name of the module to import.
+
+    Returns
+    -------
+    tuple[float, list[str]]
+        The cumulative import time of the module in seconds, and the heavy dependencies
+        that were imported with it
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    cumulative = 0
+    imported = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        name = name.strip()
+        if name in HEAVY:
+            imported.append(name)
+        if name == module and cum.strip().isdigit():
+            cumulative = int(cum)
+    return cumulative / 1e6, imported
+
+
+@click.command()
+@click.option("--repeat", type=int, default=5, show_default=True)
+def main(repeat: int) -> None:
+    """Report the best import time of each entry point."""
+    print("module                          best (s)  heavy dependencies")
+    for module in ENTRY_POINTS:
+        runs = [import_time(module) for _ in range(repeat)]
+        best = min(t for t, _ in runs)
+        print(f"{module:<30s}  {best:8.3f}  {', '.join(runs[0][1]) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare the ordering of `create_dates.random_dates` with the earlier per-year loop.
+
+The earlier version sorted the months and the days of each year on their own, in a
+Python loop over the years, which also broke the pairing of a month with its day. Both
+versions start from the same random years, months and days.
+
+Run with
+
+    python benchmarks/bench_random_dates.py --size 10000000
+"""
+
+import time
+
+import click
+import numpy as np
+from volcano_cooking.modules.create import create_dates
+
+
+def _random_dates_loop(
+    size: int, init_year: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    yoes = np.cumsum(rng.integers(0, high=2, size=size)).astype(np.int16) + init_year
+    moes = rng.integers(1, high=12, size=size, dtype=np.int8)
+    does = rng.integers(1, high=28, size=size, dtype=np.int8)
+    idxs = [np.where(yoes == i)[0] for i in np.unique(yoes)]
+    for idx in idxs:
+        moes[idx] = np.sort(moes[idx])
+        does[idx] = np.sort(does[idx])
+    return yoes, moes, does
+
+
+@click.command()
+@click.option("--size", type=int, default=10**7, show_default=True)
+@click.option(
+    "--loop-size",
+    type=int,
+    default=10**5,
+    show_default=True,
+    help="Largest size the per-year loop is run with.",
+)
+def main(size: int, loop_size: int) -> None:
+    """Time `random_dates` against the per-year loop for growing sizes."""
+    print("size        loop (s)  lexsort (s)")
+    n = 1000
+    while n <= size:
+        if n <= loop_size:
+            start = time.perf_counter()
+            _random_dates_loop(n, 0, np.random.default_rng(0))
+            loop = f"{time.perf_counter() - start:8.3f}"
+        else:
+            loop = f"{'-':>8s}"
+        start = time.perf_counter()
+        create_dates.random_dates(n, 0, rng=0)
+        print(f"{n:<10d}  {loop}  {time.perf_counter() - start:11.3f}")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
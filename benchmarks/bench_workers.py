@@ -0,0 +1,75 @@
+"""Report how the gridded forcing scales with the number of worker processes.
+
+A synthetic catalogue and a coordinate file at 2 degree resolution are made in a
+temporary directory, and the forcing file is written with 1 up to N workers. Each
+eruption date adds four time records of 1.6 MB to the file, so keep `--size` small. The
+file is deleted after each run.
+
+Run with
+
+    python benchmarks/bench_workers.py --size 200 --max-workers 4
+"""
+
+import glob
+import os
+import tempfile
+import time
+
+import click
+import numpy as np
+import xarray as xr
+from volcano_cooking.modules import create
+
+
+def _make_inputs(size: int) -> tuple[str, str]:
+    lat = np.linspace(-90.0, 90.0, 96)
+    lon = np.arange(0.0, 360.0, 2.5)
+    coords_file = "coords.nc"
+    xr.Dataset(
+        {"gw": ("lat", np.cos(np.deg2rad(lat)))}, coords={"lat": lat, "lon": lon}
+    ).to_netcdf(coords_file)
+    rng = np.random.default_rng(0)
+    days = np.sort(rng.integers(0, 365 * 150, size))
+    tops = rng.uniform(15, 25, size).astype(np.float32)
+    data = create.Data(
+        np.ones(size, dtype=np.int8),
+        (1850 + days // 365).astype(np.int16),
+        (1 + days % 365 // 31).astype(np.int8),
+        (1 + days % 365 % 31).astype(np.int8),
+        rng.uniform(-60, 60, size).astype(np.float32),
+        rng.uniform(-180, 180, size).astype(np.float32),
+        rng.lognormal(0, 1, size).astype(np.float32),
+        rng.integers(3, 7, size).astype(np.int8),
+        tops - rng.uniform(1, 5, size).astype(np.float32),
+        tops,
+    )
+    data.make_dataset()
+    data.save_to_file()
+    return glob.glob(os.path.join("data", "output", "*.nc"))[0], coords_file
+
+
+@click.command()
+@click.option("--size", type=int, default=200, show_default=True)
+@click.option("--max-workers", type=int, default=os.cpu_count(), show_default=True)
+@click.option("--vei-spread/--no-vei-spread", default=True, show_default=True)
+def main(size: int, max_workers: int, vei_spread: bool) -> None:
+    """Time `CesmFrc.save_to_file` with 1 up to `max_workers` processes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        in_file, coords_file = _make_inputs(size)
+        frc = create.CesmFrc(in_file, coords_file, vei_spread=vei_spread)
+        frc.make_dataset()
+        base = 0.0
+        print(f"{size} eruptions, {len(frc.block_dates)} dates")
+        print("workers  time (s)  speed-up")
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            out_file = frc.save_to_file(tmp, workers=workers)
+            elapsed = time.perf_counter() - start
+            os.remove(out_file)
+            base = base or elapsed
+            print(f"{workers:7d}  {elapsed:8.2f}  {base / elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 """Create source and forcing files used in the CESM2 climate model."""
 
-from importlib_metadata import version
 
-__version__ = version(__package__)
+def __getattr__(name: str) -> str:
+    # Looking up the version takes about as long as the rest of the command line
+    # interface, so it is only done when asked for.
+    if name == "__version__":
+        from importlib_metadata import version
+
+        return version(__package__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,15 +7,13 @@ import sys
 from typing import Optional
 
 import click
-import wget
 
 import volcano_cooking.synthetic_volcanoes as sv
-from volcano_cooking import __version__
-from volcano_cooking.configurations import shift_eruption_to_date
+from volcano_cooking.modules import create
 
 
 @click.command()
-@click.version_option(version=__version__)
+@click.version_option(package_name="volcano-cooking")
 @click.option(
     "-o",
     "--option",
@@ -52,6 +50,32 @@ from volcano_cooking.configurations import shift_eruption_to_date
     show_default=True,
     help="Set the number of volcanoes to generate.",
 )
+@click.option(
+    "--ensemble",
+    "ensemble",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of members to generate in one batch, each saved to its own file.",
+)
+@click.option(
+    "--seed",
+    "seed",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Seed of the random numbers. With '--ensemble', member 'i' is the same for "
+    + "all runs with the same seed.",
+)
+@click.option(
+    "--large",
+    "large",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    type=bool,
+    help="Allow catalogues with more years than fit in the CESM2 data types, stored "
+    + "with int32 years. The CESM2 data types are still used if the years fit.",
+)
 @click.option(
     "--lst/--no-lst",
     default=False,
@@ -70,6 +94,14 @@ from volcano_cooking.configurations import shift_eruption_to_date
     help="Shift eruptions of provided file to 'init_year'. "
     + "If no file is provided, the last created file is used.",
 )
+@click.option(
+    "--patch-frc",
+    "patch_frc",
+    type=click.Path(exists=True),
+    default=None,
+    help="With '--shift-eruption-to-date', patch this CESM2 forcing file, made with "
+    + "'--run-python' from the unshifted file, instead of making it again.",
+)
 @click.option(
     "--run-ncl",
     "run_ncl",
@@ -79,6 +111,15 @@ from volcano_cooking.configurations import shift_eruption_to_date
     type=bool,
     help="Run the shell script that generate forcing from emission file.",
 )
+@click.option(
+    "--run-python",
+    "run_python",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    type=bool,
+    help="Generate forcing from emission file natively, without NCL.",
+)
 @click.option(
     "--package-last",
     "package_last",
@@ -88,6 +129,24 @@ from volcano_cooking.configurations import shift_eruption_to_date
     type=bool,
     help="Move all last created files to a 'source-file' directory.",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used to compute the gridded forcing, "
+    + "with option 1 or with '--run-python'.",
+)
+@click.option(
+    "--frc-format",
+    "frc_format",
+    type=click.Choice(create.FRC_FORMATS),
+    default=None,
+    help="Format of the gridded forcing file. Defaults to 'netcdf3' with option 1 "
+    + "and 'cdf5' with '--run-python'. The 'zlib', 'packed' and 'quantized' formats "
+    + "are compressed netCDF4, where the last two are lossy.",
+)
 @click.option(
     "--file",
     "file",
@@ -95,28 +154,38 @@ from volcano_cooking.configurations import shift_eruption_to_date
     default=None,
     help="Set volcanic eruption dates and strength from a json file.",
 )
-def main(
+def main(  # noqa: PLR0912
     frc: int,
     init_year: list[int],
     size: int,
+    ensemble: int,
+    seed: Optional[int],
+    large: bool,
     lst: bool,
     option: int,
     shift_eruption: str,
+    patch_frc: Optional[str],
     run_ncl: bool,
+    run_python: bool,
     package_last: bool,
     file: Optional[str],
+    workers: int,
+    frc_format: Optional[str],
 ) -> None:
     """Volcano cooking."""
     # First handle list, run ncl and package commands which overrides all other.
     if lst:
         for cl in sv.__GENERATORS__:
-            print(f"{cl}: {sv.__GENERATORS__[cl].__name__}")
+            print(f"{cl}: {sv.__GENERATORS__.name(cl)}")
         return
     if run_ncl:
         this_dir = os.path.dirname(os.path.abspath(__file__))
         shell_file = f"{this_dir}/create_cesm_frc.sh"
         subprocess.call(["sh", shell_file, this_dir, sys.executable])
         return
+    if run_python:
+        run_python_engine(workers, frc_format or "cdf5")
+        return
     if package_last:
         this_dir = os.path.dirname(os.path.abspath(__file__))
         shell_file = f"{this_dir}/package_last.sh"
@@ -129,7 +198,8 @@ def main(
         if option == 1:
             location = os.path.join(os.getcwd(), "data", "originals")
             file = "VolcanEESMv3.11_SO2_850-2016_Mscale_Zreduc_2deg_c191125.nc"
-            if not os.path.isfile(os.path.join(location, file)):
+            # Only the metadata is needed, which may already be cached.
+            if not create.has_template(os.path.join(location, file)):
                 get_forcing_file(file)
             file = "fv_1.9x2.5_L30.nc"
             if not os.path.isfile(os.path.join(os.getcwd(), file)):
@@ -139,20 +209,70 @@ def main(
                     + "/atm/cam/coords/fv_1.9x2.5_L30.nc",
                     not_forcing=True,
                 )
-        if file is None:
+        if ensemble > 1:
+            sv.create_ensemble(
+                ensemble,
+                size=size,
+                init_year=_init_year[0],
+                version=frc,
+                option=option,
+                file=file,
+                seed=seed,
+                workers=workers,
+                out_format=frc_format or "netcdf3",
+                large=large,
+            )
+        elif file is None:
             sv.create_volcanoes(
-                size=size, init_year=_init_year[0], version=frc, option=option
+                size=size,
+                init_year=_init_year[0],
+                version=frc,
+                option=option,
+                workers=workers,
+                out_format=frc_format or "netcdf3",
+                seed=seed,
+                large=large,
             )
         else:
-            sv.create_volcanoes(file=file)
-    elif shift_eruption == "True":
+            sv.create_volcanoes(file=file, seed=seed, large=large)
+        return
+    # Shifting eruptions needs xarray, so only import it when needed.
+    from volcano_cooking.configurations import shift_eruption_to_date
+
+    if shift_eruption == "True":
         shift_eruption_to_date.shift_eruption_to_date(
-            (_init_year[0], _init_year[1], _init_year[2]), None
+            (_init_year[0], _init_year[1], _init_year[2]), None, patch_frc
         )
     else:
         shift_eruption_to_date.shift_eruption_to_date(
-            (_init_year[0], _init_year[1], _init_year[2]), shift_eruption
+            (_init_year[0], _init_year[1], _init_year[2]), shift_eruption, patch_frc
+        )
+
+
+def run_python_engine(workers: int = 1, out_format: str = "cdf5") -> None:
+    """Create the forcing file for CESM2 with the native python implementation.
+
+    This is the same as running the NCL script with `--run-ncl`, and uses the same
+    environment variables to decide on the resolution and where to find files.
+
+    Parameters
+    ----------
+    workers : int
+        Number of processes used to compute the forcing.
+    out_format : str
+        Format of the forcing file, one of `create.FRC_FORMATS`.
+    """
+    res = os.environ.get("RES", "2deg")
+    file = "fv_0.9x1.25_L30.nc" if res in ("1deg", "0.95x1.25") else "fv_1.9x2.5_L30.nc"
+    if not os.path.isfile(os.path.join(os.getcwd(), "data", "originals", file)):
+        get_forcing_file(
+            file,
+            url="https://svn-ccsm-inputdata.cgd.ucar.edu/trunk/inputdata"
+            + f"/atm/cam/coords/{file}",
+            not_forcing=True,
         )
+    out_file = create.make_cesm_frc(res=res, workers=workers, out_format=out_format)
+    print(f"File creation complete: {out_file}")
 
 
 def get_forcing_file(
@@ -183,6 +303,8 @@ def get_forcing_file(
         )
         url = url_ if url is None else url
         ssl._create_default_https_context = ssl._create_unverified_context
+        import wget
+
         wget.download(url, os.path.join(here, file))
         print("")
         if os.path.isfile(os.path.join(here, file)):
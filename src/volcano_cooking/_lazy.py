@@ -0,0 +1,59 @@
+"""Import the submodules of a package when their names are first used.
+
+The packages of `volcano_cooking` re-export the public names of their submodules, which
+pull in heavy dependencies such as xarray, scipy and matplotlib. A package made lazy
+with `lazy_package` only imports a submodule when one of its names is first looked up
+on the package, so that e.g. `volcano-cooking --lst` does not import them at all.
+"""
+
+import importlib
+import sys
+import types
+from typing import Any
+
+
+class _LazyPackage(types.ModuleType):
+    """Package that imports the submodule of a name when the name is first used."""
+
+    _exports: dict[str, str]
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in self._exports:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        module = importlib.import_module(f"{self.__name__}.{self._exports[name]}")
+        value = getattr(module, name)
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Importing a submodule binds it on the package. When the submodule has the same
+        # name as one of its exports, the export is bound instead, as with a star import.
+        if (
+            isinstance(value, types.ModuleType)
+            and self._exports.get(name) == name
+            and value.__name__ == f"{self.__name__}.{name}"
+        ):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+    def __dir__(self) -> list[str]:
+        return sorted(set(super().__dir__()) | set(self._exports))
+
+
+def lazy_package(name: str, exports: dict[str, tuple[str, ...]]) -> None:
+    """Make a package import its submodules when their names are first used.
+
+    Parameters
+    ----------
+    name : str
+        Name of the package, i.e. `__name__` in its `__init__.py`.
+    exports : dict[str, tuple[str, ...]]
+        The public names of each submodule, which are looked up on the package as if
+        they were star imported.
+    """
+    package = sys.modules[name]
+    package._exports = {  # type: ignore[attr-defined]
+        n: submodule for submodule, names in exports.items() for n in names
+    }
+    package.__all__ = sorted(package._exports)  # type: ignore[attr-defined]
+    package.__class__ = _LazyPackage
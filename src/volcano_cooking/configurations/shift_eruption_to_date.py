@@ -16,7 +16,9 @@ from volcano_cooking.modules import create
 
 
 def shift_eruption_to_date(
-    eruption_date: tuple[int, int, int], file: Optional[str]
+    eruption_date: tuple[int, int, int],
+    file: Optional[str],
+    patch_frc: Optional[str] = None,
 ) -> None:
     """Shift the eruption date of the synthetic volcanoes file.
 
@@ -27,6 +29,9 @@ def shift_eruption_to_date(
     file : Optional[str]
         Full path (absolute or relative to where the function is called) and file name
         of a custom file to be used.
+    patch_frc : Optional[str]
+        CESM2 forcing file made from `file`, which is patched to match the shifted
+        eruption instead of being made again from scratch.
 
     Raises
     ------
@@ -43,7 +48,8 @@ def shift_eruption_to_date(
         raise ValueError("Month of eruption must be between 1 and 12, inclusive.")
     if eruption_date[2] < 1 or eruption_date[2] > allowed_days:
         raise ValueError("Day of eruption must be between 1 and 28, inclusive.")
-    arrs = open_file("nc", file)
+    in_file = find_in_file("nc", file)
+    arrs = open_file("nc", in_file)
     first = arrs[1][0] * 10000 + arrs[2][0] * 100 + arrs[3][0]
     last = arrs[1][-1] * 10000 + arrs[2][-1] * 100 + arrs[3][-1]
     new = eruption_date[0] * 10000 + eruption_date[1] * 100 + eruption_date[2]
@@ -58,6 +64,34 @@ def shift_eruption_to_date(
     frc_cls = create.Data(*arrs)
     frc_cls.make_dataset()
     frc_cls.save_to_file()
+    if patch_frc is not None:
+        n_records = create.patch_cesm_frc(
+            patch_frc, in_file, fnc.find_last_output("nc")
+        )
+        print(f"Patched {n_records} time records of {patch_frc}.")
+
+
+def find_in_file(ext: str, in_file: Optional[str] = None) -> str:
+    """Find the path of the file used by `open_file`.
+
+    Parameters
+    ----------
+    ext : str
+        Extension of the file that should be used
+    in_file : Optional[str]
+        Full path (absolute or relative to where the function i called) and file name of a
+        custom file to be used.
+
+    Returns
+    -------
+    str
+        The path to the last saved file with extension `ext`, or to `in_file`
+    """
+    if in_file is None:
+        return fnc.find_last_output(ext)
+    if in_file.split(".")[-1] == "npz":
+        return fnc.find_file("".join(in_file.split(".")[:-1]) + ".nc")
+    return fnc.find_file(in_file)
 
 
 def open_file(ext: str, in_file: Optional[str] = None) -> tuple[np.ndarray, ...]:
@@ -83,12 +117,7 @@ def open_file(ext: str, in_file: Optional[str] = None) -> tuple[np.ndarray, ...]
         If the extension is not either 'npz' or 'nc', no files can be found and the
         variables 'yoes', 'moes', 'does' and 'tes' cannot be found.
     """
-    if in_file is None:
-        file = fnc.find_last_output(ext)
-    elif in_file.split(".")[-1] == "npz":
-        file = fnc.find_file("".join(in_file.split(".")[:-1]) + ".nc")
-    else:
-        file = fnc.find_file(in_file)
+    file = find_in_file(ext, in_file)
     if "nc" not in ext:
         raise NameError(
             "Data arrays cannot be found. "
@@ -1,4 +1,27 @@
-"""Module for small scripts."""
+"""Module for small scripts.
 
-from volcano_cooking.helper_scripts.compare_datasets import *  # noqa:F401,F403
-from volcano_cooking.helper_scripts.view_generated_forcing import *  # noqa:F401,F403
+The submodules are imported when one of their names is first used, since they import
+matplotlib, see `volcano_cooking._lazy`.
+"""
+
+from typing import TYPE_CHECKING
+
+from volcano_cooking._lazy import lazy_package
+
+if TYPE_CHECKING:
+    from volcano_cooking.helper_scripts.compare_datasets import *  # noqa:F401,F403
+    from volcano_cooking.helper_scripts.view_generated_forcing import *  # noqa:F401,F403
+
+lazy_package(
+    __name__,
+    {
+        "compare_datasets": ("compare_datasets",),
+        "view_generated_forcing": (
+            "view_forcing",
+            "frc_datetime2float",
+            "check_dir",
+            "load_forcing",
+            "main",
+        ),
+    },
+)
@@ -2,6 +2,7 @@
 
 from volcano_cooking.modules.convert.adjust_emissions_and_heights import *  # noqa:F401,F403
 from volcano_cooking.modules.convert.convert_between_variables import *  # noqa:F401,F403
+from volcano_cooking.modules.convert.grid_geometry import *  # noqa:F401,F403
 
 # See https://github.com/RaRe-Technologies/gensim/issues/1551
 # Another option is: (think I like this more, but seems the issuers gravitate to noqa)
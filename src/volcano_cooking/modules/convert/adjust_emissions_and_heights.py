@@ -10,10 +10,13 @@ Modified from script provided by Herman Fæhn Fuglestvedt and using
 http://svn.code.sf.net/p/codescripts/code/trunk/ncl/emission/createVolcEruptV3.ncl
 """
 
-import os
-
 import numpy as np
-import xarray as xr
+import scipy.sparse as scp_sparse
+
+# Constants from CAM, shr_const_mod.F90, as used in the NCL script.
+AVOGADRO = 6.02214e26  # Avogadro's number ~ molecules/kmole
+MW_SO2 = 64.0648  # molecular weight of SO2 (g/mol)
+EMISSION_DURATION = 6 * 3600  # Emission lasts 6 hours, in seconds
 
 
 def adjust_altitude_range(
@@ -50,18 +53,19 @@ def adjust_altitude_range(
     return miihs, mxihs
 
 
-def adjust_emissions(
+def altitude_overlap(
     miihs: np.ndarray,
     mxihs: np.ndarray,
-    tes: np.ndarray,
-    e_lons: np.ndarray,
-    e_lats: np.ndarray,
-) -> np.ndarray:
-    """Calculate emissions that are accepted by the CESM2.
+    altitude_int: np.ndarray,
+    fallback_levels: int = 10,
+) -> tuple[scp_sparse.csr_matrix, np.ndarray]:
+    """Find the fraction of each altitude level covered by the injection heights.
 
-    Too much aerosols in a column can trigger a warning saying that the `Aerosol optical
-    depth is unreasonably high in this layer`. We therefore restrict this, should be on
-    the order of about `1e10`.
+    Level `k` is covered by an eruption if `miihs < altitude_int[k + 1]` and `mxihs >=
+    altitude_int[k]`, with weight `(min(mxihs, altitude_int[k + 1]) - max(miihs,
+    altitude_int[k])) / (altitude_int[k + 1] - altitude_int[k])`. Eruptions that do not
+    cover any of the levels are instead placed evenly over the top `fallback_levels`
+    levels.
 
     Parameters
     ----------
@@ -69,71 +73,87 @@ def adjust_emissions(
         Minimum injection heights
     mxihs : np.ndarray
         Maximum injection heights
+    altitude_int : np.ndarray
+        Increasing edges of the altitude levels
+    fallback_levels : int
+        Number of levels at the top used for eruptions outside of all levels. Set to 0
+        to keep such eruptions as empty rows.
+
+    Returns
+    -------
+    tuple[scp_sparse.csr_matrix, np.ndarray]
+        Eruptions times levels matrix of overlap weights, and a boolean mask of the
+        eruptions that were placed at the fallback levels
+
+    Note
+    ----
+    Vectorised version of the `do k=0,nAlt-1` loop in:
+    http://svn.code.sf.net/p/codescripts/code/trunk/ncl/emission/createVolcEruptV3.ncl
+    """
+    bot = np.asarray(miihs, dtype=np.float64)
+    top = np.asarray(mxihs, dtype=np.float64)
+    lo = np.asarray(altitude_int[:-1], dtype=np.float64)
+    hi = np.asarray(altitude_int[1:], dtype=np.float64)
+    n_alt = len(lo)
+    # Levels k0 <= k < k1 satisfy `bot < hi[k]` and `top >= lo[k]`.
+    k0 = np.searchsorted(hi, bot, side="right")
+    k1 = np.searchsorted(lo, top, side="right")
+    counts = np.maximum(k1 - k0, 0)
+    rows = np.repeat(np.arange(len(bot)), counts)
+    cols = (
+        k0[rows] + np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    )
+    weights = np.minimum(top[rows], hi[cols]) - np.maximum(bot[rows], lo[cols])
+    weights /= hi[cols] - lo[cols]
+    overlap = scp_sparse.csr_matrix(
+        (weights, (rows, cols)), shape=(len(bot), n_alt), dtype=np.float64
+    )
+    overlap.eliminate_zeros()
+    reset = np.diff(overlap.indptr) == 0
+    if fallback_levels and np.any(reset):
+        n_fb = min(fallback_levels, n_alt)
+        fb_rows = np.repeat(np.nonzero(reset)[0], n_fb)
+        fb_cols = np.tile(np.arange(n_alt - n_fb, n_alt), int(np.sum(reset)))
+        fallback = scp_sparse.csr_matrix(
+            (np.ones(len(fb_rows)), (fb_rows, fb_cols)), shape=overlap.shape
+        )
+        overlap = overlap + fallback
+    else:
+        reset[:] = False
+    return overlap, reset
+
+
+def adjust_emissions(
+    tes: np.ndarray, area: np.ndarray, mass_scaling: bool = True
+) -> np.ndarray:
+    """Calculate the column emission rate of eruptions that is accepted by the CESM2.
+
+    Too much aerosols in a column can trigger a warning saying that the `Aerosol optical
+    depth is unreasonably high in this layer`. The mass of eruptions with 15 Tg SO2 or
+    more is therefore scaled by a factor 1/1.8. Each eruption is emitted over
+    `EMISSION_DURATION` seconds.
+
+    Parameters
+    ----------
     tes : np.ndarray
-        Total emissions
-    e_lons : np.ndarray
-        Longitude of the eruption
-    e_lats : np.ndarray
-        Latitude of the eruption
+        Total emissions, in Tg SO2
+    area : np.ndarray
+        Area the emission of each eruption is spread over, in cm2
+    mass_scaling : bool
+        Scale the mass of eruptions with 15 Tg SO2 or more.
 
     Returns
     -------
     np.ndarray
-        The total column emission
-
-    Raises
-    ------
-    FileNotFoundError
-        If the coordinates file cannot be found.
+        The column emission rate, in molecules/cm2/s
 
     Note
     ----
     Modified from script provided by Herman Fæhn Fuglestvedt and according to
     http://svn.code.sf.net/p/codescripts/code/trunk/ncl/emission/createVolcEruptV3.ncl
     """
-    file = os.path.join(
-        "data",
-        "originals",
-        "fv_1.9x2.5_L30",
-    )
-    if not os.path.exists(f"{file}.nc"):
-        raise FileNotFoundError(f"{file} not found. Consult README on how to download.")
-    mass_threshold = 15
-    idx = tes > mass_threshold
-    mass_factor = 1 / 1.8  # scaling factor for large eruptions
-    tes[idx] *= mass_factor
-
-    duration = 21600  # 6 hours in seconds
-    avogadros_number = 6.022140857e23  # Avogadro's constant in "mol^{-1}"
-    d_earth = 12742e3  # in "m"
-    s_earth = np.pi * d_earth**2
-    # dalt = 1e3
-    dalt = mxihs * 1e5 - miihs * 1e5  # Emission depth in cm
-    m3_to_cm3 = 1.0e6
-    kg2g = 1000
-    m_mass, fraction = (64.06, 1.0)
-
-    grid = xr.open_dataset(os.path.join("data", "originals", "fv_1.9x2.5_L30.nc"))
-    gw = grid["gw"]  # Latitude/Gauss weights
-    nLon = len(grid["lon"])
-    # nLat = len(grid["lat"])
-    lat_data = grid["lat"]
-    column_area = s_earth / nLon * gw / np.sum(gw)  # in "m"
-    idx = (np.abs(e_lats - lat_data)).argmin()
-    area = column_area[idx] * len(e_lons)
-    volume = area.data * dalt  # volume of one level
-    v_cm3 = volume * m3_to_cm3  # Volume in cm3
-    # tot_molecules = tes * kg2g / m_mass * avogadros_number  # "imass" is in "kg"
-    # emis = tot_molecules / (v_cm3 * duration)
-    # total = ((v_cm3 * emis * duration) / avogadros_number * m_mass) / kg2g * fraction
-    # print(total)
-
-    emis = tes / area.data / duration
-    column_emission = emis * kg2g / m_mass * avogadros_number  # "imass" is in "kg"
-    # emis_rate = column_emission / dalt
-    _ = ((v_cm3 * emis * duration) / avogadros_number * m_mass) / kg2g * fraction
-    # print(total)
-
-    # stratvolc =
-
-    return column_emission
+    tes = np.asarray(tes, dtype=np.float64)
+    if mass_scaling:
+        tes = np.where(tes >= 15, tes / 1.8, tes)  # noqa: PLR2004
+    column_emis = tes / area / EMISSION_DURATION  # Tg/cm2/s
+    return column_emis * 1e9 * AVOGADRO / MW_SO2
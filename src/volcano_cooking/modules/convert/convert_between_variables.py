@@ -2,18 +2,33 @@
 
 The converting functions are made through trial and error by matching the synthetically
 created variables with one real data set used in CESM2.
+
+All functions that draw random numbers take an `rng` argument, which is anything
+accepted by `np.random.default_rng`: a `np.random.Generator`, a `np.random.SeedSequence`
+(for example one of those made with `SeedSequence.spawn`), an int seed, or None for
+fresh entropy.
+
+The conversions are written as NumPy kernels without Python loops, and work in place
+on the arrays they return where they can, so that they scale to large catalogues.
 """
 
+from typing import Union
+
 import numpy as np
 
+# Anything `np.random.default_rng` accepts as a seed
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
 
-def vei_to_totalemission(veis: np.ndarray) -> np.ndarray:
+def vei_to_totalemission(veis: np.ndarray, rng: SeedLike = None) -> np.ndarray:
     """Convert from VEI to Total_Emission.
 
     Parameters
     ----------
     veis : np.ndarray
         The array of VEI that should be converted to Total_Emission
+    rng : SeedLike
+        Random number generator, or a seed for one.
 
     Returns
     -------
@@ -27,9 +42,12 @@ def vei_to_totalemission(veis: np.ndarray) -> np.ndarray:
     """
     if veis.dtype != np.int8:
         raise ValueError(f"{veis.dtype} = . Need int8.")
-    return 1e-2 * 3 ** (
-        np.random.normal(0.1, 1.0, size=len(veis)).astype(np.float32) + veis
-    )
+    rng = np.random.default_rng(rng)
+    tes = rng.normal(0.1, 1.0, size=len(veis)).astype(np.float32)
+    tes += veis
+    np.power(np.float32(3), tes, out=tes)
+    tes *= np.float32(1e-2)
+    return tes
 
 
 def totalemission_to_vei(tes: np.ndarray) -> np.ndarray:
@@ -52,7 +70,7 @@ def totalemission_to_vei(tes: np.ndarray) -> np.ndarray:
     ZeroDivisionError
         If `tes` has non-positive values.
     """
-    if any(tes <= 0):
+    if np.any(tes <= 0):
         raise ZeroDivisionError(
             "Don't use total emission with zeros. We're doing a log."
         )
@@ -64,18 +82,22 @@ def totalemission_to_vei(tes: np.ndarray) -> np.ndarray:
     return veis
 
 
-def vei_to_injectionheights(veis: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+def vei_to_injectionheights(
+    veis: np.ndarray, rng: SeedLike = None
+) -> tuple[np.ndarray, np.ndarray]:
     """Convert VEI to minimum and maximum injection heights.
 
     When we set the minimum and maximum injection heights we should make sure the minimum
-    value really is less than the maximum value, hence the for loop at the end.  The
-    variables 'scale_min' and 'scale_max' were adjusted based on the helper script
+    value really is less than the maximum value, hence the swap at the end.  The scales
+    of the minimum and maximum heights were adjusted based on the helper script
     'inspect_X-vs-Y.py'.
 
     Parameters
     ----------
     veis : np.ndarray
         The array of VEI that should be converted to Total_Emission
+    rng : SeedLike
+        Random number generator, or a seed for one.
 
     Returns
     -------
@@ -84,24 +106,41 @@ def vei_to_injectionheights(veis: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
         The first element is the lower bound, second is upper bound.
     """
     vei_limit = 3
-    scale_max = np.array([80 if v > vei_limit else 10 for v in veis])
-    scale_min = np.array([20 if v > vei_limit else 1 for v in veis])
-    mxihs = np.abs(
-        np.random.normal(1, 2.0, size=len(veis)).astype(np.float32) * scale_max
-    )
-    miihs = np.abs(
-        np.random.normal(1, 2.0, size=len(veis)).astype(np.float32) * scale_min
-    )
+    big = veis > vei_limit
+    rng = np.random.default_rng(rng)
+    mxihs = rng.normal(1, 2.0, size=len(veis)).astype(np.float32)
+    miihs = rng.normal(1, 2.0, size=len(veis)).astype(np.float32)
+    mxihs *= np.where(big, np.float32(80), np.float32(10))
+    miihs *= np.where(big, np.float32(20), np.float32(1))
+    np.abs(mxihs, out=mxihs)
+    np.abs(miihs, out=miihs)
     # Finally we make sure the lower bound is less than 30:
     max_height = 30
-    idx_min = miihs > max_height
-    miihs[idx_min] = 18
-    idx_max = mxihs > max_height
-    mxihs[idx_max] = 20
-
-    for idx, (i, j) in enumerate(zip(miihs, mxihs)):
-        miihs[idx] = min(i, j)
-        mxihs[idx] = max(i, j)
-    mxihs = mxihs.astype(np.float32)
-    miihs = miihs.astype(np.float32)
-    return miihs, mxihs
+    np.copyto(miihs, np.float32(18), where=miihs > max_height)
+    np.copyto(mxihs, np.float32(20), where=mxihs > max_height)
+    return order_injection_heights(miihs, mxihs)
+
+
+def order_injection_heights(
+    miihs: np.ndarray, mxihs: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Swap minimum and maximum injection heights where they are in the wrong order.
+
+    The maximum heights are updated in place if they are already float32.
+
+    Parameters
+    ----------
+    miihs : np.ndarray
+        Minimum injection heights
+    mxihs : np.ndarray
+        Maximum injection heights
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The element-wise smallest and largest of the two, as float32 arrays
+    """
+    lower = np.minimum(miihs, mxihs, dtype=np.float32)
+    mxihs = np.asarray(mxihs, dtype=np.float32)
+    np.maximum(miihs, mxihs, out=mxihs)
+    return lower, mxihs
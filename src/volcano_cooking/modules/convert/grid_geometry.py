@@ -0,0 +1,255 @@
+"""Geometry of the CESM2 finite volume grids at 1 and 2 degree resolution.
+
+The column areas only depend on the Gauss weights in the coordinate files
+`fv_0.9x1.25_L30.nc` and `fv_1.9x2.5_L30.nc`. They are computed once for each file and
+kept in memory, and are also saved next to the coordinate file as
+`<name>_geometry.npz`, together with the size and modification time of the file.
+
+Note
+----
+The column areas are computed as in
+http://svn.code.sf.net/p/codescripts/code/trunk/ncl/emission/createVolcEruptV3.ncl
+"""
+
+import functools
+import json
+import os
+from typing import Any
+
+import netCDF4
+import numpy as np
+
+# Earth's radius (cm) from CAM, shr_const_mod.F90, as used in the NCL script.
+_REARTH_CM = 6.37122e8
+
+
+class GridGeometry:
+    """Coordinates, cell edges and column areas of a CESM2 grid.
+
+    Use `GridGeometry.from_file` or `grid_geometry` to get the memoised object for a
+    given coordinate file.
+
+    Parameters
+    ----------
+    lat : np.ndarray
+        Latitude of the grid cell centres.
+    lon : np.ndarray
+        Longitude of the grid cell centres.
+    gw : np.ndarray
+        Gauss weights of each latitude.
+    lat_attrs : dict
+        Attributes of the latitude variable in the coordinate file.
+    lon_attrs : dict
+        Attributes of the longitude variable in the coordinate file.
+
+    Attributes
+    ----------
+    lat_edges : np.ndarray
+        Latitude of the cell edges, from -90 to 90.
+    lon_edges : np.ndarray
+        Longitude of the cell edges.
+    column_area : np.ndarray
+        Area of a grid column at each latitude in cm2.
+    unit_vectors : np.ndarray
+        Unit vector from the centre of the Earth to each grid column, with the columns
+        ordered as a flattened (lat, lon) array.
+    disc : method
+        Find the grid columns within a given distance of a grid column.
+    nearest : method
+        Find the grid column closest to each of a set of points.
+    """
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        gw: np.ndarray,
+        lat_attrs: dict,
+        lon_attrs: dict,
+    ) -> None:
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.gw = np.asarray(gw, dtype=np.float64)
+        self.lat_attrs = lat_attrs
+        self.lon_attrs = lon_attrs
+        lat_mid = (self.lat[1:] + self.lat[:-1]) / 2
+        lon_mid = (self.lon[1:] + self.lon[:-1]) / 2
+        self.lat_edges = np.concatenate(([-90.0], lat_mid, [90.0]))
+        dlon = self.lon[1] - self.lon[0] if len(self.lon) > 1 else 360.0
+        self.lon_edges = np.concatenate(
+            ([self.lon[0] - dlon / 2], lon_mid, [self.lon[-1] + dlon / 2])
+        )
+        s_earth_cm2 = 4.0 * np.pi * _REARTH_CM**2
+        self.column_area = self.gw * s_earth_cm2 / len(self.lon) / np.sum(self.gw)
+        lat_r = np.deg2rad(self.lat)[:, None]
+        lon_r = np.deg2rad(self.lon)[None, :]
+        # Unit vectors of all grid columns, used for great circle distances.
+        self.unit_vectors = np.stack(
+            [
+                (np.cos(lat_r) * np.cos(lon_r)).ravel(),
+                (np.cos(lat_r) * np.sin(lon_r)).ravel(),
+                np.broadcast_to(np.sin(lat_r), (len(self.lat), len(self.lon))).ravel(),
+            ],
+            axis=1,
+        )
+        self._discs: dict[tuple[int, int, float], tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_file(cls, file: str) -> "GridGeometry":
+        """Load the grid geometry of a coordinate file.
+
+        Parameters
+        ----------
+        file : str
+            Path to the coordinate file, containing `lat`, `lon` and `gw`.
+
+        Returns
+        -------
+        GridGeometry
+            The grid geometry, shared by all calls with the same unchanged file
+
+        Raises
+        ------
+        FileNotFoundError
+            If the coordinate file cannot be found.
+        """
+        if not os.path.isfile(file):
+            raise FileNotFoundError(
+                f"{file} not found. Consult README on how to download."
+            )
+        stat = os.stat(file)
+        return _load_geometry(os.path.abspath(file), stat.st_size, stat.st_mtime_ns)
+
+    def disc(
+        self, lat_idx: int, lon_idx: int, radius_km: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find the grid columns within a great circle distance of a grid column.
+
+        The result is cached, since many eruptions share the same grid column.
+
+        Parameters
+        ----------
+        lat_idx : int
+            Latitude index of the grid column at the centre of the disc
+        lon_idx : int
+            Longitude index of the grid column at the centre of the disc
+        radius_km : float
+            Radius of the disc in km
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Latitude and longitude indices of the grid columns inside the disc
+        """
+        key = (int(lat_idx), int(lon_idx), float(radius_km))
+        if key not in self._discs:
+            centre = self.unit_vectors[key[0] * len(self.lon) + key[1]]
+            # Comparing the cosine of the angle avoids taking arccos of every column.
+            cos_max = np.cos(radius_km * 1e5 / _REARTH_CM)
+            inside = np.nonzero(self.unit_vectors @ centre >= cos_max)[0]
+            self._discs[key] = np.divmod(inside, len(self.lon))
+        return self._discs[key]
+
+    def nearest(
+        self, lats: np.ndarray, lons: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find the indices of the grid column closest to each point.
+
+        Longitude is cyclic, so that a point east of the last grid longitude may be
+        closest to the first. Ties are resolved towards the lower index, the same as an
+        `argmin` over the distances to all grid points.
+
+        Parameters
+        ----------
+        lats : np.ndarray
+            Latitudes of the points
+        lons : np.ndarray
+            Longitudes of the points, in degrees east
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Latitude and longitude indices of the grid columns
+        """
+        lat_idx = np.searchsorted(self.lat_edges[1:-1], lats, side="left")
+        # Take the longitudes to the 360 degrees starting at the first grid longitude
+        lons = self.lon[0] + np.mod(np.asarray(lons) - self.lon[0], 360.0)
+        lon_idx = np.searchsorted(self.lon_edges[1:-1], lons, side="left")
+        # Past the midpoint between the last and the first longitude, the first is closer
+        wrap = (self.lon[-1] + self.lon[0] + 360.0) / 2
+        lon_idx = np.where(lons >= wrap, 0, lon_idx)
+        return lat_idx, lon_idx
+
+
+def _to_json(value: Any) -> Any:
+    # Attributes are strings, or numpy scalars and arrays
+    return value.tolist() if hasattr(value, "tolist") else value
+
+
+def _cache_file(file: str) -> str:
+    return f"{os.path.splitext(file)[0]}_geometry.npz"
+
+
+@functools.lru_cache(maxsize=8)
+def _load_geometry(file: str, size: int, mtime_ns: int) -> GridGeometry:
+    key = f"{size}:{mtime_ns}"
+    cache = _cache_file(file)
+    if os.path.isfile(cache):
+        with np.load(cache) as npz:
+            if str(npz["key"]) == key:
+                return GridGeometry(
+                    npz["lat"],
+                    npz["lon"],
+                    npz["gw"],
+                    json.loads(str(npz["lat_attrs"])),
+                    json.loads(str(npz["lon_attrs"])),
+                )
+    with netCDF4.Dataset(file, "r") as grid:
+        attrs = [
+            {
+                a: _to_json(grid[v].getncattr(a))
+                for a in grid[v].ncattrs()
+                if a != "_FillValue"
+            }
+            for v in ("lat", "lon")
+        ]
+        geometry = GridGeometry(
+            grid["lat"][:].data, grid["lon"][:].data, grid["gw"][:].data, *attrs
+        )
+    np.savez(
+        cache,
+        key=key,
+        lat=geometry.lat,
+        lon=geometry.lon,
+        gw=geometry.gw,
+        lat_attrs=json.dumps(geometry.lat_attrs),
+        lon_attrs=json.dumps(geometry.lon_attrs),
+    )
+    return geometry
+
+
+def grid_geometry(res: str = "2deg") -> GridGeometry:
+    """Load the grid geometry of the coordinate file in `data/originals`.
+
+    Parameters
+    ----------
+    res : str
+        The resolution, either '1deg' (or '0.95x1.25') or '2deg' (or '1.9x2.5').
+
+    Returns
+    -------
+    GridGeometry
+        The grid geometry of `fv_0.9x1.25_L30.nc` or `fv_1.9x2.5_L30.nc`
+
+    Raises
+    ------
+    ValueError
+        If the resolution is not recognised.
+    """
+    if res in ("1deg", "0.95x1.25"):
+        name = "fv_0.9x1.25_L30"
+    elif res in ("2deg", "1.9x2.5"):
+        name = "fv_1.9x2.5_L30"
+    else:
+        raise ValueError(f"Illegal value for resolution: {res}")
+    return GridGeometry.from_file(os.path.join("data", "originals", f"{name}.nc"))
@@ -1,10 +1,69 @@
-"""Module for creating eruptions."""
+"""Module for creating eruptions.
 
-from volcano_cooking.modules.create.create_data import *  # noqa:F401,F403
-from volcano_cooking.modules.create.create_dates import *  # noqa:F401,F403
-from volcano_cooking.modules.create.create_frc import *  # noqa:F401,F403
-from volcano_cooking.modules.create.rewrite_frc_file import *  # noqa:F401,F403
+The submodules are imported when one of their names is first used, see
+`volcano_cooking._lazy`.
+"""
 
-# See https://github.com/RaRe-Technologies/gensim/issues/1551
-# Another option is:
-# __all__ = ["random_dates",]
+from typing import TYPE_CHECKING
+
+from volcano_cooking._lazy import lazy_package
+
+if TYPE_CHECKING:
+    from volcano_cooking.modules.create.create_cesm_frc import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.create_data import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.create_dates import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.create_empirical import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.create_ensemble import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.create_frc import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.formats import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.frc_template import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.patch_cesm_frc import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.rewrite_frc_file import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.verify_frc_file import *  # noqa:F401,F403
+    from volcano_cooking.modules.create.write_frc_file import *  # noqa:F401,F403
+
+lazy_package(
+    __name__,
+    {
+        "create_cesm_frc": ("CesmFrc", "make_cesm_frc", "find_coords_file"),
+        "create_data": (
+            "Data",
+            "ChunkedData",
+            "Generate",
+            "GenerateChunked",
+            "GenerateRandomNormal",
+            "GenerateRandomNormalChunked",
+            "GenerateFPP",
+            "GenerateHawkes",
+            "GenerateRegularIntervals",
+            "GenerateSingleVolcano",
+            "GenerateFromFile",
+            "GenerateEmpirical",
+        ),
+        "create_dates": (
+            "COLLISIONS",
+            "single_date_and_emission",
+            "random_dates",
+            "regular_intervals",
+            "fpp_dates_and_emissions",
+            "hawkes_dates_and_emissions",
+            "noleap_dates",
+            "days_to_dates",
+            "from_json",
+        ),
+        "create_empirical": (
+            "CATALOGUE",
+            "EMPIRICAL_VARIABLES",
+            "EmpiricalTables",
+            "empirical_tables",
+        ),
+        "create_ensemble": ("Ensemble",),
+        "create_frc": ("KERNELS", "FrcGenerator", "StdFrc", "Frc", "HawkesFrc"),
+        "formats": ("FRC_FORMATS",),
+        "frc_template": ("template_path", "has_template", "load_template"),
+        "patch_cesm_frc": ("catalogue_diff", "patch_cesm_frc"),
+        "rewrite_frc_file": ("SparseFrc", "ReWrite"),
+        "verify_frc_file": ("frc_mass", "catalogue_mass", "verify_frc"),
+        "write_frc_file": ("FrcWriter", "frc_encoding", "BlockFunc", "map_blocks"),
+    },
+)
@@ -0,0 +1,664 @@
+"""Create the CESM2 `stratvolc` forcing file without going through NCL.
+
+This is a native implementation of the script `createVolcEruptV3.ncl` that is otherwise
+run with `volcano-cooking --run-ncl`. It reads a source file made by `create.Data` and
+writes a forcing file with the same layout as the one made by the NCL script:
+
+- One time record at the start (`date=10101`) and one at the end (`date=99991231`).
+- Four time records per eruption date, with `datesec` set to 43199, 43200, 64799 and
+  64800, i.e. the emission happens over six hours from 12:00 to 18:00 UT.
+- Emission rates in molecules/cm3/s, spread over the altitude levels using the
+  fractional overlap between the injection heights and the altitude intervals.
+
+Contrary to the NCL script, the full four dimensional array is never held in memory.
+Each block of eruptions is computed and written to file before the next one is made,
+and the file is written directly in the CDF5 format accepted by CESM2.
+
+Note
+----
+The date corrections for specific historical eruptions (Askja, Pelee, etc.) found in the
+NCL script are not included, since they only apply to the VolcanEESM data set.
+Eruptions at the same date are added to the same four time records.
+"""
+
+import datetime
+import os
+from collections.abc import Mapping
+from typing import Any, Optional
+
+import numpy as np
+import xarray as xr
+from volcano_cooking.modules import convert
+from volcano_cooking.modules.create.write_frc_file import (
+    FrcWriter,
+    frc_encoding,
+    map_blocks,
+)
+
+_DATESECS = np.array([43199, 43200, 64799, 64800], dtype=np.int32)
+_FILL_DATE = -2147483647
+# Area (km2) of the disc the emission is spread over for VEI 5 and VEI 6 eruptions.
+_VEI5_AREA = 1.20e6
+_VEI6_AREA = 2.76e6
+
+
+class CesmFrc:
+    """Create a forcing file for CESM2 from a file with synthetic volcanoes.
+
+    Parameters
+    ----------
+    in_file : str
+        Path to a netCDF file created by `create.Data`.
+    coords_file : str
+        Path to the coordinate file, e.g. `fv_1.9x2.5_L30.nc`.
+    res : str
+        Name of the horizontal resolution, used in the output file name.
+    first_year : int
+        Eruptions before this year are not included.
+    last_year : int
+        Eruptions after this year are not included.
+    alt_reduction : bool
+        Reduce the altitude range to 18-20 km for eruptions with more than 3.5 Tg SO2
+        and maximum injection height above 20 km.
+    mass_scaling : bool
+        Scale the SO2 mass of eruptions with more than 15 Tg SO2 by a factor 1/1.8.
+    vei_spread : bool
+        Spread the emission of VEI 5 and VEI 6 eruptions over all grid columns within a
+        disc of 1.20e6 km2 and 2.76e6 km2, respectively, centred on the grid column of
+        the eruption.
+    pin_min_lat : Optional[float]
+        Spread the emission of Pinatubo over all latitudes from `pin_min_lat` to the
+        latitude of the eruption.
+
+    Attributes
+    ----------
+    make_dataset : method
+        Compute the time axis, grid columns, emission rates and vertical profiles of all
+        eruptions.
+    save_to_file : method
+        Write the forcing file one block of eruptions at a time.
+    """
+
+    def __init__(
+        self,
+        in_file: str,
+        coords_file: str,
+        res: str = "2deg",
+        first_year: int = 850,
+        last_year: int = 2016,
+        alt_reduction: bool = True,
+        mass_scaling: bool = False,
+        vei_spread: bool = False,
+        pin_min_lat: Optional[float] = None,
+    ) -> None:
+        if not os.path.exists(in_file):
+            raise FileNotFoundError(f"Cannot find file named {in_file}.")
+        if not os.path.exists(coords_file):
+            raise FileNotFoundError(
+                f"{coords_file} not found. Consult README on how to download."
+            )
+        self.in_file = in_file
+        self.coords_file = coords_file
+        self.res = res
+        self.first_year = first_year
+        self.last_year = last_year
+        self.alt_reduction = alt_reduction
+        self.mass_scaling = mass_scaling
+        self.vei_spread = vei_spread
+        self.pin_min_lat = pin_min_lat
+        self.altitude = np.linspace(0, 29, 30, dtype=np.float32)
+        self.altitude_int = np.linspace(-0.5, 29.5, 31, dtype=np.float32)
+        self.data_summary = "\nEach day of eruption, the emission occurs over 6 hours from 1200 to 1800UT."
+
+    def _load_grid(self) -> None:
+        self.geometry = convert.GridGeometry.from_file(self.coords_file)
+        self.lat = self.geometry.lat
+        self.lon = self.geometry.lon
+        self.lat_attrs = self.geometry.lat_attrs
+        self.lon_attrs = self.geometry.lon_attrs
+        # Area of each grid column in cm2, only depending on latitude.
+        self.column_area = self.geometry.column_area
+
+    def _load_catalogue(self) -> None:
+        with xr.open_dataset(self.in_file, decode_times=False) as f:
+            self.tes = f["Total_Emission"].data.astype(np.float64)
+            self.veis = f["VEI"].data.astype(np.int32)
+            self.yoes = f["Year_of_Emission"].data.astype(np.int64)
+            self.moes = f["Month_of_Emission"].data.astype(np.int64)
+            self.does = f["Day_of_Emission"].data.astype(np.int64)
+            self.lats = f["Latitude"].data.astype(np.float64)
+            self.lons = f["Longitude"].data.astype(np.float64)
+            self.tops = f["Maximum_Injection_Height"].data.astype(np.float64)
+            self.bots = f["Minimum_Injection_Height"].data.astype(np.float64)
+            names = f["Eruption"].attrs.get("Volcano_Name", "")
+        names_arr = np.array([n.strip() for n in str(names).split(",")])
+        self.names = (
+            names_arr if len(names_arr) == len(self.tes) else np.full(len(self.tes), "")
+        )
+
+    def _adjust_catalogue(self) -> None:
+        in_range = (self.yoes >= self.first_year) & (self.yoes <= self.last_year)
+        if self.alt_reduction:
+            # Adjust altitude range for SO2 >= 3.5 Tg if max altitude > 20 km
+            idx = (self.tes >= 3.5) & (self.tops > 20.0) & in_range  # noqa: PLR2004
+            self.tops[idx] = 20.0
+            self.bots[idx] = np.minimum(self.bots[idx], 18.0)
+            self.data_summary += (
+                "\nAltitude range adjusted for SO2>3.5Tg if max altitude > 20 km."
+            )
+        if self.mass_scaling:
+            idx = (self.tes >= 15) & in_range  # noqa: PLR2004
+            self.tes[idx] *= 1 / 1.8
+            self.data_summary += (
+                "\nFor eruptions with SO2>15Tg, mass scaled by factor 0.5555556"
+            )
+        else:
+            self.data_summary += (
+                "\nNo SO2 mass scaling is included; all masses are as provided by "
+                + "volcano-cooking."
+            )
+        if self.vei_spread:
+            self.data_summary += (
+                "\nEmission area depends on volcanic explosivity index (VEI) as follows:"
+                + "\n  VEI <= 4 : 1 column"
+                + f"\n  VEI  = 5 : {_VEI5_AREA:.2e} km2 circle centered on volcano"
+                + f"\n  VEI  = 6 : {_VEI6_AREA:.2e} km2 circle centered on volcano"
+            )
+        self.data_summary += "\nNo SO2 loss based on volcanic explosivity index (VEI)."
+        if not self.vei_spread:
+            self.data_summary += (
+                "\nAll volcanic emissions occur in 1 column (no VEI-based spreading)."
+            )
+        # Shift longitude from -180,180 to 0,360
+        self.lons = np.where(self.lons >= 0, self.lons, self.lons + 360.0)
+        keep = (self.tes > 0) & in_range
+        for attr in (
+            "tes",
+            "veis",
+            "yoes",
+            "moes",
+            "does",
+            "lats",
+            "lons",
+            "tops",
+            "bots",
+            "names",
+        ):
+            setattr(self, attr, getattr(self, attr)[keep])
+        # Make sure minimum heights are actually smaller than maximum heights
+        self.tops, self.bots = (
+            np.maximum(self.tops, self.bots),
+            np.minimum(self.tops, self.bots),
+        )
+
+    def make_dataset(self) -> None:
+        """Compute everything that goes into the forcing file.
+
+        Raises
+        ------
+        ValueError
+            If the eruption dates are not in order, if any eruption is placed outside of
+            the valid range of latitudes and longitudes, or if the vertical profile of
+            any eruption does not conserve the emitted mass.
+        """
+        self._load_grid()
+        self._load_catalogue()
+        self._adjust_catalogue()
+        dates = 10000 * self.yoes + 100 * self.moes + self.does
+        if np.any(np.diff(dates) < 0):
+            raise ValueError("Eruption dates are out of order.")
+        bad = (
+            (self.lons < 0)
+            | (self.lons >= 360)  # noqa: PLR2004
+            | (self.lats > 90)  # noqa: PLR2004
+            | (self.lats < -90)  # noqa: PLR2004
+        )
+        if np.any(bad):
+            raise ValueError(
+                f"Latitude or longitude out of range for eruptions at {dates[bad]}."
+            )
+        # Eruptions at the same date share the same four time records.
+        self.block_dates, self.blocks = np.unique(dates, return_inverse=True)
+        n_blocks = len(self.block_dates)
+        self.date = np.empty(4 * n_blocks + 2, dtype=np.int32)
+        self.datesec = np.empty(4 * n_blocks + 2, dtype=np.int32)
+        self.date[0], self.datesec[0] = 10101, 1800
+        self.date[1:-1] = np.repeat(self.block_dates, 4)
+        self.datesec[1:-1] = np.tile(_DATESECS, n_blocks)
+        self.date[-1], self.datesec[-1] = 99991231, 23 * 3600 + 1800
+
+        # Grid column closest to each eruption
+        self.lat_idx, self.lon_idx = self.geometry.nearest(self.lats, self.lons)
+        self.__spread_columns()
+        self.total_area = np.bincount(
+            np.repeat(np.arange(len(self.tes)), self.n_cols),
+            weights=self.column_area[self.col_lat],
+            minlength=len(self.tes),
+        )
+        # The mass is already scaled with the rest of the catalogue
+        self.column_emis = convert.adjust_emissions(
+            self.tes, self.total_area, mass_scaling=False
+        )  # molec/cm2/s
+        depth = (self.tops - self.bots) * 1e5  # emission depth in cm
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.emis_rate = self.column_emis / depth  # molec/cm3/s
+
+        # Fraction of each altitude interval covered by the injection heights.
+        self.factors, _ = convert.altitude_overlap(
+            self.bots, self.tops, self.altitude_int, fallback_levels=0
+        )
+        self.__check_mass()
+        self.__make_summary(dates)
+
+    def __spread_columns(self) -> None:
+        """Find the grid columns of each eruption.
+
+        The columns of eruption `i` are `col_lat[col_ptr[i] : col_ptr[i + 1]]` and
+        `col_lon[col_ptr[i] : col_ptr[i + 1]]`.
+        """
+        size = len(self.tes)
+        radius = np.zeros(size)
+        if self.vei_spread:
+            radius[self.veis == 5] = np.sqrt(_VEI5_AREA / np.pi)  # noqa: PLR2004
+            radius[self.veis >= 6] = np.sqrt(_VEI6_AREA / np.pi)  # noqa: PLR2004
+        pin = np.zeros(size, dtype=bool)
+        self.min_lats = self.lats.copy()
+        if self.pin_min_lat is not None:
+            pin = np.char.find(self.names.astype(str), "Pinatubo") >= 0
+            self.min_lats[pin] = self.pin_min_lat
+            radius[pin] = 0.0
+        # (eruptions, lat indices, lon indices) of eruptions with more than one column
+        groups: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        # Eruptions from the same grid column share the same disc, so each disc is
+        # only found once.
+        disc = np.nonzero(radius > 0)[0]
+        keys, inverse = np.unique(
+            np.stack([self.lat_idx[disc], self.lon_idx[disc], radius[disc]], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        for u, (lat_i, lon_i, r) in enumerate(keys):
+            lat_c, lon_c = self.geometry.disc(int(lat_i), int(lon_i), r)
+            groups.append((disc[inverse.ravel() == u], lat_c, lon_c))
+        # Pinatubo is spread over all latitudes from the minimum latitude
+        for i in np.nonzero(pin)[0]:
+            lo, hi = sorted((self.min_lats[i], self.lats[i]))
+            band = np.nonzero((self.lat >= lo) & (self.lat <= hi))[0]
+            band = np.union1d(band, [self.lat_idx[i]])
+            groups.append((np.array([i]), band, np.full(len(band), self.lon_idx[i])))
+        self.n_cols = np.ones(size, dtype=np.int64)
+        for members, lat_c, _ in groups:
+            self.n_cols[members] = len(lat_c)
+        self.col_ptr = np.concatenate(([0], np.cumsum(self.n_cols)))
+        # Eruptions in a single column are the first and only column of their range
+        self.col_lat = np.repeat(self.lat_idx, self.n_cols)
+        self.col_lon = np.repeat(self.lon_idx, self.n_cols)
+        for members, lat_c, lon_c in groups:
+            pos = self.col_ptr[members][:, None] + np.arange(len(lat_c))
+            self.col_lat[pos] = lat_c
+            self.col_lon[pos] = lon_c
+
+    def __check_mass(self) -> None:
+        # Integrate the column, vertical resolution 1 km = 1e5 cm
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sum_emis = self.emis_rate * self.factors.sum(axis=1).A1 * 1e5
+            ratio = sum_emis / self.column_emis
+        bad = ~(np.abs(ratio - 1.0) < 1e-6)  # noqa: PLR2004
+        if np.any(bad):
+            lines = [
+                f"    {d:08d} columnEmis={c:7.3e} sumEmis={s:7.3e} ratio={r} "
+                + f"Bot={b} Top={t}"
+                for d, c, s, r, b, t in zip(
+                    self.block_dates[self.blocks[bad]],
+                    self.column_emis[bad],
+                    sum_emis[bad],
+                    ratio[bad],
+                    self.bots[bad],
+                    self.tops[bad],
+                )
+            ]
+            raise ValueError("Emission mismatch:\n" + "\n".join(lines))
+
+    def __make_summary(self, dates: np.ndarray) -> None:
+        spread = self.vei_spread or self.pin_min_lat is not None
+        header = "\nYYYYMMDD  MinLat  Lat    Lon     AltMin AltMax SO2(Tg) VEI nCol  "
+        if not spread:
+            header = "\nYYYYMMDD  Lat    Lon     AltMin AltMax SO2(Tg) VEI "
+        self.data_summary += (
+            "\n"
+            + "=" * 70
+            + "\nThis file is for the following volcanoes:"
+            + header
+            + "Area(km2) Em(cm-3s-1) Name"
+        )
+        self.data_summary += "".join(
+            f"\n{d:08d} "
+            + (f"{ml:7.3f} " if spread else "")
+            + f"{la:7.3f} {lo:7.3f} {b:6.3f} {t:6.3f} {te:7.4f}  {v}  "
+            + (f" {c:3d}  " if spread else "")
+            + f"{a / 1e10:7.3e} {e:9.5e} {n}"
+            for d, ml, la, lo, b, t, te, v, c, a, e, n in zip(
+                dates,
+                self.min_lats,
+                self.lats,
+                self.lons,
+                self.bots,
+                self.tops,
+                self.tes,
+                self.veis,
+                self.n_cols,
+                self.total_area,
+                self.emis_rate,
+                self.names,
+            )
+        )
+
+    def out_file_name(self) -> str:
+        """Return the file name used by the NCL script.
+
+        Returns
+        -------
+        str
+            The name of the output file, without the directory
+        """
+        name = f"VolcanEESMv3.11Enger_SO2_{self.first_year}-{self.last_year}"
+        if self.mass_scaling:
+            name += "_Mscale"
+        if self.alt_reduction:
+            name += "_Zreduc"
+        if self.vei_spread:
+            name += "_VEIspread"
+        pin = self.min_lats != self.lats if hasattr(self, "min_lats") else []
+        if np.any(pin):
+            lats = (self.min_lats[pin][0], self.lats[pin][0])
+            name += "_Pin" + "-".join(
+                f"{abs(la):2.0f}".strip() + ("N" if la >= 0 else "S") for la in lats
+            )
+        now = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        return f"{name}_{self.res}_c{now}.nc"
+
+    def save_to_file(
+        self,
+        out_dir: str = os.path.join("data", "cesm"),
+        workers: int = 1,
+        out_format: str = "cdf5",
+    ) -> str:
+        """Write the forcing file, one block of eruptions at a time.
+
+        Parameters
+        ----------
+        out_dir : str
+            Directory where the forcing file is saved.
+        workers : int
+            Number of processes used to compute the blocks.
+        out_format : str
+            Output format, one of `FRC_FORMATS`. The default is the CDF5 format used
+            by the NCL script.
+
+        Returns
+        -------
+        str
+            The path to the created file
+
+        Raises
+        ------
+        ValueError
+            If the dataset have not yet been created.
+        """
+        if not hasattr(self, "factors"):
+            raise ValueError("You must make the dataset with 'make_dataset' first.")
+        os.makedirs(out_dir, exist_ok=True)
+        out_file = os.path.join(out_dir, self.out_file_name())
+        template = self.__make_template(out_file)
+        # No grid cell can get more than the sum of all eruptions at the same date.
+        vmax = float(
+            np.max(np.bincount(self.blocks, weights=self.emis_rate), initial=0)
+        )
+        nc_format, stratvolc = frc_encoding(
+            out_format, template["stratvolc"].shape[1:], vmax=vmax
+        )
+        encoding = {
+            "stratvolc": stratvolc,
+            "date": {"_FillValue": _FILL_DATE},
+            "datesec": {"_FillValue": _FILL_DATE},
+        }
+        with FrcWriter(out_file, template, format=nc_format, encoding=encoding) as w:
+            zeros = np.zeros((1, *template["stratvolc"].shape[1:]), dtype=np.float32)
+            w.append(stratvolc=zeros, date=self.date[:1], datesec=self.datesec[:1])
+            # Four time records per block of eruptions at the same date
+            step = max(1, w.block_size // 4)
+            n_blocks = len(self.block_dates)
+            bounds = [(b0, min(b0 + step, n_blocks)) for b0 in range(0, n_blocks, step)]
+            state = {
+                "factors": self.factors,
+                "blocks": self.blocks,
+                "emis_rate": self.emis_rate,
+                "n_cols": self.n_cols,
+                "col_ptr": self.col_ptr,
+                "col_lat": self.col_lat,
+                "col_lon": self.col_lon,
+            }
+            slabs = map_blocks(
+                _make_slab,
+                state,
+                bounds,
+                lambda b0, b1: (4 * (b1 - b0), *zeros.shape[1:]),
+                workers=workers,
+            )
+            for (b0, b1), slab in zip(bounds, slabs):
+                w.append(
+                    stratvolc=slab,
+                    date=self.date[1 + 4 * b0 : 1 + 4 * b1],
+                    datesec=self.datesec[1 + 4 * b0 : 1 + 4 * b1],
+                )
+            w.append(stratvolc=zeros, date=self.date[-1:], datesec=self.datesec[-1:])
+        return out_file
+
+    def _global_attrs(self, out_file: str) -> dict[str, str]:
+        """Return the global attributes of the forcing file."""
+        nl = "\n"
+        first = f"{self.yoes[0]}.{self.moes[0]}.{self.does[0]}"
+        last = f"{self.yoes[-1]}.{self.moes[-1]}.{self.does[-1]}"
+        return {
+            "data_summary": self.data_summary,
+            "input_method": "SERIAL",
+            "data_script": nl
+            + "Converted from data_source_files by the volcano-cooking python "
+            + "package, a port of createVolcEruptV3.ncl"
+            + nl
+            + "SVN path to original: "
+            + "https://svn.code.sf.net/p/codescripts/code/trunk/ncl/emission"
+            + nl
+            + "Found in repository: https://github.com/engeir/volcano-cooking",
+            "cesm_contact": nl + "Mike Mills, NCAR ACOM, mmills@ucar.edu",
+            "creation_date": nl + datetime.datetime.now().strftime("%a %b %d %X %Y"),
+            "data_source_files": nl + self.in_file,
+            "data_source_url": nl
+            + "This file was generated from volcano-cooking at "
+            + "https://github.com/engeir/volcano-cooking",
+            "data_creator": nl
+            + "Mike Mills, NCAR ACOM, mmills@ucar.edu"
+            + nl
+            + "Eirik Rolland Enger, University of Tromsø, eirik.r.enger@uit.no, "
+            + "synthetic eruption database",
+            "title": nl + f"SO2 emissions from stratospheric volcanoes, {first}-{last}",
+            "filename": nl + os.path.basename(out_file),
+        }
+
+    def __make_template(self, out_file: str) -> xr.Dataset:
+        """Make a dataset with the dimensions, coordinates and attributes of the file."""
+        shape = (0, len(self.altitude), len(self.lat), len(self.lon))
+        return xr.Dataset(
+            data_vars={
+                "date": (
+                    ["time"],
+                    np.empty(0, dtype=np.int32),
+                    {"long_name": "date", "units": "YYYYMMDD", "standard_name": "date"},
+                ),
+                "datesec": (
+                    ["time"],
+                    np.empty(0, dtype=np.int32),
+                    {
+                        "long_name": "datesec",
+                        "units": "seconds since midnight",
+                        "standard_name": "datesec",
+                    },
+                ),
+                "stratvolc": (
+                    ["time", "altitude", "lat", "lon"],
+                    np.empty(shape, dtype=np.float32),
+                    {
+                        "long_name": "SO2 elevated emissions from explosive volcanoes",
+                        "units": "molecules/cm3/s",
+                        "standard_name": "SO2 elevated emissions from explosive "
+                        + "volcanoes",
+                    },
+                ),
+            },
+            coords={
+                "altitude_int": (
+                    ["altitude_int"],
+                    self.altitude_int,
+                    {
+                        "long_name": "altitude interval",
+                        "units": "km",
+                        "standard_name": "altitude interval",
+                    },
+                ),
+                "altitude": (
+                    ["altitude"],
+                    self.altitude,
+                    {
+                        "long_name": "altitude midlevel",
+                        "units": "km",
+                        "standard_name": "altitude midlevel",
+                    },
+                ),
+                "lat": (["lat"], self.lat, self.lat_attrs),
+                "lon": (["lon"], self.lon, self.lon_attrs),
+            },
+            attrs=self._global_attrs(out_file),
+        )
+
+
+def _make_slab(state: Mapping[str, Any], b0: int, b1: int, out: np.ndarray) -> None:
+    """Fill `out` with the `stratvolc` time records of blocks `b0` to `b1`."""
+    blocks, n_cols, col_ptr = state["blocks"], state["n_cols"], state["col_ptr"]
+    slab = np.zeros((b1 - b0, *out.shape[1:]), dtype=np.float64)
+    # Eruptions are sorted by date, and so by block
+    sel = np.arange(*np.searchsorted(blocks, [b0, b1]))
+    factors = state["factors"][sel].tocoo()
+    e = sel[factors.row]
+    # Repeat each (eruption, level) pair for all the columns of the eruption
+    n = n_cols[e]
+    rep = np.repeat(np.arange(len(e)), n)
+    cols = col_ptr[e][rep] + np.arange(len(rep)) - np.repeat(np.cumsum(n) - n, n)
+    np.add.at(
+        slab,
+        (
+            blocks[e][rep] - b0,
+            factors.col[rep],
+            state["col_lat"][cols],
+            state["col_lon"][cols],
+        ),
+        (state["emis_rate"][e] * factors.data)[rep],
+    )
+    out[1::4] = slab
+    out[2::4] = slab
+
+
+def make_cesm_frc(
+    in_file: Optional[str] = None,
+    res: Optional[str] = None,
+    coords_file: Optional[str] = None,
+    out_dir: Optional[str] = None,
+    vei_spread: bool = False,
+    pin_min_lat: Optional[float] = None,
+    workers: int = 1,
+    out_format: str = "cdf5",
+) -> str:
+    """Create a forcing file for CESM2 from the last created synthetic volcanoes.
+
+    The defaults are the same as those used by `volcano-cooking --run-ncl`, and can be
+    set with the environment variables `RES`, `COORDS1DEG`, `COORDS2DEG` and
+    `DATA_OUT`.
+
+    Parameters
+    ----------
+    in_file : Optional[str]
+        Source file created by `create.Data`. The last created file is used by default.
+    res : Optional[str]
+        Horizontal resolution, either '1deg' or '2deg'.
+    coords_file : Optional[str]
+        Coordinate file to use. Found from `res` by default.
+    out_dir : Optional[str]
+        Directory where the forcing file is saved.
+    vei_spread : bool
+        Spread VEI 5 and VEI 6 eruptions over several grid columns.
+    pin_min_lat : Optional[float]
+        Spread Pinatubo over all latitudes from `pin_min_lat` to its own latitude.
+    workers : int
+        Number of processes used to compute the forcing.
+    out_format : str
+        Output format, one of `FRC_FORMATS`.
+
+    Returns
+    -------
+    str
+        The path to the created file
+
+    Raises
+    ------
+    ValueError
+        If the resolution is not recognised.
+    """
+    # The helper scripts pull in matplotlib, so only import them when needed.
+    import volcano_cooking.helper_scripts.functions as fnc
+
+    in_file = fnc.find_last_output("nc") if in_file is None else in_file
+    res, coords_file = find_coords_file(res, coords_file)
+    if out_dir is None:
+        out_dir = os.environ.get("DATA_OUT", os.path.join("data", "cesm"))
+    frc = CesmFrc(
+        in_file, coords_file, res=res, vei_spread=vei_spread, pin_min_lat=pin_min_lat
+    )
+    frc.make_dataset()
+    return frc.save_to_file(out_dir, workers=workers, out_format=out_format)
+
+
+def find_coords_file(
+    res: Optional[str] = None, coords_file: Optional[str] = None
+) -> tuple[str, str]:
+    """Find the resolution and coordinate file, as done by `volcano-cooking --run-ncl`.
+
+    Parameters
+    ----------
+    res : Optional[str]
+        Horizontal resolution, either '1deg' or '2deg'. Read from the environment
+        variable `RES` by default.
+    coords_file : Optional[str]
+        Coordinate file to use. Read from the environment variables `COORDS1DEG` or
+        `COORDS2DEG` by default.
+
+    Returns
+    -------
+    tuple[str, str]
+        The resolution and the path to the coordinate file
+
+    Raises
+    ------
+    ValueError
+        If the resolution is not recognised.
+    """
+    res = os.environ.get("RES", "2deg") if res is None else res
+    if coords_file is not None:
+        return res, coords_file
+    if res in ("2deg", "1.9x2.5"):
+        return res, os.environ.get(
+            "COORDS2DEG", os.path.join("data", "originals", "fv_1.9x2.5_L30.nc")
+        )
+    if res in ("1deg", "0.95x1.25"):
+        return res, os.environ.get(
+            "COORDS1DEG", os.path.join("data", "originals", "fv_0.9x1.25_L30.nc")
+        )
+    raise ValueError(f"Illegal value for resolution: {res}")
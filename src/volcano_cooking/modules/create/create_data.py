@@ -5,16 +5,54 @@ import json
 import os
 import sys
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from typing import Optional
 
+import netCDF4
 import numpy as np
 import xarray as xr
 from volcano_cooking.modules import convert, create
 
+# Number of eruptions in each chunk of the variables in large catalogues
+_CHUNK = 2**16
+# Names of the arrays of a catalogue, in the same order as the input to `Data`
+_ARRAYS = (
+    "eruptions",
+    "yoes",
+    "moes",
+    "does",
+    "lats",
+    "lons",
+    "tes",
+    "veis",
+    "miihs",
+    "mxihs",
+)
+_GLOBAL_ATTRS = dict(
+    Creator="Eirik R. Enger",
+    DOI="#####",
+    Citation="#####",
+    Notes="Emissions source file created with the `volcano-cooking` python package.",
+)
+# Volcano number, name and references of the `Eruption` variable in large catalogues,
+# where one entry per eruption would take up much of the file
+_PLACEHOLDER_ATTRS: dict[str, object] = dict(
+    Volcano_Number=123456,
+    Volcano_Name="N",
+    Notes_and_References="N",
+)
+
 
 class Data:
     """Create data for a volcanic forcing file.
 
+    By default, the arrays must have the data types of the forcing files used within
+    CESM2. With `large`, eruption numbers and years can also be int32, for catalogues
+    with more eruptions or years than fit in the CESM2 data types. The narrow CESM2 data
+    types are still used in the file when all values fit, and the variables are
+    stored in chunks. The volcano numbers and names of the `Eruption` variable are then
+    a single placeholder, as in `ChunkedData`.
+
     Parameters
     ----------
     eruptions : np.ndarray
@@ -37,6 +75,8 @@ class Data:
         Minimum injection height
     mxihs : np.ndarray
         Maximum injection height
+    large : bool
+        Allow int32 eruption numbers and years.
 
     Attributes
     ----------
@@ -60,7 +100,10 @@ class Data:
         veis: np.ndarray,
         miihs: np.ndarray,
         mxihs: np.ndarray,
+        *,
+        large: bool = False,
     ) -> None:
+        self.large = large
         self.eruptions = eruptions
         self.yoes = yoes
         self.moes = moes
@@ -78,7 +121,9 @@ class Data:
         """Check the data type of each numpy array.
 
         The original netCDF file that is re-produced has specific data types on all data
-        arrays. This method checks to see if the types are set correctly.
+        arrays. This method checks to see if the types are set correctly. With `large`,
+        eruption numbers and years are first made int8 and int16 if their values fit,
+        and int32 otherwise.
 
         Raises
         ------
@@ -102,8 +147,12 @@ class Data:
             raise ValueError(f"The arrays have different shapes:\n{stack}")
         else:
             del stack
+        wide = (np.int32,) if self.large else ()
+        if self.large:
+            self.eruptions = _narrow(self.eruptions, np.int8, np.int32)
+            self.yoes = _narrow(self.yoes, np.int16, np.int32)
         if (
-            self.eruptions.dtype != np.int8
+            self.eruptions.dtype not in (np.int8, *wide)
             or self.veis.dtype != np.int8
             or self.moes.dtype != np.int8
             or self.does.dtype != np.int8
@@ -114,7 +163,7 @@ class Data:
                 + f"self.moes.dtype = {self.moes.dtype}, "
                 + f"self.does.dtype = {self.does.dtype}. All must be int8."
             )
-        if self.yoes.dtype != np.int16:
+        if self.yoes.dtype not in (np.int16, *wide):
             raise ValueError(f"{self.yoes.dtype} = . Need int16.")
         if (
             self.tes.dtype != np.float32
@@ -147,29 +196,29 @@ class Data:
                 Minimum_Injection_Height=(["Eruption_Number"], self.miihs),
             ),
             # Global attributes
-            attrs=dict(
-                Creator="Eirik R. Enger",
-                DOI="#####",
-                Citation="#####",
-                Notes="Emissions source file created with the `volcano-cooking` python package.",
-            ),
+            attrs=dict(_GLOBAL_ATTRS),
         )
 
         size = len(self.yoes)
-        # Names are unimportant. The real data set would list the name of the volcano
-        # here, e.g. Mt. Pinatubo.
-        names = "".join("N, " for _ in range(size))
-        names = names[:-2]  # Removing the last comma and whitespace
         self.my_frc.Longitude.encoding["_FillValue"] = False
-        self.my_frc["Eruption"] = self.my_frc.Eruption.assign_attrs(
-            # The volcano number is a reference to the geographical location of the
-            # eruption. The volcano name is its name and the note/reference is where in
-            # the literature you can find the values related to the eruption. All this is
-            # unimportant given that this is just made up data.
-            Volcano_Number=np.ones(size) * 123456,
-            Volcano_Name=names,
-            Notes_and_References=names,
-        )
+        if self.large:
+            self.my_frc["Eruption"] = self.my_frc.Eruption.assign_attrs(
+                _PLACEHOLDER_ATTRS
+            )
+        else:
+            # Names are unimportant. The real data set would list the name of the
+            # volcano here, e.g. Mt. Pinatubo.
+            names = "".join("N, " for _ in range(size))
+            names = names[:-2]  # Removing the last comma and whitespace
+            self.my_frc["Eruption"] = self.my_frc.Eruption.assign_attrs(
+                # The volcano number is a reference to the geographical location of the
+                # eruption. The volcano name is its name and the note/reference is where
+                # in the literature you can find the values related to the eruption.
+                # All this is unimportant given that this is just made up data.
+                Volcano_Number=np.ones(size) * 123456,
+                Volcano_Name=names,
+                Notes_and_References=names,
+            )
         self.my_frc["VEI"] = self.my_frc.VEI.assign_attrs(
             Notes="Volcanic_Explosivity_Index_based_on_Global_Volcanism_Program"
         )
@@ -191,21 +240,26 @@ class Data:
             )
         )
 
-    def save_to_file(self) -> None:
+    def save_to_file(self, *, name: str = "synthetic_volcanoes") -> None:
         """Save the xarray Dataset object to a .nc file using the netCDF4 format.
 
         For easier access to the forcing data, dates and total emissions are also saved to
         a .npz file.
+
+        Parameters
+        ----------
+        name : str
+            The file name, which is followed by the date and time of creation.
         """
-        self.__save_to_nc_file()
-        self.__save_to_npz_file()
+        self.__save_to_nc_file(name)
+        self.__save_to_npz_file(name)
 
-    def __save_to_npz_file(self) -> None:
+    def __save_to_npz_file(self, name: str) -> None:
         """Save the original forcing data to a .npz file."""
-        out_file = self.check_dir("npz")
+        out_file = self.check_dir("npz", name=name)
         np.savez(out_file, yoes=self.yoes, moes=self.moes, does=self.does, tes=self.tes)
 
-    def __save_to_nc_file(self) -> None:
+    def __save_to_nc_file(self, name: str) -> None:
         """Save the xarray Dataset object to a .nc file using the netCDF4 format.
 
         Raises
@@ -216,7 +270,11 @@ class Data:
         """
         if not hasattr(self, "my_frc"):
             raise ValueError("You must make the dataset with 'make_dataset' first.")
-        out_file = self.check_dir("nc")
+        out_file = self.check_dir("nc", name=name)
+        if self.large:
+            chunk = (min(_CHUNK, max(1, len(self.yoes))),)
+            for var in self.my_frc.data_vars.values():
+                var.encoding["chunksizes"] = chunk
         # The format is important for when you give the .nc file to the .ncl script that
         # creates the final forcing file.
         self.my_frc.to_netcdf(out_file, "w", format="NETCDF4")
@@ -250,6 +308,117 @@ class Data:
         return out_file
 
 
+class ChunkedData:
+    """Write a catalogue made in chunks to a netCDF file, one chunk at a time.
+
+    The file has the same variables as those written by `Data`, and each chunk is
+    appended along an unlimited `Eruption_Number` dimension, so that only one chunk is
+    held in memory. Each chunk is checked by `Data`. Since the later chunks are not
+    known when the file is created, eruption numbers and years are always int32 in
+    large catalogues, and the volcano numbers and names of the `Eruption` variable are
+    a single placeholder. No .npz file is written.
+
+    Parameters
+    ----------
+    chunks : Iterable[list[np.ndarray]]
+        The arrays of each chunk, in the same order as the input to `Data`, e.g. from
+        `GenerateChunked.iter_chunks`.
+    large : bool
+        Allow int32 eruption numbers and years.
+
+    Attributes
+    ----------
+    save_to_file : method
+        Write all chunks to a .nc file.
+    size : int
+        The number of eruptions written, after `save_to_file`.
+    """
+
+    # Variables of the file, with the index of their array in the input to `Data`
+    _VARIABLES: tuple[tuple[str, int, dict[str, object]], ...] = (
+        ("Eruption", 0, _PLACEHOLDER_ATTRS),
+        (
+            "VEI",
+            7,
+            {"Notes": "Volcanic_Explosivity_Index_based_on_Global_Volcanism_Program"},
+        ),
+        ("Year_of_Emission", 1, {}),
+        ("Month_of_Emission", 2, {}),
+        ("Day_of_Emission", 3, {}),
+        ("Latitude", 4, {"Units": "-90_to_+90"}),
+        ("Longitude", 5, {"Units": "Degrees_East"}),
+        ("Total_Emission", 6, {"Units": "Tg_of_SO2"}),
+        ("Maximum_Injection_Height", 9, {"Units": "km_above_mean_sea_level"}),
+        ("Minimum_Injection_Height", 8, {"Units": "km_above_mean_sea_level"}),
+    )
+
+    def __init__(
+        self, chunks: Iterable[list[np.ndarray]], *, large: bool = False
+    ) -> None:
+        self.chunks = chunks
+        self.large = large
+        self.size = 0
+
+    def save_to_file(self, *, name: str = "synthetic_volcanoes") -> str:
+        """Write all chunks to a .nc file using the netCDF4 format.
+
+        Parameters
+        ----------
+        name : str
+            The file name, which is followed by the date and time of creation.
+
+        Returns
+        -------
+        str
+            The path of the file
+        """
+        out_file = Data.check_dir("nc", name=name)
+        with netCDF4.Dataset(out_file, "w", format="NETCDF4") as f:
+            f.createDimension("Eruption_Number", None)
+            f.setncatts(_GLOBAL_ATTRS)
+            variables = None
+            for chunk in self.chunks:
+                data = Data(*chunk, large=self.large)
+                arrs = [getattr(data, a) for a in _ARRAYS]
+                if variables is None:
+                    variables = [
+                        (self._create_variable(f, var, arrs[i], attrs), i)
+                        for var, i, attrs in self._VARIABLES
+                    ]
+                for var, i in variables:
+                    var[self.size : self.size + len(arrs[i])] = arrs[i]
+                self.size += len(arrs[0])
+        return out_file
+
+    def _create_variable(
+        self, f: netCDF4.Dataset, name: str, arr: np.ndarray, attrs: dict
+    ) -> netCDF4.Variable:
+        """Create a variable with the data type and attributes used by `Data`."""
+        dtype = arr.dtype
+        if self.large and name in ("Eruption", "Year_of_Emission"):
+            dtype = np.dtype(np.int32)
+        # As with xarray, floats are filled with NaN, except the longitude
+        fill = np.nan if dtype.kind == "f" and name != "Longitude" else False
+        var = f.createVariable(
+            name,
+            dtype,
+            ("Eruption_Number",),
+            chunksizes=(min(_CHUNK, max(1, len(arr))),),
+            fill_value=fill,
+        )
+        var.setncatts(attrs)
+        return var
+
+
+def _narrow(arr: np.ndarray, narrow: type, wide: type) -> np.ndarray:
+    """Cast an integer array to `narrow` if all values fit, and to `wide` otherwise."""
+    if arr.dtype.kind not in "iu":
+        return arr
+    info = np.iinfo(narrow)
+    fits = len(arr) == 0 or (info.min <= arr.min() and arr.max() <= info.max)
+    return arr.astype(narrow if fits else wide, copy=False)
+
+
 class Generate(ABC):
     """ABC for generating data with different properties.
 
@@ -261,9 +430,22 @@ class Generate(ABC):
         The first possible year for a volcanic eruption
     file : Optional[str]
         Path to the json file.
+    rng : convert.SeedLike
+        Random number generator, or a seed for one. All random numbers are drawn from
+        `self.rng`, so that a given seed always gives the same arrays.
+    large : bool
+        Allow int32 years, for catalogues that span more years than fit in int16, or
+        go beyond the year 9999. Use with `Data(..., large=True)`.
     """
 
-    def __init__(self, size: int, init_year: int, file: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        size: int,
+        init_year: int,
+        file: Optional[str] = None,
+        rng: convert.SeedLike = None,
+        large: bool = False,
+    ) -> None:
         self.eruptions: np.ndarray
         self.yoes: np.ndarray
         self.moes: np.ndarray
@@ -277,6 +459,8 @@ class Generate(ABC):
         self.size = size
         self.init_year = init_year
         self.file = file
+        self.rng = np.random.default_rng(rng)
+        self.large = large
 
     @abstractmethod
     def gen_dates_totalemission_vei(self) -> None:
@@ -302,7 +486,9 @@ class Generate(ABC):
         (maximum) injection height.
         """
         if not hasattr(self, "miihs") and not hasattr(self, "mxihs"):
-            self.miihs, self.mxihs = convert.vei_to_injectionheights(self.veis)
+            self.miihs, self.mxihs = convert.vei_to_injectionheights(
+                self.veis, rng=self.rng
+            )
             return
         if not hasattr(self, "miihs"):
             self.miihs = np.ones(self.size, dtype=np.float32) * 18
@@ -323,7 +509,7 @@ class Generate(ABC):
         # [1, 2, 3, 4, 4, 4, 5, 5, 6, 7, ...].  Here, the fourth and fifth eruptions
         # lasted long enough and to get more samples in the forcing file. Anyway, its
         # most likely not important, so I just put gibberish in it.
-        self.eruptions = np.random.randint(1, high=20, size=self.size, dtype=np.int8)
+        self.eruptions = self.rng.integers(1, high=20, size=self.size, dtype=np.int8)
 
     def generate(self) -> None:
         """Generate all data arrays needed in the volcanic forcing netCDF file.
@@ -338,11 +524,7 @@ class Generate(ABC):
         self.gen_lat_lon()
         self.gen_injection_heights()
         # Make sure minimum heights are actually smaller than maximum heights
-        for idx, (i, j) in enumerate(zip(self.miihs, self.mxihs)):
-            self.miihs[idx] = min(i, j)
-            self.mxihs[idx] = max(i, j)
-        self.mxihs = self.mxihs.astype(np.float32)
-        self.miihs = self.miihs.astype(np.float32)
+        self.miihs, self.mxihs = convert.order_injection_heights(self.miihs, self.mxihs)
         if self.file is None:
             # Shift first eruption to occur before initial year
             self.yoes -= abs(self.init_year - self.yoes[0]) + 1
@@ -380,28 +562,198 @@ class Generate(ABC):
         return arrs
 
 
+class GenerateChunked(Generate):
+    """ABC for generating catalogues a fixed number of eruptions at a time.
+
+    `iter_chunks` yields the arrays of `chunk` eruptions at a time, so that catalogues
+    that do not fit in memory can be written with `ChunkedData`. Subclasses implement
+    `gen_dates_totalemission_vei` to set the dates, total emission and VEI of the next
+    `self.size` eruptions, continuing from the previous chunk. They may lower
+    `self.size` when no more eruptions can be made, which ends the catalogue. The
+    locations, injection heights and eruption numbers are then made for each chunk as in
+    `Generate`, and all chunks are shifted by the same number of years, so that the first
+    eruption occurs before the initial year.
+
+    Parameters
+    ----------
+    size : int
+        The total number of volcanoes
+    init_year : int
+        The first possible year for a volcanic eruption
+    file : Optional[str]
+        Path to the json file.
+    rng : convert.SeedLike
+        Random number generator, or a seed for one.
+    large : bool
+        Allow int32 years, see `Generate`.
+    chunk : int
+        The number of eruptions in each chunk. The last chunk may be smaller.
+
+    Raises
+    ------
+    ValueError
+        If `chunk` is non-positive.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        size: int,
+        init_year: int,
+        file: Optional[str] = None,
+        rng: convert.SeedLike = None,
+        large: bool = False,
+        chunk: int = _CHUNK,
+    ) -> None:
+        super().__init__(size, init_year, file, rng, large)
+        if chunk < 1:
+            raise ValueError(f"{chunk = }, but must be > 0.")
+        self.total = size
+        self.chunk = chunk
+
+    def iter_chunks(self) -> Iterator[list[np.ndarray]]:
+        """Generate the catalogue one chunk at a time.
+
+        Yields
+        ------
+        list[np.ndarray]
+            The arrays of one chunk, in the same order as the input to `Data`
+        """
+        shift = None
+        for start in range(0, self.total, self.chunk):
+            # The defaults of `Generate` are only used for arrays that are not set
+            for a in _ARRAYS:
+                self.__dict__.pop(a, None)
+            size = min(self.chunk, self.total - start)
+            self.size = size
+            self.gen_dates_totalemission_vei()
+            # The catalogue may end early, with fewer eruptions than asked for
+            if self.size == 0:
+                break
+            self.gen_lat_lon()
+            self.gen_injection_heights()
+            self.miihs, self.mxihs = convert.order_injection_heights(
+                self.miihs, self.mxihs
+            )
+            if self.file is None:
+                if shift is None:
+                    shift = abs(self.init_year - self.yoes[0]) + 1
+                self.yoes -= shift
+            self._gen_rest()
+            yield self.get_arrays()
+            if self.size < size:
+                break
+
+    def generate(self) -> None:
+        """Generate all chunks, and join them into the arrays of one catalogue."""
+        arrs = [np.concatenate(a) for a in zip(*self.iter_chunks())]
+        for a, arr in zip(_ARRAYS, arrs):
+            setattr(self, a, arr)
+        self.size = len(self.yoes)
+
+
 class GenerateRandomNormal(Generate):
     """Generate random and normally distributed eruption dates."""
 
     def gen_dates_totalemission_vei(self):
         """Generate random dates, total emission and VEI."""
-        self.yoes, self.moes, self.does = create.random_dates(self.size, self.init_year)
+        self.yoes, self.moes, self.does = create.random_dates(
+            self.size, self.init_year, rng=self.rng, large=self.large
+        )
         # We don't want eruptions that have a VEI greater than 6.
-        self.veis = np.random.normal(4, 1, size=self.size).round().astype(np.int8) % 7
-        self.tes = convert.vei_to_totalemission(self.veis)
+        self.veis = self.rng.normal(4, 1, size=self.size).round().astype(np.int8) % 7
+        self.tes = convert.vei_to_totalemission(self.veis, rng=self.rng)
 
 
 class GenerateFPP(Generate):
-    """Generate dates from an FPP."""
+    """Generate dates from an FPP.
+
+    Pulses that arrive on the same day are handled according to `collision`, one of
+    `create.COLLISIONS`, which can be changed on the class or on an instance before
+    `generate` is called. See `create.fpp_dates_and_emissions`.
+    """
+
+    collision = "nudge"
 
     def gen_dates_totalemission_vei(self):
         """Generate random dates, total emission and VEI."""
         self.yoes, self.moes, self.does, self.tes = create.fpp_dates_and_emissions(
-            self.size, self.init_year
+            self.size,
+            self.init_year,
+            rng=self.rng,
+            collision=self.collision,
+            large=self.large,
         )
         self.veis = convert.totalemission_to_vei(self.tes)
 
 
+class GenerateHawkes(Generate):
+    """Generate clustered dates from a self-exciting (Hawkes) process.
+
+    Each eruption triggers on average `branching` more eruptions, delayed by a time
+    drawn from `kernel`, one of `create.KERNELS`, with time scale `scale` in years and,
+    for the 'power' kernel, tail exponent `exponent`. Eruptions on the same day are
+    handled according to `collision`, either 'merge' or 'nudge'. All of these can be
+    changed on the class or on an instance before `generate` is called. See
+    `create.HawkesFrc` and `create.hawkes_dates_and_emissions`.
+    """
+
+    branching = 0.5
+    kernel = "exponential"
+    scale = 1.0
+    exponent = 1.5
+    collision = "nudge"
+
+    def gen_dates_totalemission_vei(self):
+        """Generate random dates, total emission and VEI."""
+        self.yoes, self.moes, self.does, self.tes = create.hawkes_dates_and_emissions(
+            self.size,
+            self.init_year,
+            rng=self.rng,
+            collision=self.collision,
+            large=self.large,
+            branching=self.branching,
+            kernel=self.kernel,
+            scale=self.scale,
+            exponent=self.exponent,
+        )
+        self.veis = convert.totalemission_to_vei(self.tes)
+
+
+class GenerateEmpirical(Generate):
+    """Generate eruptions resampled from an observed catalogue.
+
+    The VEI, total emission, injection heights and location of each eruption are drawn
+    jointly from one eruption of `catalogue`, and the days between eruptions from the
+    days between its dates. The catalogue defaults to the VolcanEESM database in
+    `data/originals`, and can be changed on the class or on an instance before
+    `generate` is called. See `create.empirical_tables`.
+    """
+
+    catalogue: Optional[str] = None
+
+    def gen_dates_totalemission_vei(self) -> None:
+        """Generate random dates, total emission and VEI."""
+        rows, gaps = create.empirical_tables(self.catalogue).draw(self.size, self.rng)
+        days = np.cumsum(gaps)
+        # Can't have years beyond 9999, unless the years are stored as int32
+        end_of_time = np.iinfo(np.int32).max if self.large else 9999
+        keep = days < (end_of_time - self.init_year) * 365
+        if not keep.all():
+            print(
+                f"Can't create dates for years beyond {end_of_time}. Keep this in "
+                + "mind when setting `init_year` and `size`. "
+                + f"Size: {self.size} -> {keep.sum()}."
+            )
+            rows, days = rows[keep], days[keep]
+        self.yoes, self.moes, self.does = create.days_to_dates(
+            days, self.init_year, self.large
+        )
+        self.veis = rows[:, 0].astype(np.int8)
+        self.tes, self.miihs, self.mxihs, self.lats, self.lons = rows[:, 1:].T.astype(
+            np.float32
+        )
+
+
 class GenerateRegularIntervals(Generate):
     """Generate date with regular interval."""
 
@@ -433,3 +785,82 @@ class GenerateFromFile(Generate):
             a = json.load(f)
         self = create.from_json(a, self)  # type: ignore
         self.veis = convert.totalemission_to_vei(self.tes)
+
+
+class GenerateRandomNormalChunked(GenerateChunked):
+    """Generate random dates and normally distributed VEI, a chunk at a time.
+
+    The dates follow the same model as `GenerateRandomNormal`. The eruptions of the last
+    year drawn are held back for the next chunk until no more eruptions can occur in
+    that year, so that the dates are in order across chunks. Unless `large` is set, no
+    dates are made beyond the year 9999, and the catalogue may then end early.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        size: int,
+        init_year: int,
+        file: Optional[str] = None,
+        rng: convert.SeedLike = None,
+        large: bool = False,
+        chunk: int = _CHUNK,
+    ) -> None:
+        super().__init__(size, init_year, file, rng, large, chunk)
+        self._year = int(init_year)
+        self._made = 0
+        # Can't have years beyond 9999, unless the years are stored as int32
+        self._end_of_time = np.iinfo(np.int32).max if large else 9999
+        self._ended = False
+        self._held: list[np.ndarray] = [
+            np.empty(0, dtype=np.int32 if large else np.int16),
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype=np.int8),
+        ]
+
+    def gen_dates_totalemission_vei(self) -> None:
+        """Generate random dates, total emission and VEI of the next chunk."""
+        parts = [[h] for h in self._held]
+        # Eruptions held back are either in a year before the last year drawn, or in
+        # the last year, where more eruptions may follow
+        complete = int(np.sum(self._held[0] < self._year))
+        drawn = len(self._held[0]) - complete
+        while complete < self.size and not self._ended:
+            new = self.size - complete + 1
+            years = self._year + np.cumsum(self.rng.integers(0, high=2, size=new))
+            moes = self.rng.integers(1, high=12, size=new, dtype=np.int8)
+            does = self.rng.integers(1, high=28, size=new, dtype=np.int8)
+            if years[-1] >= self._end_of_time:
+                # No more eruptions follow, so all of them are complete
+                self._ended = True
+                keep = years < self._end_of_time
+                years, moes, does = years[keep], moes[keep], does[keep]
+            parts[0].append(years.astype(self._held[0].dtype))
+            parts[1].append(moes)
+            parts[2].append(does)
+            if self._ended:
+                complete = sum(len(p) for p in parts[0])
+                break
+            complete += int(np.sum(years < years[-1])) + (
+                drawn if years[-1] > self._year else 0
+            )
+            drawn = int(np.sum(years == years[-1])) + (
+                drawn if years[-1] == self._year else 0
+            )
+            self._year = int(years[-1])
+        yoes, moes, does = (np.concatenate(p) for p in parts)
+        if complete < self.size:
+            print(
+                f"Can't create dates for years beyond {self._end_of_time}. Keep this in "
+                + "mind when setting `init_year` and `size`. "
+                + f"Size: {self.total} -> {self._made + complete}."
+            )
+            self.size = complete
+        self._made += self.size
+        order = np.lexsort((does, moes, yoes))
+        self.yoes, self.moes, self.does = (
+            a[order[: self.size]] for a in (yoes, moes, does)
+        )
+        self._held = [a[order[self.size :]] for a in (yoes, moes, does)]
+        # We don't want eruptions that have a VEI greater than 6.
+        self.veis = self.rng.normal(4, 1, size=self.size).round().astype(np.int8) % 7
+        self.tes = convert.vei_to_totalemission(self.veis, rng=self.rng)
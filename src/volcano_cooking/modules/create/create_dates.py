@@ -1,12 +1,22 @@
 """Script to put any function that creates correctly formatted dates."""
 
-import datetime as dt
 from itertools import cycle
 from typing import Union
 
-import cftime
 import numpy as np
-from volcano_cooking.modules import create
+from volcano_cooking.modules import convert, create
+
+# Month and day of month of each day of the year in the noleap calendar
+_MONTH_LENGTHS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+_NOLEAP_MONTH = np.repeat(np.arange(1, 13, dtype=np.int8), _MONTH_LENGTHS)
+_NOLEAP_DAY = np.concatenate(
+    [np.arange(1, n + 1, dtype=np.int8) for n in _MONTH_LENGTHS]
+)
+_US_PER_DAY = 86_400_000_000
+# Ways of handling FPP pulses that arrive on the same day
+COLLISIONS = ("merge", "nudge", "redraw")
+# Rounds of redrawn arrival times before the remaining collisions are nudged
+_MAX_REDRAWS = 100
 
 
 def single_date_and_emission(
@@ -38,12 +48,16 @@ def single_date_and_emission(
 
 
 def random_dates(
-    size: int, init_year: Union[float, str]
+    size: int,
+    init_year: Union[float, str],
+    rng: convert.SeedLike = None,
+    large: bool = False,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """Create random dates and place them in order.
 
     The randomness do not follow a specific model. This is the simplest case where we just
-    use the 'randint' function from 'numpy'.
+    use the 'randint' function from 'numpy'. The (month, day) pairs are sorted within
+    each year.
 
     Parameters
     ----------
@@ -51,6 +65,10 @@ def random_dates(
         The total number of dates that should be made.
     init_year : Union[float, str]
         The first year dates should appear in
+    rng : convert.SeedLike
+        Random number generator, or a seed for one.
+    large : bool
+        Store the years as int32 instead of int16, for more than about 60000 dates.
 
     Returns
     -------
@@ -68,21 +86,16 @@ def random_dates(
     """
     if size < 1:
         raise ValueError(f"{size} = , but must be > 0.")
-    yoes = np.cumsum(np.random.randint(0, high=2, size=size)).astype(np.int16) + int(
-        init_year
-    )
-    moes = np.random.randint(1, high=12, size=size, dtype=np.int8)
-    does = np.random.randint(1, high=28, size=size, dtype=np.int8)
-    # Make sure dates are increasing!
-    # idx = list of arrays of indexes pointing to the same year
-    idxs = [np.where(yoes == i)[0] for i in np.unique(yoes)]
-    # sort months with indexes
-    # sort days with indexes
-    for idx in idxs:
-        moes[idx] = np.sort(moes[idx])
-        does[idx] = np.sort(does[idx])
-
-    return yoes, moes, does
+    rng = np.random.default_rng(rng)
+    yoes = np.cumsum(rng.integers(0, high=2, size=size)).astype(
+        np.int32 if large else np.int16
+    ) + int(init_year)
+    moes = rng.integers(1, high=12, size=size, dtype=np.int8)
+    does = rng.integers(1, high=28, size=size, dtype=np.int8)
+    # Make sure dates are increasing! The years already are, so this orders the
+    # (month, day) pairs within each year.
+    order = np.lexsort((does, moes, yoes))
+    return yoes[order], moes[order], does[order]
 
 
 def regular_intervals() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
@@ -119,12 +132,23 @@ def regular_intervals() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
 
 
 def fpp_dates_and_emissions(
-    size: int, init_year: int
+    size: int,
+    init_year: int,
+    rng: convert.SeedLike = None,
+    collision: str = "nudge",
+    large: bool = False,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """Create random ordered dates and total emissions.
 
     Data is created from an FPP process, specifically the arrival time and amplitude is
-    used to set dates and total emissions.
+    used to set dates and total emissions. Pulses that arrive on the same day are
+    handled according to `collision`, so that all dates are unique:
+
+    - 'merge' joins them into one eruption with the sum of their emissions.
+    - 'nudge' moves them to the next days that are free.
+    - 'redraw' draws new arrival times for all but the first of them, until no two
+      pulses are on the same day. Since this may take many rounds when the days are
+      crowded, pulses still on the same day after `_MAX_REDRAWS` rounds are nudged.
 
     Parameters
     ----------
@@ -132,6 +156,12 @@ def fpp_dates_and_emissions(
         The total number of dates that should be made.
     init_year : int
         The first year dates should appear in
+    rng : convert.SeedLike
+        Random number generator, or a seed for one.
+    collision : str
+        How pulses on the same day are handled, one of `COLLISIONS`.
+    large : bool
+        Store the years as int32 instead of int16, and keep dates beyond the year 9999.
 
     Returns
     -------
@@ -143,51 +173,207 @@ def fpp_dates_and_emissions(
         Array of length 'size' with the day of a date
     tes : np.ndarray
         Array of length 'size' with the Total_Emission as a 1D numpy array
+
+    Raises
+    ------
+    ValueError
+        If `collision` is not one of `COLLISIONS`.
     """
-    f = create.StdFrc(fs=12, total_pulses=size)
-    while True:
-        ta, amp = f.get_frc()
-        # Can't have years beyond 9999
-        end_of_time = 9999
-        if int(ta[-1]) + init_year > end_of_time:
-            prev_size = int(ta[-1]) + init_year
-            mask = np.argwhere(ta + init_year < end_of_time)
-            ta = ta[mask].flatten()
-            amp = amp[mask].flatten()
-            size = len(amp)
-            print(
-                "Can't create dates for years beyond 9999. Keep this in mind when "
-                + f"setting `init_year` and `size`. Size: {prev_size} -> {size}."
-            )
-        # Go from float to YYYY-MM-DD
-        dates: list[cftime.datetime] = []
-        dates_ap = dates.append
-        for n in ta:
-            result = cftime.datetime(
-                int(n) + init_year, 1, 1, calendar="noleap"
-            ) + dt.timedelta(days=(n % 1) * 365)
-            dates_ap(result)
-        # Dates should be unique
-        if not any(np.diff(dates) == dt.timedelta(days=0)):
-            break
-    yoes_l: list[int] = []
-    yoes_ap = yoes_l.append
-    moes_l: list[int] = []
-    moes_ap = moes_l.append
-    does_l: list[int] = []
-    does_ap = does_l.append
-    for d in dates:
-        yoes_ap(d.year)
-        moes_ap(d.month)
-        does_ap(d.day)
-    yoes = np.array(yoes_l, dtype=np.int16)
-    moes = np.array(moes_l, dtype=np.int8)
-    does = np.array(does_l, dtype=np.int8)
-    del yoes_l
-    del moes_l
-    del does_l
-    tes = np.array(amp, dtype=np.float32)
-    return yoes, moes, does, tes
+    if collision not in COLLISIONS:
+        raise ValueError(f"{collision = }, but must be one of {COLLISIONS}.")
+    f = create.StdFrc(fs=12, total_pulses=size, rng=rng)
+    ta, amp = f.get_frc()
+    # Can't have years beyond 9999, unless the years are stored as int32
+    end_of_time = np.iinfo(np.int32).max if large else 9999
+    if int(ta[-1]) + init_year > end_of_time:
+        prev_size = len(ta)
+        mask = np.argwhere(ta + init_year < end_of_time)
+        ta = ta[mask].flatten()
+        amp = amp[mask].flatten()
+        size = len(amp)
+        print(
+            f"Can't create dates for years beyond {end_of_time}. Keep this in "
+            + "mind when setting `init_year` and `size`. "
+            + f"Size: {prev_size} -> {size}."
+        )
+    days = noleap_dates(ta, init_year, large)[3]
+    if collision != "redraw":
+        days, amp = _join_collisions(days, amp, collision, end_of_time - init_year)
+    else:
+        high = min(f.duration, end_of_time - init_year)
+        for _ in range(_MAX_REDRAWS):
+            if not np.any(same := np.r_[False, np.diff(days) == 0]):
+                break
+            ta[same] = f.rng.uniform(0, high, size=np.count_nonzero(same))
+            order = np.argsort(ta)
+            ta, amp = ta[order], amp[order]
+            days = noleap_dates(ta, init_year, large)[3]
+        days, amp = _join_collisions(days, amp, "nudge", end_of_time - init_year)
+    yoes, moes, does = days_to_dates(days, init_year, large)
+    return yoes, moes, does, np.array(amp, dtype=np.float32)
+
+
+def hawkes_dates_and_emissions(  # noqa: PLR0913
+    size: int,
+    init_year: int,
+    rng: convert.SeedLike = None,
+    collision: str = "nudge",
+    large: bool = False,
+    **kwargs,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Create clustered ordered dates and total emissions.
+
+    The arrival times and amplitudes of a self-exciting process, `create.HawkesFrc`, are
+    used to set dates and total emissions. Eruptions that arrive on the same day are
+    handled as in `fpp_dates_and_emissions`, except that they cannot be redrawn, since
+    that would break up the clusters.
+
+    Parameters
+    ----------
+    size : int
+        The total number of dates that should be made.
+    init_year : int
+        The first year dates should appear in
+    rng : convert.SeedLike
+        Random number generator, or a seed for one.
+    collision : str
+        How eruptions on the same day are handled, either 'merge' or 'nudge'.
+    large : bool
+        Store the years as int32 instead of int16, and keep dates beyond the year 9999.
+    **kwargs
+        The branching ratio and kernel of the process, passed on to `create.HawkesFrc`.
+
+    Returns
+    -------
+    yoes : np.ndarray
+        Array of length 'size' with the year of a date
+    moes : np.ndarray
+        Array of length 'size' with the month of a date
+    does : np.ndarray
+        Array of length 'size' with the day of a date
+    tes : np.ndarray
+        Array of length 'size' with the Total_Emission as a 1D numpy array
+
+    Raises
+    ------
+    ValueError
+        If `collision` is not 'merge' or 'nudge'.
+    """
+    if collision not in COLLISIONS[:2]:
+        raise ValueError(f"{collision = }, but must be one of {COLLISIONS[:2]}.")
+    ta, amp = create.HawkesFrc(total_pulses=size, rng=rng, **kwargs).get_frc()
+    end_of_time = np.iinfo(np.int32).max if large else 9999
+    keep = ta + init_year < end_of_time
+    if not keep.all():
+        print(
+            f"Can't create dates for years beyond {end_of_time}. Keep this in "
+            + "mind when setting `init_year` and `size`. "
+            + f"Size: {size} -> {keep.sum()}."
+        )
+        ta, amp = ta[keep], amp[keep]
+    days = noleap_dates(ta, init_year, large)[3]
+    days, amp = _join_collisions(days, amp, collision, end_of_time - init_year)
+    yoes, moes, does = days_to_dates(days, init_year, large)
+    return yoes, moes, does, np.array(amp, dtype=np.float32)
+
+
+def _join_collisions(
+    days: np.ndarray, amp: np.ndarray, collision: str, years: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge or nudge eruptions on the same day, keeping those within `years`."""
+    if collision == "merge":
+        first = np.nonzero(np.r_[True, np.diff(days) != 0])[0]
+        return days[first], np.add.reduceat(amp, first)
+    # Each day must be at least one day after the previous one
+    step = np.arange(len(days))
+    days = np.maximum.accumulate(days - step) + step
+    keep = days < years * 365
+    return days[keep], amp[keep]
+
+
+def noleap_dates(
+    ta: np.ndarray, init_year: int, large: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Convert times in years to dates in the noleap calendar.
+
+    A time `t` is placed `(t % 1) * 365` days into the year `int(t) + init_year`,
+    rounded to the nearest microsecond, which gives the same dates as adding a
+    `datetime.timedelta` to a `cftime.datetime` with the noleap calendar.
+
+    Parameters
+    ----------
+    ta : np.ndarray
+        Non-negative times in years since the start of `init_year`.
+    init_year : int
+        The year of time zero.
+    large : bool
+        Store the years as int32 instead of int16.
+
+    Returns
+    -------
+    yoes : np.ndarray
+        Array with the year of each date
+    moes : np.ndarray
+        Array with the month of each date
+    does : np.ndarray
+        Array with the day of each date
+    days : np.ndarray
+        Days since the start of `init_year` of each date
+
+    Raises
+    ------
+    ValueError
+        If the years do not fit in int16, or int32 with `large`.
+    """
+    ta = np.asarray(ta, dtype=np.float64)
+    years = ta.astype(np.int64)
+    # Split into whole days and microseconds the same way as `datetime.timedelta`
+    # does, so that rounding up to the next day matches.
+    days_f = (ta - years) * 365
+    whole = np.floor(days_f)
+    days = years * 365 + whole.astype(np.int64)
+    days += np.round((days_f - whole) * _US_PER_DAY) >= _US_PER_DAY
+    return (*days_to_dates(days, init_year, large), days)
+
+
+def days_to_dates(
+    days: np.ndarray, init_year: int, large: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert days since the start of `init_year` to dates in the noleap calendar.
+
+    Parameters
+    ----------
+    days : np.ndarray
+        Non-negative whole days since the start of `init_year`.
+    init_year : int
+        The year of day zero.
+    large : bool
+        Store the years as int32 instead of int16.
+
+    Returns
+    -------
+    yoes : np.ndarray
+        Array with the year of each date
+    moes : np.ndarray
+        Array with the month of each date
+    does : np.ndarray
+        Array with the day of each date
+
+    Raises
+    ------
+    ValueError
+        If the years do not fit in int16, or int32 with `large`.
+    """
+    years, doy = np.divmod(days, 365)
+    years += init_year
+    info = np.iinfo(np.int32 if large else np.int16)
+    if len(years) and (years.min() < info.min or years.max() > info.max):
+        raise ValueError(
+            f"Years from {years.min()} to {years.max()} do not fit in {info.dtype}."
+            + ("" if large else " Use `large=True` to store the years as int32.")
+        )
+    yoes = years.astype(info.dtype)
+    return yoes, _NOLEAP_MONTH[doy], _NOLEAP_DAY[doy]
 
 
 def from_json(table: dict, generator: create.Generate) -> create.Generate:  # noqa: PLR0912
@@ -0,0 +1,198 @@
+"""Resample eruptions from an observed catalogue, such as the VolcanEESM database.
+
+The eruptions of the catalogue are resampled jointly, so that the VEI, total emission,
+injection heights and location of each drawn eruption are those of one observed
+eruption. The time between eruptions is resampled from the gaps between the distinct
+dates of the catalogue. Both are drawn by inverse transform sampling, with one
+`searchsorted` in a cumulative distribution over the distinct rows and gaps of the
+catalogue.
+
+The sampling tables are computed once for each catalogue and kept in memory. They are
+also saved next to the catalogue as `<name>_empirical.npz`, together with the size and
+modification time of the file, so that later runs only load them.
+"""
+
+import functools
+import os
+from typing import Optional
+
+import netCDF4
+import numpy as np
+from volcano_cooking.modules import convert
+from volcano_cooking.modules.create.create_dates import _MONTH_LENGTHS
+
+# The observed catalogue used by default
+CATALOGUE = os.path.join(
+    "data", "originals", "volcan-eesm_global_2015_so2-emissions-database_v1.0.nc"
+)
+# Variables that are resampled jointly, in the order of the columns of `rows`
+EMPIRICAL_VARIABLES = (
+    "VEI",
+    "Total_Emission",
+    "Minimum_Injection_Height",
+    "Maximum_Injection_Height",
+    "Latitude",
+    "Longitude",
+)
+_MONTH_START = np.cumsum([0, *_MONTH_LENGTHS[:-1]])
+
+
+class EmpiricalTables:
+    """Sampling tables of an observed catalogue of eruptions.
+
+    Use `EmpiricalTables.from_file` or `empirical_tables` to get the memoised tables of
+    a catalogue.
+
+    Parameters
+    ----------
+    rows : np.ndarray
+        The distinct eruptions of the catalogue, with one column for each of
+        `EMPIRICAL_VARIABLES`.
+    row_cdf : np.ndarray
+        Cumulative distribution of `rows`, ending at one.
+    gaps : np.ndarray
+        The distinct number of days between consecutive dates of the catalogue.
+    gap_cdf : np.ndarray
+        Cumulative distribution of `gaps`, ending at one.
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        row_cdf: np.ndarray,
+        gaps: np.ndarray,
+        gap_cdf: np.ndarray,
+    ) -> None:
+        self.rows = rows
+        self.row_cdf = row_cdf
+        self.gaps = gaps
+        self.gap_cdf = gap_cdf
+
+    @classmethod
+    def from_file(cls, file: str) -> "EmpiricalTables":
+        """Compute the sampling tables of a catalogue.
+
+        Eruptions with missing values are left out. Dates are placed in the noleap
+        calendar, where 29 February is taken as 28 February.
+
+        Parameters
+        ----------
+        file : str
+            Catalogue with the same variables as the files made by `create.Data`.
+
+        Returns
+        -------
+        EmpiricalTables
+            The sampling tables of the catalogue
+
+        Raises
+        ------
+        ValueError
+            If the catalogue has no eruptions without missing values, or fewer than two
+            distinct dates.
+        """
+        with netCDF4.Dataset(file, "r") as f:
+            rows = np.stack(
+                [
+                    np.ma.filled(f[v][:].astype(np.float64), np.nan)
+                    for v in EMPIRICAL_VARIABLES
+                ],
+                axis=1,
+            )
+            yoes, moes, does = (
+                np.asarray(f[v][:], dtype=np.int64)
+                for v in ("Year_of_Emission", "Month_of_Emission", "Day_of_Emission")
+            )
+        rows = rows[np.isfinite(rows).all(axis=1)]
+        month_length = np.asarray(_MONTH_LENGTHS)[moes - 1]
+        days = np.unique(
+            yoes * 365 + _MONTH_START[moes - 1] + np.minimum(does, month_length) - 1
+        )
+        if len(rows) == 0 or len(days) < 2:  # noqa: PLR2004
+            raise ValueError(
+                f"Need eruptions without missing values on two dates in {file}."
+            )
+        rows, row_counts = np.unique(rows, axis=0, return_counts=True)
+        gaps, gap_counts = np.unique(np.diff(days), return_counts=True)
+        return cls(rows, _cdf(row_counts), gaps, _cdf(gap_counts))
+
+    def draw(
+        self, size: int, rng: convert.SeedLike = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Draw eruptions and the days between them.
+
+        Parameters
+        ----------
+        size : int
+            The number of eruptions.
+        rng : convert.SeedLike
+            Random number generator, or a seed for one.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The rows of `size` eruptions, and the number of days before each of them
+        """
+        rng = np.random.default_rng(rng)
+        rows = self.rows[np.searchsorted(self.row_cdf, rng.random(size), "right")]
+        gaps = self.gaps[np.searchsorted(self.gap_cdf, rng.random(size), "right")]
+        return rows, gaps
+
+
+def _cdf(counts: np.ndarray) -> np.ndarray:
+    cdf = np.cumsum(counts) / np.sum(counts)
+    # Uniform numbers are below one, so the last entry is always found
+    cdf[-1] = 1
+    return cdf
+
+
+def _cache_file(file: str) -> str:
+    return f"{os.path.splitext(file)[0]}_empirical.npz"
+
+
+@functools.lru_cache(maxsize=8)
+def _load_tables(file: str, size: int, mtime_ns: int) -> EmpiricalTables:
+    key = f"{size}:{mtime_ns}"
+    cache = _cache_file(file)
+    if os.path.isfile(cache):
+        with np.load(cache) as npz:
+            if str(npz["key"]) == key:
+                return EmpiricalTables(
+                    npz["rows"], npz["row_cdf"], npz["gaps"], npz["gap_cdf"]
+                )
+    tables = EmpiricalTables.from_file(file)
+    np.savez(
+        cache,
+        key=key,
+        rows=tables.rows,
+        row_cdf=tables.row_cdf,
+        gaps=tables.gaps,
+        gap_cdf=tables.gap_cdf,
+    )
+    return tables
+
+
+def empirical_tables(file: Optional[str] = None) -> EmpiricalTables:
+    """Load the sampling tables of a catalogue, computing them on first use.
+
+    Parameters
+    ----------
+    file : Optional[str]
+        The catalogue. Defaults to `CATALOGUE`, the VolcanEESM database in
+        `data/originals`.
+
+    Returns
+    -------
+    EmpiricalTables
+        The sampling tables of the catalogue
+
+    Raises
+    ------
+    FileNotFoundError
+        If the catalogue cannot be found.
+    """
+    file = CATALOGUE if file is None else file
+    if not os.path.isfile(file):
+        raise FileNotFoundError(f"Cannot find file named {file}.")
+    stat = os.stat(file)
+    return _load_tables(os.path.abspath(file), stat.st_size, stat.st_mtime_ns)
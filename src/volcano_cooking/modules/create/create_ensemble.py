@@ -0,0 +1,163 @@
+"""Generate many realisations of the same generator in one batch.
+
+Each member of an ensemble is drawn from its own stream of random numbers, spawned from
+a single `np.random.SeedSequence`, so that member `i` is the same every time the
+ensemble is made with the same seed, regardless of how many members there are or how
+many processes they are drawn by. The members are stored back to back in one array per
+variable, with `ptr[i]` to `ptr[i + 1]` the eruptions of member `i`, since some
+generators, such as `GenerateFPP`, do not always give the same number of eruptions.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Optional
+
+import numpy as np
+from volcano_cooking.modules.create.create_data import Generate
+
+
+class Ensemble:
+    """Catalogues of several realisations made with the same generator.
+
+    Parameters
+    ----------
+    generator : type[Generate]
+        The generator class used for all members.
+    members : int
+        The number of members.
+    size : int
+        The number of volcanoes in each member.
+    init_year : int
+        The first possible year for a volcanic eruption.
+    file : Optional[str]
+        Path to the json file, used by `GenerateFromFile`.
+    seed : Optional[int]
+        Seed of the ensemble. If not given, a random seed is drawn and can be found in
+        `seed` after the ensemble is generated.
+    large : bool
+        Allow int32 years in the members, see `Generate`.
+
+    Attributes
+    ----------
+    generate : method
+        Draw all members of the ensemble.
+    member : method
+        Return the arrays of one member, in the same order as the input to `Data`.
+    stacked : method
+        Return all members as arrays of shape (members, eruptions).
+    """
+
+    def __init__(
+        self,
+        generator: type[Generate],
+        members: int,
+        size: int,
+        init_year: int,
+        file: Optional[str] = None,
+        seed: Optional[int] = None,
+        large: bool = False,
+    ) -> None:
+        if members < 1:
+            raise ValueError(f"{members = }, but must be > 0.")
+        self.generator = generator
+        self.members = members
+        self.size = size
+        self.init_year = init_year
+        self.file = file
+        self.seed = seed
+        self.large = large
+        self.ptr: np.ndarray
+        self.arrays: list[np.ndarray]
+
+    def generate(self, workers: int = 1) -> None:
+        """Draw all members of the ensemble.
+
+        Parameters
+        ----------
+        workers : int
+            Number of processes the members are drawn by. The result does not depend
+            on the number of processes.
+        """
+        if self.seed is None:
+            self.seed = int(np.random.SeedSequence().generate_state(1)[0])
+        streams = np.random.SeedSequence(self.seed).spawn(self.members)
+        args = (
+            repeat(self.generator),
+            repeat(self.size),
+            repeat(self.init_year),
+            repeat(self.file),
+            streams,
+            repeat(self.large),
+        )
+        if workers <= 1:
+            parts = list(map(_draw_member, *args))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                parts = list(pool.map(_draw_member, *args))
+        self.ptr = np.concatenate(([0], np.cumsum([len(p[0]) for p in parts])))
+        self.arrays = [np.concatenate(arrs) for arrs in zip(*parts)]
+
+    def member(self, i: int) -> list[np.ndarray]:
+        """Return the arrays of one member.
+
+        Parameters
+        ----------
+        i : int
+            Index of the member.
+
+        Returns
+        -------
+        list[np.ndarray]
+            The arrays of member `i`, in the same order as the input to `Data`
+        """
+        return [a[self.ptr[i] : self.ptr[i + 1]] for a in self.arrays]
+
+    def stacked(self) -> list[np.ndarray]:
+        """Return all members as arrays of shape (members, eruptions).
+
+        Returns
+        -------
+        list[np.ndarray]
+            The arrays of all members, in the same order as the input to `Data`
+
+        Raises
+        ------
+        ValueError
+            If the members do not have the same number of eruptions.
+        """
+        lengths = np.unique(np.diff(self.ptr))
+        if len(lengths) != 1:
+            raise ValueError(
+                f"The members have {lengths.tolist()} eruptions, so cannot be stacked. "
+                + "Use 'member' or 'ptr' to get each member."
+            )
+        return [a.reshape(self.members, -1) for a in self.arrays]
+
+    def name(self, i: int) -> str:
+        """Return the file name of one member.
+
+        Parameters
+        ----------
+        i : int
+            Index of the member.
+
+        Returns
+        -------
+        str
+            The file name, without the date and extension added when the file is saved
+        """
+        width = len(str(self.members - 1))
+        return f"synthetic_volcanoes_m{i:0{width}d}_s{self.seed}"
+
+
+def _draw_member(
+    generator: type[Generate],
+    size: int,
+    init_year: int,
+    file: Optional[str],
+    stream: np.random.SeedSequence,
+    large: bool,
+) -> list[np.ndarray]:
+    g = generator(size, init_year, file, rng=stream, large=large)
+    g.generate()
+    return g.get_arrays()
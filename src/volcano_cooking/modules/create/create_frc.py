@@ -1,10 +1,19 @@
-"""Create volcanic forcing as a Poisson process with power law amplitudes."""
+"""Create volcanic forcing as a Poisson process with power law amplitudes.
+
+`HawkesFrc` instead draws the arrival times from a self-exciting (Hawkes) process, where
+each eruption raises the rate of further eruptions for a while after it.
+"""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from functools import cached_property
+from typing import Callable
 
 import numpy as np
-import scipy.stats as scp_stats
+import scipy.signal as scp_signal
 import superposedpulses
+from superposedpulses.forcing import Forcing
+from volcano_cooking.modules import convert
 
 
 class FrcGenerator(ABC):
@@ -15,51 +24,214 @@ class FrcGenerator(ABC):
         """Return time and a realisation of the synthetic forcing signal."""
 
 
+def _lomax_amp(rng: np.random.Generator, k: int, c: float) -> np.ndarray:
+    """Draw `k` amplitudes from a Lomax distribution with shape `c`, by inverse CDF."""
+    # 1 - U is in (0, 1], so the amplitudes are finite
+    return (1 - rng.random(k)) ** (-1 / c) - 1
+
+
+# Shapes of the excitation kernel of `HawkesFrc`
+KERNELS = ("exponential", "power")
+
+
+def _chunked_signal(
+    draw: Callable[[float, float], tuple[np.ndarray, np.ndarray]],
+    n_times: int,
+    dt: float,
+    chunk: int,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Sum exponential pulses on the time axis `i * dt`, `chunk` samples at a time.
+
+    Each pulse starts at the first sample at or after its arrival time, scaled by how
+    much it has decayed by then. The pulses of a chunk are binned at their first sample,
+    and the exponential decay is applied to the binned signal as a first order recursive
+    filter, `y[i] = x[i] + exp(-dt) * y[i - 1]`. The state of the filter is carried to the
+    next chunk, so the signal is the same as if it was made in one piece, without cutting
+    the pulses. Both the work and the memory are proportional to the length of a chunk,
+    and do not depend on the length of a pulse or on the number of pulses in a chunk.
+
+    Parameters
+    ----------
+    draw : Callable[[float, float], tuple[np.ndarray, np.ndarray]]
+        Return the arrival times and amplitudes of the pulses arriving within `[a, b)`,
+        called once for each chunk with increasing, adjacent intervals. The interval of
+        the last chunk ends after the last sample.
+    n_times : int
+        Total length of the time axis.
+    dt : float
+        Time step.
+    chunk : int
+        Number of samples in each chunk.
+
+    Yields
+    ------
+    tuple[np.ndarray, np.ndarray]
+        The time axis and the signal of a chunk
+    """
+    decay = np.exp(-dt)
+    state = np.zeros(1)
+    carry: np.ndarray = np.zeros(0)
+    for i0 in range(0, n_times, chunk):
+        i1 = min(i0 + chunk, n_times)
+        ta, amp = draw(i0 * dt, i1 * dt)
+        first = np.ceil(ta / dt).astype(np.int64) - i0
+        scale = amp * np.exp(-((first + i0) * dt - ta))
+        # Pulses arriving after the last sample of the chunk start in the next chunk,
+        # at index i1 - i0. Without pulses, bincount gives integers.
+        x: np.ndarray = np.bincount(first, weights=scale, minlength=i1 - i0 + 1).astype(
+            np.float64, copy=False
+        )
+        x[: len(carry)] += carry
+        out, state = scp_signal.lfilter([1.0], [1.0, -decay], x[: i1 - i0], zi=state)
+        yield np.arange(i0, i1) * dt, out
+        carry = x[i1 - i0 :]
+
+
+def _forcing_generator(
+    rng: np.random.Generator,
+) -> superposedpulses.StandardForcingGenerator:
+    """Return a StandardForcingGenerator that draws the arrival times from `rng`."""
+
+    class SeededForcingGenerator(superposedpulses.StandardForcingGenerator):
+        def get_forcing(self, times: np.ndarray, gamma: float) -> Forcing:
+            total_pulses = int(max(times) * gamma)
+            arrival_times = rng.uniform(
+                low=times[0], high=times[len(times) - 1], size=total_pulses
+            )
+            amplitudes = self._get_amplitudes(total_pulses)
+            durations = self._get_durations(total_pulses)
+            return Forcing(total_pulses, arrival_times, amplitudes, durations)
+
+    return SeededForcingGenerator()
+
+
 class StdFrc(FrcGenerator):
-    """Forcing generated with the StandardForcingGenerator."""
+    """Forcing with the same statistics as the StandardForcingGenerator.
+
+    The arrival times and amplitudes are drawn directly, without the time axis of the
+    forcing, so that memory and time scale with the number of pulses. As with the
+    StandardForcingGenerator, there are `int(duration * gamma)` pulses, uniformly
+    distributed over the duration of the time axis it would have used.
 
-    def __init__(self, fs: float = 12, total_pulses: int = 300) -> None:
+    Parameters
+    ----------
+    fs : float
+        Sampling frequency of the time axis, in samples per year.
+    total_pulses : int
+        Number of pulses, i.e. eruptions.
+    rng : convert.SeedLike
+        Random number generator, or a seed for one, used for both the arrival times and
+        the amplitudes.
+    """
+
+    def __init__(
+        self, fs: float = 12, total_pulses: int = 300, rng: convert.SeedLike = None
+    ) -> None:
         if total_pulses < 1:
             raise ValueError(f"Can't create empty arrays, {total_pulses} = .")
         self.gamma = 0.1
-        self.my_frc = superposedpulses.StandardForcingGenerator()
-        self.my_frc.set_amplitude_distribution(lambda k: self._lomax_amp(k, 1.8))
-        self.times = np.arange(0, (total_pulses + 1) / self.gamma, 1 / fs)
-
-    def _lomax_amp(self, k: int, c: float) -> np.ndarray:
-        return scp_stats.lomax.rvs(c, size=k)
+        self.rng = np.random.default_rng(rng)
+        # Last time of np.arange(0, (total_pulses + 1) / gamma, 1 / fs)
+        n_times = int(np.ceil((total_pulses + 1) / self.gamma * fs))
+        self.duration = (n_times - 1) / fs
 
     def get_frc(self) -> tuple[np.ndarray, np.ndarray]:
         """Get the arrival times and the amplitudes."""
-        frc = self.my_frc.get_forcing(self.times, self.gamma)
-        ta, amp = frc.arrival_times, frc.amplitudes
-        mask = np.argsort(ta)
-        ta[:] = ta[mask]
-        amp[:] = amp[mask]
-        return ta, amp
+        k = int(self.duration * self.gamma)
+        # Sorted uniform arrival times are the normalised partial sums of k + 1
+        # exponential gaps.
+        gaps = self.rng.standard_exponential(k + 1)
+        ta = np.cumsum(gaps)
+        ta *= self.duration / ta[-1]
+        amp = _lomax_amp(self.rng, k, 1.8)
+        return ta[:-1], amp
 
 
 class Frc(FrcGenerator):
-    """Forcing time series generator."""
+    """Forcing time series generator.
 
-    def __init__(self, fs: float = 1, size: int = 9999) -> None:
+    The forcing is made by `superposedpulses` with `get_fpp`. Long forcing time series
+    can instead be made a chunk at a time with `iter_fpp`, which does not keep the full
+    time series in memory.
+
+    Parameters
+    ----------
+    fs : float
+        Sampling frequency of the time axis, in samples per year.
+    size : int
+        Length of the time series, in years.
+    rng : convert.SeedLike
+        Random number generator, or a seed for one, used for both the arrival times and
+        the amplitudes.
+    """
+
+    def __init__(
+        self, fs: float = 1, size: int = 9999, rng: convert.SeedLike = None
+    ) -> None:
         # Lomax
         self.fs = fs
-        self.fpp = superposedpulses.PointModel(
-            gamma=0.1, total_duration=size, dt=1 / self.fs
-        )
-        my_forcing_gen = superposedpulses.StandardForcingGenerator()
-        my_forcing_gen.set_amplitude_distribution(lambda k: self._lomax_amp(k, 1.8))
-        self.fpp.set_custom_forcing_generator(my_forcing_gen)
+        self.size = size
+        self.gamma = 0.1
+        self.rng = np.random.default_rng(rng)
 
-    def _lomax_amp(self, k: int, c: float) -> np.ndarray:
-        return scp_stats.lomax.rvs(c, size=k)
+    @cached_property
+    def fpp(self) -> superposedpulses.PointModel:
+        """The model used by `get_fpp`, which holds the full time axis."""
+        fpp = superposedpulses.PointModel(
+            gamma=self.gamma, total_duration=self.size, dt=1 / self.fs
+        )
+        my_forcing_gen = _forcing_generator(self.rng)
+        my_forcing_gen.set_amplitude_distribution(
+            lambda k: _lomax_amp(self.rng, k, 1.8)
+        )
+        fpp.set_custom_forcing_generator(my_forcing_gen)
+        return fpp
 
     def get_fpp(self) -> tuple[np.ndarray, np.ndarray]:
         """Get the time axis and forcing process."""
         t, f = self.fpp.make_realization()
         return t, f
 
+    def iter_fpp(self, chunk: int = 2**16) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Get the time axis and forcing process a chunk at a time.
+
+        The forcing has the same statistics as from `get_fpp`, but only the pulses of
+        one chunk are drawn at a time, so that memory does not grow with `size`.
+
+        Parameters
+        ----------
+        chunk : int
+            Number of samples in each chunk.
+
+        Yields
+        ------
+        tuple[np.ndarray, np.ndarray]
+            The time axis and the forcing process of a chunk
+
+        Raises
+        ------
+        ValueError
+            If `chunk` is non-positive.
+        """
+        if chunk < 1:
+            raise ValueError(f"{chunk = }, but must be > 0.")
+        dt = 1 / self.fs
+        # Same length as np.arange(0, size, dt)
+        n_times = int(np.ceil(self.size / dt))
+        duration = (n_times - 1) * dt
+        # The number of pulses in each chunk is drawn from those not yet placed
+        left = int(duration * self.gamma)
+
+        def draw(a: float, b: float) -> tuple[np.ndarray, np.ndarray]:
+            nonlocal left
+            p = 1.0 if b >= duration else (b - a) / (duration - a)
+            k = int(self.rng.binomial(left, p))
+            left -= k
+            ta = np.sort(self.rng.uniform(a, min(b, duration), size=k))
+            return ta, _lomax_amp(self.rng, k, 1.8)
+
+        yield from _chunked_signal(draw, n_times, dt, chunk)
+
     def get_frc(self) -> tuple[np.ndarray, np.ndarray]:
         """Get the arrival times and the amplitudes."""
         self.fpp.make_realization()
@@ -69,3 +241,100 @@ class Frc(FrcGenerator):
         ta[:] = ta[mask]
         amp[:] = amp[mask]
         return ta, amp
+
+
+class HawkesFrc(FrcGenerator):
+    """Forcing with arrival times from a self-exciting (Hawkes) process.
+
+    Background eruptions arrive as a Poisson process with rate `gamma`, and every
+    eruption triggers a Poisson number of new eruptions with mean `branching`, delayed
+    from it by a random time drawn from the kernel. The process is simulated as a
+    branching process, one generation of eruptions at a time, so that the time scales
+    as O(n log n) with the number of eruptions, where the log comes from the final
+    sort. The amplitudes are independent of the arrival times, and drawn from the same
+    Lomax distribution as in `StdFrc`.
+
+    Parameters
+    ----------
+    total_pulses : int
+        Number of pulses, i.e. eruptions.
+    branching : float
+        Mean number of eruptions triggered by each eruption, in [0, 1).
+    kernel : str
+        Distribution of the delay of triggered eruptions, one of `KERNELS`. The
+        'exponential' kernel has mean `scale`, and the 'power' kernel is a Lomax
+        distribution with scale `scale` and shape `exponent`, whose density falls off
+        as `t ** -(1 + exponent)`.
+    scale : float
+        Time scale of the kernel, in years.
+    exponent : float
+        Tail exponent of the 'power' kernel.
+    rng : convert.SeedLike
+        Random number generator, or a seed for one, used for both the arrival times and
+        the amplitudes.
+
+    Raises
+    ------
+    ValueError
+        If `total_pulses` is non-positive, `branching` is not in [0, 1), `kernel` is
+        not one of `KERNELS`, or `scale` or `exponent` is non-positive.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        total_pulses: int = 300,
+        branching: float = 0.5,
+        kernel: str = "exponential",
+        scale: float = 1.0,
+        exponent: float = 1.5,
+        rng: convert.SeedLike = None,
+    ) -> None:
+        if total_pulses < 1:
+            raise ValueError(f"Can't create empty arrays, {total_pulses} = .")
+        if not 0 <= branching < 1:
+            raise ValueError(f"{branching = }, but must be in [0, 1).")
+        if kernel not in KERNELS:
+            raise ValueError(f"{kernel = }, but must be one of {KERNELS}.")
+        if scale <= 0 or exponent <= 0:
+            raise ValueError(f"{scale = } and {exponent = }, but must be > 0.")
+        self.gamma = 0.1
+        self.total_pulses = total_pulses
+        self.branching = branching
+        self.kernel = kernel
+        self.scale = scale
+        self.exponent = exponent
+        self.rng = np.random.default_rng(rng)
+
+    def _delays(self, k: int) -> np.ndarray:
+        """Draw the delays of `k` triggered eruptions from the kernel."""
+        if self.kernel == "exponential":
+            return self.scale * self.rng.standard_exponential(k)
+        return self.scale * _lomax_amp(self.rng, k, self.exponent)
+
+    def _clusters(self, a: float, b: float) -> np.ndarray:
+        """Draw the background eruptions in `[a, b)` and all eruptions they trigger."""
+        parents = self.rng.uniform(a, b, size=self.rng.poisson(self.gamma * (b - a)))
+        times = [parents]
+        while len(parents):
+            k = self.rng.poisson(self.branching, size=len(parents))
+            parents = np.repeat(parents, k) + self._delays(int(k.sum()))
+            times.append(parents)
+        return np.concatenate(times)
+
+    def get_frc(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the arrival times and the amplitudes."""
+        n = self.total_pulses
+        # The mean rate of all eruptions is gamma / (1 - branching)
+        step = n * (1 - self.branching) / self.gamma
+        parts = [self._clusters(0, step)]
+        end = step
+        # Every eruption before `end` is drawn, since it is triggered by an earlier
+        # one, so the first `n` eruptions are final once there are `n` before `end`.
+        while sum(np.count_nonzero(p < end) for p in parts) < n:
+            parts.append(self._clusters(end, end + step))
+            end += step
+        ta = np.concatenate(parts)
+        ta = ta[np.argpartition(ta, n - 1)[:n]] if len(ta) > n else ta
+        ta.sort()
+        amp = _lomax_amp(self.rng, n, 1.8)
+        return ta, amp
@@ -0,0 +1,8 @@
+"""Names of the output formats of the forcing files.
+
+They are kept apart from the writers, so that the command line interface can list them
+without importing netCDF4 and xarray.
+"""
+
+# Output formats accepted by `frc_encoding`
+FRC_FORMATS = ("netcdf3", "cdf5", "zlib", "packed", "quantized")
@@ -0,0 +1,96 @@
+"""Cache the metadata of the original forcing file in a small sidecar file.
+
+The original VolcanEESM forcing file is 2.2 GB, but only its coordinates, encodings and
+attributes are used when a new forcing file is made. The first time the original file is
+read, everything except the time steps is saved next to it as `<name>_template.nc`,
+together with the size and modification time of the original. Later runs load the
+sidecar as long as the original file is unchanged, or missing altogether.
+"""
+
+import os
+from typing import Optional
+
+import xarray as xr
+
+# Global attribute in the sidecar file that identifies the original file.
+_KEY_ATTR = "template_source_key"
+
+
+def template_path(file: str) -> str:
+    """Return the path of the sidecar file that belongs to `file`.
+
+    Parameters
+    ----------
+    file : str
+        Path to the original netCDF file.
+
+    Returns
+    -------
+    str
+        Path to the sidecar file
+    """
+    return f"{os.path.splitext(file)[0]}_template.nc"
+
+
+def has_template(file: str) -> bool:
+    """Check if `file` or its sidecar file can be found.
+
+    Parameters
+    ----------
+    file : str
+        Path to the original netCDF file.
+
+    Returns
+    -------
+    bool
+        True if a template can be loaded without downloading the original file
+    """
+    return os.path.isfile(file) or os.path.isfile(template_path(file))
+
+
+def _source_key(file: str) -> Optional[str]:
+    if not os.path.isfile(file):
+        return None
+    stat = os.stat(file)
+    return f"{os.path.basename(file)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_template(file: str, time_dim: str = "time") -> xr.Dataset:
+    """Load everything except the time steps of a netCDF file.
+
+    Parameters
+    ----------
+    file : str
+        Path to the original netCDF file.
+    time_dim : str
+        Name of the time dimension that is dropped from the template.
+
+    Returns
+    -------
+    xr.Dataset
+        The original dataset with zero time steps
+
+    Raises
+    ------
+    FileNotFoundError
+        If neither the original file nor its sidecar file can be found.
+    """
+    sidecar = template_path(file)
+    key = _source_key(file)
+    if os.path.isfile(sidecar):
+        with xr.open_dataset(sidecar, decode_times=False) as ds:
+            cached = ds.load()
+        # The sidecar is used if the original is gone or has not changed.
+        if key is None or cached.attrs.get(_KEY_ATTR) == key:
+            cached.attrs.pop(_KEY_ATTR, None)
+            return cached
+    if key is None:
+        raise FileNotFoundError(f"{file} not found. Consult README on how to download.")
+    with xr.open_dataset(file, decode_times=False) as ds:
+        steps = {time_dim: slice(0, 0)} if time_dim in ds.dims else {}
+        template = ds.isel(steps).load()
+    unlimited = [time_dim] if time_dim in template.dims else []
+    template.assign_attrs({_KEY_ATTR: key}).to_netcdf(
+        sidecar, format="NETCDF3_64BIT", unlimited_dims=unlimited
+    )
+    return template
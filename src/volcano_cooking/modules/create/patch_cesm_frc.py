@@ -0,0 +1,272 @@
+"""Patch an existing CESM2 forcing file after the catalogue of eruptions has changed.
+
+A forcing file made by `CesmFrc` has four time records for each date with eruptions,
+and the records of one date only depend on the eruptions at that date. When a few
+eruptions are added, removed or moved to another date, only the records of the dates
+that are affected need to be computed again. All other records are kept, and are moved
+within the file when records are inserted or removed before them.
+
+The file is patched in place when it keeps the same number of time records or grows.
+A netCDF file cannot shrink along its unlimited dimension, so when time records are
+removed, the patched file is written to a new file that replaces the old one.
+"""
+
+import os
+from collections.abc import Iterator
+from typing import Any, Optional
+
+import netCDF4
+import numpy as np
+from volcano_cooking.modules.create.create_cesm_frc import (
+    CesmFrc,
+    _make_slab,
+    find_coords_file,
+)
+from volcano_cooking.modules.create.write_frc_file import _BUFFER_BYTES
+
+
+def catalogue_diff(old: CesmFrc, new: CesmFrc) -> tuple[np.ndarray, np.ndarray]:
+    """Find the eruptions that differ between two catalogues.
+
+    An eruption that is moved to another date, or has any of its properties changed,
+    is found as removed from `old` and added to `new`.
+
+    Parameters
+    ----------
+    old : CesmFrc
+        The catalogue the forcing file was made from, after `make_dataset`.
+    new : CesmFrc
+        The edited catalogue, after `make_dataset`.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Indices of the eruptions removed from `old` and added to `new`
+    """
+    rows = [
+        np.stack(
+            [
+                frc.block_dates[frc.blocks],
+                frc.tes,
+                frc.lats,
+                frc.lons,
+                frc.bots,
+                frc.tops,
+                frc.veis,
+                frc.min_lats,
+            ],
+            axis=1,
+        )
+        for frc in (old, new)
+    ]
+    _, keys = np.unique(np.concatenate(rows), axis=0, return_inverse=True)
+    keys = keys.ravel()
+    # Identical eruptions are told apart by the order they appear in
+    ids = [
+        _occurrence(k) * len(keys) + k
+        for k in (keys[: len(rows[0])], keys[len(rows[0]) :])
+    ]
+    removed = np.nonzero(~np.isin(ids[0], ids[1]))[0]
+    added = np.nonzero(~np.isin(ids[1], ids[0]))[0]
+    return removed, added
+
+
+def _occurrence(keys: np.ndarray) -> np.ndarray:
+    """Count how many times each key has been seen before."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    rank = np.empty(len(keys), dtype=np.int64)
+    rank[order] = np.arange(len(keys)) - np.searchsorted(sorted_keys, sorted_keys)
+    return rank
+
+
+def _runs(
+    dst: np.ndarray, src: np.ndarray, size: int
+) -> Iterator[tuple[int, int, int]]:
+    """Split a copy of records into contiguous runs of at most `size` records.
+
+    Yields
+    ------
+    tuple[int, int, int]
+        The first destination record, the first source record and the length of a run
+    """
+    breaks = np.nonzero((np.diff(dst) != 1) | (np.diff(src) != 1))[0] + 1
+    for lo, hi in zip(np.r_[0, breaks], np.r_[breaks, len(dst)]):
+        for start in range(lo, hi, size):
+            yield int(dst[start]), int(src[start]), int(min(size, hi - start))
+
+
+def _copy_records(
+    src: netCDF4.Variable,
+    dst: netCDF4.Variable,
+    records: np.ndarray,
+    size: int,
+) -> None:
+    """Copy the records `records[i]` of `src` to record `i` of `dst`.
+
+    When `src` and `dst` are the same variable, records are moved in an order where no
+    record is overwritten before it has been moved. Since `records` is increasing,
+    records moving towards the start are moved first, from the start, and records
+    moving towards the end last, from the end.
+    """
+    new = np.nonzero(records >= 0)[0]
+    old = records[new]
+    if src is dst:
+        keep = new != old
+        new, old = new[keep], old[keep]
+    runs = list(_runs(new, old, size))
+    backward = [r for r in runs if r[0] < r[1]]
+    forward = [r for r in reversed(runs) if r[0] > r[1]]
+    same = [r for r in runs if r[0] == r[1]]
+    for d0, s0, n in backward + forward + same:
+        dst[d0 : d0 + n] = src[s0 : s0 + n]
+
+
+def _clone_file(nc: netCDF4.Dataset, path: str) -> netCDF4.Dataset:
+    """Create an empty copy of `nc`, with the same format, variables and attributes."""
+    out = netCDF4.Dataset(path, "w", format=nc.data_model)
+    for name, dim in nc.dimensions.items():
+        out.createDimension(name, None if dim.isunlimited() else len(dim))
+    out.setncatts(nc.__dict__)
+    for name, var in nc.variables.items():
+        # netCDF3 variables have no filters, chunks or quantisation
+        options: dict[str, Any] = {"fill_value": getattr(var, "_FillValue", None)}
+        if nc.data_model.startswith("NETCDF4"):
+            filters = var.filters()
+            quantization = var.quantization()
+            options.update(
+                zlib=filters["zlib"],
+                complevel=filters["complevel"],
+                shuffle=filters["shuffle"],
+                chunksizes=None if var.chunking() == "contiguous" else var.chunking(),
+                significant_digits=None if quantization is None else quantization[0],
+            )
+        new_var = out.createVariable(name, var.dtype, var.dimensions, **options)
+        new_var.setncatts({k: v for k, v in var.__dict__.items() if k != "_FillValue"})
+        if not any(nc.dimensions[d].isunlimited() for d in var.dimensions):
+            new_var[:] = var[:]
+    return out
+
+
+def patch_cesm_frc(  # noqa: PLR0913
+    frc_file: str,
+    old_in_file: str,
+    new_in_file: str,
+    res: Optional[str] = None,
+    coords_file: Optional[str] = None,
+    vei_spread: bool = False,
+    pin_min_lat: Optional[float] = None,
+) -> int:
+    """Update a forcing file made from `old_in_file` to match `new_in_file`.
+
+    The settings must be the same as those used when the forcing file was made, and the
+    defaults are the same as in `make_cesm_frc`.
+
+    Parameters
+    ----------
+    frc_file : str
+        Forcing file made by `CesmFrc` from `old_in_file`, which is patched.
+    old_in_file : str
+        Source file the forcing file was made from.
+    new_in_file : str
+        Edited source file, e.g. made with `volcano-cooking --shift-eruption-to-date`.
+    res : Optional[str]
+        Horizontal resolution, either '1deg' or '2deg'.
+    coords_file : Optional[str]
+        Coordinate file to use. Found from `res` by default.
+    vei_spread : bool
+        Spread VEI 5 and VEI 6 eruptions over several grid columns.
+    pin_min_lat : Optional[float]
+        Spread Pinatubo over all latitudes from `pin_min_lat` to its own latitude.
+
+    Returns
+    -------
+    int
+        The number of `stratvolc` time records that were computed again
+
+    Raises
+    ------
+    FileNotFoundError
+        If the forcing file cannot be found.
+    ValueError
+        If the dates of the forcing file do not match `old_in_file`, or if the file is
+        packed and the new emission rates do not fit within the packed range.
+    """
+    if not os.path.isfile(frc_file):
+        raise FileNotFoundError(f"Cannot find file named {frc_file}.")
+    res, coords_file = find_coords_file(res, coords_file)
+    old, new = (
+        CesmFrc(f, coords_file, res=res, vei_spread=vei_spread, pin_min_lat=pin_min_lat)
+        for f in (old_in_file, new_in_file)
+    )
+    old.make_dataset()
+    new.make_dataset()
+    removed, added = catalogue_diff(old, new)
+    changed = np.union1d(
+        old.block_dates[old.blocks[removed]], new.block_dates[new.blocks[added]]
+    )
+    # Source record in the old file of each record in the new file, or -1 if the
+    # record is computed again.
+    kept = ~np.isin(new.block_dates, changed)
+    old_block = np.searchsorted(old.block_dates, new.block_dates)
+    records = np.full(len(new.date), -1, dtype=np.int64)
+    records[0], records[-1] = 0, len(old.date) - 1
+    for k in range(4):
+        records[1 + k + 4 * np.nonzero(kept)[0]] = 1 + k + 4 * old_block[kept]
+    todo = np.nonzero(~kept)[0]
+
+    with netCDF4.Dataset(frc_file, "a") as nc:
+        stratvolc = nc["stratvolc"]
+        if not (
+            np.array_equal(nc["date"][:], old.date)
+            and np.array_equal(nc["datesec"][:], old.datesec)
+        ):
+            raise ValueError(f"The dates in {frc_file} do not match {old_in_file}.")
+        if "scale_factor" in stratvolc.ncattrs() and len(todo):
+            sums = np.bincount(new.blocks, weights=new.emis_rate)[todo]
+            vmax = stratvolc.add_offset + np.iinfo(stratvolc.dtype).max * (
+                stratvolc.scale_factor
+            )
+            if np.max(sums) > vmax:
+                raise ValueError(
+                    f"Emission rates of up to {np.max(sums):.3e} do not fit in the "
+                    + f"packed range of {frc_file}, which ends at {vmax:.3e}."
+                )
+        record_bytes = int(np.prod(stratvolc.shape[1:])) * stratvolc.dtype.itemsize
+        step = max(1, _BUFFER_BYTES // record_bytes)
+        shrink = len(new.date) < len(old.date)
+        out = _clone_file(nc, f"{frc_file}.patch") if shrink else nc
+        try:
+            out_var = out["stratvolc"]
+            # Copy the stored values, so that packed values are not packed again
+            stratvolc.set_auto_maskandscale(False)
+            out_var.set_auto_maskandscale(False)
+            _copy_records(stratvolc, out_var, records, step)
+            out_var.set_auto_maskandscale(True)
+            out["date"][:] = new.date
+            out["datesec"][:] = new.datesec
+            state = {
+                "factors": new.factors,
+                "blocks": new.blocks,
+                "emis_rate": new.emis_rate,
+                "n_cols": new.n_cols,
+                "col_ptr": new.col_ptr,
+                "col_lat": new.col_lat,
+                "col_lon": new.col_lon,
+            }
+            for b0, _, n in _runs(todo, todo, max(1, step // 4)):
+                slab = np.zeros((4 * n, *out_var.shape[1:]), dtype=np.float32)
+                _make_slab(state, b0, b0 + n, slab)
+                out_var[1 + 4 * b0 : 1 + 4 * (b0 + n)] = slab
+            attrs = new._global_attrs(frc_file)
+            attrs["data_script"] = (
+                out.getncattr("data_script")
+                + f"\nPatched from {old_in_file} to {new_in_file}"
+            )
+            out.setncatts(attrs)
+        finally:
+            if shrink:
+                out.close()
+    if shrink:
+        os.replace(f"{frc_file}.patch", frc_file)
+    return 4 * len(todo)
@@ -9,29 +9,160 @@ Need to reset the time dimension, and the variables date, datesec and stratvolc.
 `datesec` are ints with seconds since midnight info
 - Choose noon (43200), for example
 
-`stratvolc` is a bit more tricky, but not too bad. Set all events to some lat/lon (0, 0),
-and find a suitable altitude (perhaps from `volcano-cooking`). Then the values are set
-using the implementations from `volcano-cooking`.
+`stratvolc` is a bit more tricky, but not too bad. Place each event in the grid column
+closest to its lat/lon, and find a suitable altitude (perhaps from `volcano-cooking`).
+Then the values are set using the implementations from `volcano-cooking`.
 """
 
 import os
 from collections.abc import Mapping
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import Any, Optional, Union
 
 import numpy as np
 import xarray as xr
+from dask.array.core import Array, from_array
 
 # from volcano_cooking import helper_scripts
 from volcano_cooking.modules import convert
 from volcano_cooking.modules.create.create_data import Data
+from volcano_cooking.modules.create.frc_template import load_template
+from volcano_cooking.modules.create.write_frc_file import (
+    _BUFFER_BYTES,
+    FrcWriter,
+    frc_encoding,
+    map_blocks,
+)
 
-if TYPE_CHECKING:
-    from xarray.backends.api import T_NetcdfTypes
+
+class SparseFrc:
+    """Sparse representation of the `stratvolc` forcing variable.
+
+    Only the non-zero cells are stored, as their (time, altitude, lat, lon) indices and
+    values. The dense array is made when the object is indexed, and only for the time
+    steps that are asked for, which makes it possible to write the full array to file
+    one block of time steps at a time.
+
+    Parameters
+    ----------
+    shape : tuple[int, int, int, int]
+        The shape of the dense array, ordered as (time, altitude, lat, lon).
+    time : np.ndarray
+        Time index of each non-zero cell
+    altitude : np.ndarray
+        Altitude index of each non-zero cell
+    lat : np.ndarray
+        Latitude index of each non-zero cell
+    lon : np.ndarray
+        Longitude index of each non-zero cell
+    value : np.ndarray
+        Value of each non-zero cell
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, int, int, int],
+        time: np.ndarray,
+        altitude: np.ndarray,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        value: np.ndarray,
+    ) -> None:
+        # Sorted by time so that a block of time steps is a contiguous slice.
+        order = np.argsort(time, kind="stable")
+        self.time = time[order]
+        self.altitude = altitude[order]
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.value = value[order].astype(np.float32)
+        self.shape = shape
+        self.dtype = self.value.dtype
+        self.ndim = len(shape)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the non-zero cells.
+
+        Returns
+        -------
+        int
+            Total number of bytes of the index and value arrays
+        """
+        return sum(
+            a.nbytes for a in (self.time, self.altitude, self.lat, self.lon, self.value)
+        )
+
+    def block_size(self) -> int:
+        """Return the number of time steps in one block written to file.
+
+        Returns
+        -------
+        int
+            Number of time steps that fits within the buffer size
+        """
+        step_bytes = int(np.prod(self.shape[1:])) * self.dtype.itemsize
+        return max(1, _BUFFER_BYTES // step_bytes)
+
+    def dense(self, t0: int, t1: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Make the dense array for the time steps from `t0` up to `t1`.
+
+        Parameters
+        ----------
+        t0 : int
+            First time step
+        t1 : int
+            End of the time steps, not included
+        out : Optional[np.ndarray]
+            Zero initialised array the result is placed in.
+
+        Returns
+        -------
+        np.ndarray
+            The dense array of shape (t1 - t0, altitude, lat, lon)
+        """
+        i0, i1 = np.searchsorted(self.time, [t0, t1])
+        if out is None:
+            out = np.zeros((max(t1 - t0, 0), *self.shape[1:]), dtype=self.dtype)
+        out[
+            self.time[i0:i1] - t0,
+            self.altitude[i0:i1],
+            self.lat[i0:i1],
+            self.lon[i0:i1],
+        ] = self.value[i0:i1]
+        return out
+
+    def __getitem__(self, key: Union[int, slice, tuple]) -> np.ndarray:
+        """Return the dense array at `key`, making only the needed time steps."""
+        key = key if isinstance(key, tuple) else (key,)
+        t = key[0] if key else slice(None)
+        if isinstance(t, slice):
+            start, stop, step = t.indices(self.shape[0])
+            return self.dense(start, stop)[(slice(None, None, step), *key[1:])]
+        if isinstance(t, (int, np.integer)):
+            t = int(t) % self.shape[0]
+            return self.dense(t, t + 1)[(0, *key[1:])]
+        return self.dense(0, self.shape[0])[key]
+
+    def to_dask(self) -> Array:
+        """Return a lazy array that is made dense one block of time steps at a time.
+
+        Returns
+        -------
+        Array
+            Dask array backed by this sparse representation
+        """
+        return from_array(
+            self, chunks=(self.block_size(), -1, -1, -1), asarray=False, fancy=False
+        )
 
 
 class ReWrite(Data):
-    """Change the volcanic forcing used in CESM."""
+    """Change the volcanic forcing used in CESM.
+
+    Each eruption gets its own time record at noon of its date, with `stratvolc` in
+    molecules/cm3/s as in `CesmFrc`, where the mass is emitted over six hours and
+    eruptions with more than 15 Tg SO2 are scaled by 1/1.8.
+    """
 
     def make_dataset(self) -> None:  # noqa: PLR0915
         """Re-writes the original netCDF file with new variables.
@@ -46,13 +177,10 @@ class ReWrite(Data):
         file = os.path.join(
             "data",
             "originals",
-            "VolcanEESMv3.11_SO2_850-2016_Mscale_Zreduc_2deg_c191125",
+            "VolcanEESMv3.11_SO2_850-2016_Mscale_Zreduc_2deg_c191125.nc",
         )
-        if not os.path.exists(f"{file}.nc"):
-            raise FileNotFoundError(
-                f"{file} not found. Consult README on how to download."
-            )
-        f_orig = xr.open_dataset(f"{file}.nc", decode_times=False)
+        # Only the metadata is used, and is read from a small sidecar file if possible.
+        f_orig = load_template(file)
         # Check that the file contain crucial data.
         needed_dims = ["time", "altitude", "lat", "lon"]
         if any(d not in f_orig.dims for d in needed_dims):
@@ -66,7 +194,6 @@ class ReWrite(Data):
             )
         size = len(self.yoes)
         _, d_alt, d_lat, d_lon = f_orig["stratvolc"].shape
-        new_eruptions = np.zeros((size, d_alt, d_lat, d_lon), dtype=np.float32)
         # We keep all spatial dimensions the same, but delete and re-sets the temporal
         # dimension.
         self.my_frc = xr.Dataset()
@@ -74,57 +201,54 @@ class ReWrite(Data):
         self.mxihs: np.ndarray
         self.tes: np.ndarray
         # NOTE: which altitudes should we choose? Use bound from min and max injection
-        # height, and the same emission on all altitudes. The emission at a given time
-        # changes with altitude, but is generally of the same magnitude. Probably okay.
-        zero_lat = np.abs(f_orig.lat.data).argmin()  # Find index closest to lat = 0
-        zero_lon = np.abs(f_orig.lon.data).argmin()  # Find index closest to lon = 0
+        # height, and the same emission on all altitudes, weighted by how much of each
+        # level is covered. The emission at a given time changes with altitude, but is
+        # generally of the same magnitude. Probably okay.
+        # Each eruption is placed in the grid column closest to its own lat/lon.
+        geometry = convert.grid_geometry("2deg")
+        if (len(geometry.lat), len(geometry.lon)) != (d_lat, d_lon):
+            raise IndexError(
+                f"The grid of the coordinate file, {len(geometry.lat)}x"
+                + f"{len(geometry.lon)}, does not match 'stratvolc', {d_lat}x{d_lon}."
+            )
+        lat_idx, lon_idx = geometry.nearest(self.lats, self.lons)
         self.miihs, self.mxihs = convert.adjust_altitude_range(
             self.miihs, self.mxihs, self.tes
         )
-        self.tes = convert.adjust_emissions(
-            self.miihs,
-            self.mxihs,
-            self.tes,
-            np.array([zero_lon]),
-            np.array([zero_lat]),
-        )
+        column_emis = convert.adjust_emissions(
+            self.tes, geometry.column_area[lat_idx]
+        )  # molecules/cm2/s
         ai_dim = "altitude_int"
-        self.my_frc = self.my_frc.expand_dims(ai_dim=f_orig[ai_dim])
+        self.my_frc = self.my_frc.assign_coords({ai_dim: f_orig[ai_dim].data})
         self.my_frc = self.my_frc.assign_attrs(**f_orig.attrs)
         self.my_frc[ai_dim] = self.my_frc[ai_dim].assign_attrs(**f_orig[ai_dim].attrs)
         self.my_frc.attrs["data_summary"] = ""
-        # Loops over time to set all spatial dimensions
-        reset = False
-        for i, emission in enumerate(self.tes):
-            alt_range = f_orig.altitude.where(
-                (f_orig.altitude <= self.mxihs[i]) & (f_orig.altitude >= self.miihs[i]),
-                drop=True,
-            ).astype(int)
-            if not any(alt_range.data):
-                if not reset:
-                    txt_0 = "Re-setting alt. range for eruption at time:\n"
-                    self.my_frc.attrs["data_summary"] += txt_0
-                    reset = True
-                alt_range = f_orig.altitude[-10:].astype(int)
-                date_str = (
-                    10000 * self.yoes[i].astype(np.float32)
-                    + 100 * self.moes[i].astype(np.float32)
-                    + self.does[i].astype(np.float32)
-                )
-                d = "0" * (8 - len(str(int(date_str)))) + str(int(date_str))
-                amin_0 = f"{self.miihs[i]:.3f}"
-                amax_0 = f"{self.mxihs[i]:.3f}"
-                amin_1 = f"{alt_range[0].data}"
-                amax_1 = f"{alt_range[-1].data}"
-                txt = f"{d}: ({amin_0}, {amax_0}) -> ({amin_1}, {amax_1})\n"
-                self.my_frc.attrs["data_summary"] += txt
-                self.mxihs[i] = alt_range[-1]
-                self.miihs[i] = alt_range[0]
-            new_eruptions[i, alt_range, zero_lat, zero_lon] = emission
+        # Fraction of each altitude level covered by each eruption
+        overlap, reset = convert.altitude_overlap(
+            self.miihs, self.mxihs, f_orig[ai_dim].data
+        )
+        if np.any(reset):
+            self.__summarise_reset(reset, f_orig.altitude.data[-10:].astype(int))
+        # Emission depth in cm of the levels covered, 1 km = 1e5 cm each
+        depth = overlap.sum(axis=1).A1 * 1e5
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.emis_rate = column_emis / depth  # molecules/cm3/s
+        # Each eruption only touches one column and a few altitude levels, so only the
+        # indices of the non-zero cells are kept.
+        coo = overlap.tocoo()
+        self.sparse_frc = SparseFrc(
+            (size, d_alt, d_lat, d_lon),
+            coo.row.astype(np.int64),
+            coo.col.astype(np.int64),
+            lat_idx[coo.row].astype(np.int64),
+            lon_idx[coo.row].astype(np.int64),
+            (self.emis_rate[coo.row] * coo.data).astype(np.float32),
+        )
+        # YYYYMMDD does not fit in float32 without rounding
         new_dates = (
-            10000 * self.yoes.astype(np.float32)
-            + 100 * self.moes.astype(np.float32)
-            + self.does.astype(np.float32)
+            10000 * self.yoes.astype(np.int64)
+            + 100 * self.moes.astype(np.int64)
+            + self.does.astype(np.int64)
         )
         new_datesecs = np.array([43200.0 for _ in range(size)])  # Noon
 
@@ -134,7 +258,7 @@ class ReWrite(Data):
             # needed.
             if v == "stratvolc":
                 the_input = xr.DataArray(
-                    new_eruptions,
+                    self.sparse_frc.to_dask(),
                     dims=["time", "altitude", "lat", "lon"],
                     coords={
                         "altitude": f_orig.altitude,
@@ -155,6 +279,17 @@ class ReWrite(Data):
 
         # helper_scripts.compare_datasets(self.my_frc, f_orig)
 
+    def __summarise_reset(self, reset: np.ndarray, alt_range: np.ndarray) -> None:
+        dates = 10000 * self.yoes[reset].astype(np.int64)
+        dates += 100 * self.moes[reset].astype(np.int64) + self.does[reset]
+        txt = "Re-setting alt. range for eruption at time:\n"
+        for d, amin, amax in zip(dates, self.miihs[reset], self.mxihs[reset]):
+            txt += f"{d:08d}: ({amin:.3f}, {amax:.3f}) -> "
+            txt += f"({alt_range[0]}, {alt_range[-1]})\n"
+        self.my_frc.attrs["data_summary"] += txt
+        self.mxihs[reset] = alt_range[-1]
+        self.miihs[reset] = alt_range[0]
+
     def __set_global_attrs(self, file) -> None:  # noqa: PLR0912
         for a in self.my_frc.attrs:
             if a == "filename":
@@ -192,9 +327,9 @@ class ReWrite(Data):
                 )
             elif a == "data_summary":
                 date_str = (
-                    10000 * self.yoes.astype(np.float32)
-                    + 100 * self.moes.astype(np.float32)
-                    + self.does.astype(np.float32)
+                    10000 * self.yoes.astype(np.int64)
+                    + 100 * self.moes.astype(np.int64)
+                    + self.does.astype(np.int64)
                 )
                 tot_width = 40
                 w_1, w_23, w_4, w_5 = 8, 7, 3, 11
@@ -202,7 +337,7 @@ class ReWrite(Data):
                 summary += "=" * tot_width + "\n"
                 summary += "YYYYMMDD AltMin  AltMax  VEI Em(cm-3s-1)\n"
                 for d, amin, amax, v, e in zip(
-                    date_str, self.miihs, self.mxihs, self.veis, self.tes
+                    date_str, self.miihs, self.mxihs, self.veis, self.emis_rate
                 ):
                     d_ = "0" * (w_1 - len(str(int(d)))) + str(int(d)) + " "
                     amin_ = f"{amin:.3f}".rjust(w_23) + " "
@@ -214,9 +349,23 @@ class ReWrite(Data):
                 self.my_frc.attrs[a] += summary
                 self.my_frc.attrs[a] = self.my_frc.attrs[a]
 
-    def save_to_file(self) -> None:
+    def save_to_file(
+        self,
+        workers: int = 1,
+        out_format: str = "netcdf3",
+        name: str = "VolcanEESMv3.11_SO2_850-2016_Mscale_Zreduc_2deg_c191125_edit",
+    ) -> None:
         """Save the re-written forcing file with the date at the end.
 
+        Parameters
+        ----------
+        workers : int
+            Number of processes used to make the dense blocks of `stratvolc`.
+        out_format : str
+            Output format, one of `FRC_FORMATS`.
+        name : str
+            The file name, which is followed by the date and time of creation.
+
         Raises
         ------
         ValueError
@@ -224,17 +373,44 @@ class ReWrite(Data):
         """
         if not hasattr(self, "my_frc"):
             raise ValueError("You must make the dataset with 'make_dataset' first.")
-        file = "VolcanEESMv3.11_SO2_850-2016_Mscale_Zreduc_2deg_c191125_edit"
-        out_file = self.check_dir("nc", name=file)
+        out_file = self.check_dir("nc", name=name)
         self.__set_global_attrs(file=out_file)
+        sparse = self.sparse_frc
+        # No grid cell can get more than the sum of all values at the same time step.
+        vmax = float(np.max(np.bincount(sparse.time, weights=sparse.value), initial=0))
+        format, stratvolc = frc_encoding(out_format, sparse.shape[1:], vmax=vmax)
         encoding: Mapping = {
             "lat": {"_FillValue": None},
             "lon": {"_FillValue": None},
             "altitude": {"_FillValue": None},
             "altitude_int": {"_FillValue": None},
-            "stratvolc": {"_FillValue": 9.96921e36},
+            "stratvolc": stratvolc,
             "date": {"_FillValue": -2147483647},
             "datesec": {"_FillValue": -2147483647},
         }
-        format: T_NetcdfTypes = "NETCDF3_64BIT"
-        self.my_frc.to_netcdf(path=out_file, format=format, encoding=encoding)
+        # The file is created with the metadata of `my_frc`, then the time dependent
+        # variables are appended one block of eruptions at a time.
+        with FrcWriter(out_file, self.my_frc, format=format, encoding=encoding) as w:
+            size, *shape = self.sparse_frc.shape
+            bounds = [
+                (t0, min(t0 + w.block_size, size))
+                for t0 in range(0, size, w.block_size)
+            ]
+            blocks = map_blocks(
+                _dense_block,
+                {"sparse_frc": self.sparse_frc},
+                bounds,
+                lambda t0, t1: (t1 - t0, *shape),
+                dtype=self.sparse_frc.dtype,
+                workers=workers,
+            )
+            for (t0, t1), block in zip(bounds, blocks):
+                w.append(
+                    stratvolc=block,
+                    date=self.my_frc["date"].data[t0:t1],
+                    datesec=self.my_frc["datesec"].data[t0:t1],
+                )
+
+
+def _dense_block(state: Mapping[str, Any], t0: int, t1: int, out: np.ndarray) -> None:
+    state["sparse_frc"].dense(t0, t1, out=out)
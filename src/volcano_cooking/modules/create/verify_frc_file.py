@@ -0,0 +1,179 @@
+"""Check that a gridded forcing file conserves the mass of the source catalogue.
+
+The `stratvolc` variable is read a block of time steps at a time, and each time step is
+integrated over altitude (1 km = 1e5 cm levels) and the area of the grid columns to give
+an emission rate in molecules/s. The time records of each date are then integrated over
+time, and the mass in Tg SO2 is compared with the total emission of all eruptions at the
+same date in the catalogue.
+
+Records at the same date and time are summed first. The records of one date are then
+integrated with the trapezoidal rule over `datesec`, which gives the six hour emission
+of the four records per date made by `CesmFrc`. A date with a single time, as in files
+made by `ReWrite` where each eruption has its own record at noon, is taken to emit for
+six hours at the rate of that time.
+"""
+
+from typing import Optional
+
+import netCDF4
+import numpy as np
+import xarray as xr
+from volcano_cooking.modules import convert
+from volcano_cooking.modules.create.create_cesm_frc import find_coords_file
+from volcano_cooking.modules.create.write_frc_file import _BUFFER_BYTES
+
+
+def frc_mass(
+    frc_file: str, coords_file: Optional[str] = None, res: Optional[str] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the mass of SO2 emitted at each date of a forcing file.
+
+    Parameters
+    ----------
+    frc_file : str
+        Forcing file with the variables `stratvolc`, `date` and `datesec`.
+    coords_file : Optional[str]
+        Coordinate file of the grid. Found from `res` by default.
+    res : Optional[str]
+        Horizontal resolution, either '1deg' or '2deg'.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The dates and the mass in Tg SO2 emitted at each date
+
+    Raises
+    ------
+    IndexError
+        If the grid of the coordinate file does not match the forcing file.
+    """
+    _, coords_file = find_coords_file(res, coords_file)
+    geometry = convert.GridGeometry.from_file(coords_file)
+    with netCDF4.Dataset(frc_file) as f:
+        date = np.asarray(f["date"][:], dtype=np.int64)
+        datesec = np.asarray(f["datesec"][:], dtype=np.int64)
+        stratvolc = f["stratvolc"]
+        n_times, *shape = stratvolc.shape
+        if (shape[1], shape[2]) != (len(geometry.lat), len(geometry.lon)):
+            raise IndexError(
+                f"The grid of {coords_file}, {len(geometry.lat)}x{len(geometry.lon)}, "
+                + f"does not match 'stratvolc' in {frc_file}, {shape[1]}x{shape[2]}."
+            )
+        step = max(1, _BUFFER_BYTES // (int(np.prod(shape)) * 8))
+        rate = np.empty(n_times)
+        for t0 in range(0, n_times, step):
+            block = np.ma.filled(stratvolc[t0 : t0 + step], 0)
+            # Integrate over altitude and longitude first, then over the column area,
+            # which only depends on latitude.
+            rate[t0 : t0 + step] = (
+                block.sum(axis=(1, 3), dtype=np.float64) @ geometry.column_area
+            )
+    rate *= 1e5  # molecules/s
+    # Records at the same time emit together
+    keys, inverse = np.unique(
+        np.stack([date, datesec], axis=1), axis=0, return_inverse=True
+    )
+    rate = np.bincount(inverse.ravel(), weights=rate, minlength=len(keys))
+    date, datesec = keys[:, 0], keys[:, 1]
+    same = date[1:] == date[:-1]
+    gap = np.where(same, np.diff(datesec), 0)
+    duration = (np.r_[0, gap] + np.r_[gap, 0]) / 2
+    duration[~(np.r_[False, same] | np.r_[same, False])] = convert.EMISSION_DURATION
+    dates, inverse = np.unique(date, return_inverse=True)
+    mass = (
+        np.bincount(inverse.ravel(), weights=rate * duration)
+        / convert.AVOGADRO
+        * convert.MW_SO2
+    )
+    return dates, mass / 1e9
+
+
+def catalogue_mass(
+    in_file: str,
+    first_year: Optional[int] = None,
+    last_year: Optional[int] = None,
+    mass_scaling: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the mass of SO2 emitted at each date of a catalogue.
+
+    Parameters
+    ----------
+    in_file : str
+        Source file made by `create.Data`.
+    first_year : Optional[int]
+        Eruptions before this year are not included.
+    last_year : Optional[int]
+        Eruptions after this year are not included.
+    mass_scaling : bool
+        Scale the mass of eruptions with more than 15 Tg SO2 by a factor 1/1.8.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The dates and the mass in Tg SO2 emitted at each date
+    """
+    with xr.open_dataset(in_file, decode_times=False) as f:
+        tes = f["Total_Emission"].data.astype(np.float64)
+        yoes = f["Year_of_Emission"].data.astype(np.int64)
+        moes = f["Month_of_Emission"].data.astype(np.int64)
+        does = f["Day_of_Emission"].data.astype(np.int64)
+    keep = np.ones(len(tes), dtype=bool)
+    if first_year is not None:
+        keep &= yoes >= first_year
+    if last_year is not None:
+        keep &= yoes <= last_year
+    if mass_scaling:
+        tes = np.where(tes >= 15, tes / 1.8, tes)  # noqa: PLR2004
+    dates, inverse = np.unique(
+        (10000 * yoes + 100 * moes + does)[keep], return_inverse=True
+    )
+    return dates, np.bincount(inverse.ravel(), weights=tes[keep], minlength=len(dates))
+
+
+def verify_frc(  # noqa: PLR0913
+    frc_file: str,
+    in_file: str,
+    coords_file: Optional[str] = None,
+    res: Optional[str] = None,
+    first_year: Optional[int] = None,
+    last_year: Optional[int] = None,
+    mass_scaling: bool = False,
+    rtol: float = 1e-4,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find all dates where a forcing file does not conserve the catalogue mass.
+
+    Parameters
+    ----------
+    frc_file : str
+        Forcing file with the variables `stratvolc`, `date` and `datesec`.
+    in_file : str
+        Source file made by `create.Data` that the forcing file was made from.
+    coords_file : Optional[str]
+        Coordinate file of the grid. Found from `res` by default.
+    res : Optional[str]
+        Horizontal resolution, either '1deg' or '2deg'.
+    first_year : Optional[int]
+        Eruptions in the catalogue before this year are not expected in the file.
+    last_year : Optional[int]
+        Eruptions in the catalogue after this year are not expected in the file.
+    mass_scaling : bool
+        The mass of eruptions with more than 15 Tg SO2 was scaled by 1/1.8.
+    rtol : float
+        Relative tolerance of the mass at each date.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        The dates that do not match, and the mass in Tg SO2 expected from the catalogue
+        and found in the forcing file at those dates. The arrays are empty if all dates
+        match.
+    """
+    frc_dates, found = frc_mass(frc_file, coords_file, res)
+    cat_dates, expected = catalogue_mass(in_file, first_year, last_year, mass_scaling)
+    dates = np.union1d(frc_dates, cat_dates)
+    found_all = np.zeros(len(dates))
+    expected_all = np.zeros(len(dates))
+    found_all[np.searchsorted(dates, frc_dates)] = found
+    expected_all[np.searchsorted(dates, cat_dates)] = expected
+    bad = ~np.isclose(found_all, expected_all, rtol=rtol, atol=0)
+    return dates[bad], expected_all[bad], found_all[bad]
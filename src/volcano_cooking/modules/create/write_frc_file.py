@@ -0,0 +1,341 @@
+"""Write forcing files one block of time steps at a time.
+
+The forcing files used by CESM2 are large, since the full (time, altitude, lat, lon)
+array is stored. Instead of making the full array in memory and writing it in one go,
+the file is created with an unlimited `time` dimension and the dimensions, coordinates
+and attributes of a template dataset. The time dependent variables are then appended
+block by block, and the file is synced to disk after each block so that a crash only
+loses the block that was being written.
+
+The output format is chosen with `frc_encoding`, from plain netCDF3 (64 bit offset or
+CDF5) to compressed netCDF4 where `stratvolc` may also be packed to 16 bit integers or
+quantised to a number of significant digits.
+
+The blocks can be computed by a pool of worker processes with `map_blocks`. Each worker
+fills a block in shared memory, and the parent process writes the blocks in order.
+"""
+
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Literal, Optional, cast
+
+import netCDF4
+import numpy as np
+import xarray as xr
+from volcano_cooking.modules.create.formats import FRC_FORMATS
+
+_Format = Literal[
+    "NETCDF4",
+    "NETCDF4_CLASSIC",
+    "NETCDF3_CLASSIC",
+    "NETCDF3_64BIT_OFFSET",
+    "NETCDF3_64BIT_DATA",
+]
+# xarray names the 64 bit offset format differently than netCDF4
+_XR_FORMATS = {"NETCDF3_64BIT": "NETCDF3_64BIT_OFFSET"}
+# Upper limit on the size of one block of time steps that is kept in memory.
+_BUFFER_BYTES = 2**26
+
+
+class FrcWriter:
+    """Write a netCDF file along an unlimited time dimension.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file that is created
+    template : xr.Dataset
+        Dataset with the dimensions, variables and attributes of the file. Variables
+        without the time dimension are written when the file is created, the size of
+        the time dimension in the template is not used.
+    format : str
+        The netCDF format of the file, e.g. 'NETCDF3_64BIT' or 'NETCDF3_64BIT_DATA'. The
+        names used by xarray are accepted.
+    encoding : Optional[Mapping]
+        Encoding of each variable, for example `{"stratvolc": {"_FillValue": 1e36}}`.
+        A `_FillValue` of `None` means no fill value is set. Besides `_FillValue`, the
+        keys `dtype`, `scale_factor` and `add_offset` are used for packing, and all
+        other keys are passed on to `netCDF4.Dataset.createVariable`, e.g. `zlib`,
+        `complevel`, `shuffle`, `chunksizes` and `significant_digits`.
+    time_dim : str
+        Name of the unlimited dimension.
+
+    Attributes
+    ----------
+    append : method
+        Write the next block of time steps to the file.
+    block_size : int
+        Number of time steps that fit within the size of the memory buffer.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        template: xr.Dataset,
+        format: str = "NETCDF3_64BIT",
+        encoding: Optional[Mapping] = None,
+        time_dim: str = "time",
+    ) -> None:
+        encoding = {} if encoding is None else encoding
+        self.path = path
+        self.time_dim = time_dim
+        self.n_records = 0
+        self.time_vars: list[str] = []
+        nc_format = cast(_Format, _XR_FORMATS.get(format, format))
+        self._nc = netCDF4.Dataset(path, "w", format=nc_format)
+        self._nc.createDimension(time_dim, None)
+        for dim, size in template.sizes.items():
+            if dim != time_dim:
+                self._nc.createDimension(str(dim), size)
+        self._nc.setncatts(template.attrs)
+        record_bytes = 0
+        for name, var in template.variables.items():
+            enc = dict(encoding.get(name, {}))
+            fill_value = enc.pop("_FillValue", None)
+            dtype = enc.pop("dtype", var.dtype)
+            packing = {
+                k: enc.pop(k) for k in ("scale_factor", "add_offset") if k in enc
+            }
+            nc_var = self._nc.createVariable(
+                str(name),
+                dtype,
+                tuple(str(d) for d in var.dims),
+                fill_value=fill_value,
+                **enc,
+            )
+            nc_var.setncatts({k: v for k, v in var.attrs.items() if k != "_FillValue"})
+            # Values are packed by netCDF4 when they are written.
+            nc_var.setncatts(packing)
+            if time_dim in var.dims:
+                self.time_vars.append(str(name))
+                shape = [s for d, s in zip(var.dims, var.shape) if d != time_dim]
+                record_bytes += int(np.prod(shape)) * var.dtype.itemsize
+            else:
+                nc_var[:] = var.values
+        self.block_size = max(1, _BUFFER_BYTES // max(record_bytes, 1))
+        self._nc.sync()
+
+    def append(self, **data: np.ndarray) -> None:
+        """Write the next block of time steps to the file.
+
+        Parameters
+        ----------
+        **data : np.ndarray
+            The block of each time dependent variable, with time as the first axis.
+
+        Raises
+        ------
+        ValueError
+            If not all time dependent variables are given, or the blocks are of
+            different length.
+        """
+        if set(data) != set(self.time_vars):
+            raise ValueError(f"Need all of {self.time_vars}, got {list(data)}.")
+        lengths = {len(a) for a in data.values()}
+        if len(lengths) != 1:
+            raise ValueError("All blocks must have the same number of time steps.")
+        n = lengths.pop()
+        for name, arr in data.items():
+            self._nc[name][self.n_records : self.n_records + n] = arr
+        self.n_records += n
+        self._nc.sync()
+
+    def close(self) -> None:
+        """Close the file."""
+        if self._nc.isopen():
+            self._nc.close()
+
+    def __enter__(self) -> "FrcWriter":
+        """Return the writer when used as a context manager."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the file when leaving the context manager."""
+        self.close()
+
+
+def frc_encoding(
+    out_format: str,
+    shape: tuple[int, ...],
+    vmax: Optional[float] = None,
+    complevel: int = 4,
+    chunksizes: Optional[tuple[int, ...]] = None,
+    significant_digits: int = 4,
+) -> tuple[str, dict[str, Any]]:
+    """Return the netCDF format and the encoding of `stratvolc` for an output format.
+
+    Parameters
+    ----------
+    out_format : str
+        One of the formats in `FRC_FORMATS`:
+
+        - 'netcdf3': uncompressed netCDF3 with 64 bit offsets
+        - 'cdf5': uncompressed netCDF3 with 64 bit data (CDF5), the format made by the
+          NCL script with `nccopy -k cdf5`
+        - 'zlib': netCDF4 with zlib compression and the shuffle filter
+        - 'packed': as 'zlib', with `stratvolc` packed to 16 bit integers using
+          `scale_factor` and `add_offset` (lossy)
+        - 'quantized': as 'zlib', with `stratvolc` quantised to `significant_digits`
+          significant digits before compression (lossy)
+    shape : tuple[int, ...]
+        Shape of one time step of `stratvolc`, i.e. (altitude, lat, lon).
+    vmax : Optional[float]
+        Upper limit of `stratvolc`, needed for 'packed'. The lower limit is zero.
+    complevel : int
+        Compression level of zlib, from 1 to 9.
+    chunksizes : Optional[tuple[int, ...]]
+        Chunk shape of `stratvolc` in netCDF4. Defaults to one time step per chunk.
+    significant_digits : int
+        Number of significant digits kept with 'quantized'.
+
+    Returns
+    -------
+    tuple[str, dict[str, Any]]
+        The netCDF format and the encoding of `stratvolc`
+
+    Raises
+    ------
+    ValueError
+        If the format is not recognised, or `vmax` is missing for 'packed'.
+    """
+    if out_format not in FRC_FORMATS:
+        raise ValueError(
+            f"Output format must be one of {FRC_FORMATS}, got {out_format}"
+        )
+    encoding: dict[str, Any] = {"_FillValue": 9.96921e36}
+    if out_format == "netcdf3":
+        return "NETCDF3_64BIT_OFFSET", encoding
+    if out_format == "cdf5":
+        return "NETCDF3_64BIT_DATA", encoding
+    encoding.update(
+        zlib=True,
+        complevel=complevel,
+        shuffle=True,
+        chunksizes=(1, *shape) if chunksizes is None else chunksizes,
+    )
+    if out_format == "packed":
+        if vmax is None:
+            raise ValueError("The upper limit 'vmax' is needed to pack 'stratvolc'.")
+        # The range from 0 to vmax is mapped to -32767 to 32767, -32768 is the fill value
+        n_steps = 2**16 - 2
+        encoding.update(
+            dtype=np.int16,
+            _FillValue=np.int16(-(2**15)),
+            scale_factor=np.float32(max(float(vmax), 1e-30) / n_steps),
+            add_offset=np.float32(vmax / 2),
+        )
+    elif out_format == "quantized":
+        encoding["significant_digits"] = significant_digits
+    return "NETCDF4", encoding
+
+
+# Filled once in each worker process by the pool initializer, so that the input data is
+# not sent along with every block.
+_WORKER_STATE: dict[str, Any] = {}
+
+BlockFunc = Callable[[Mapping[str, Any], int, int, np.ndarray], None]
+
+
+def _init_worker(state: Mapping[str, Any]) -> None:
+    _WORKER_STATE.clear()
+    _WORKER_STATE.update(state)
+
+
+def _fill_shared(
+    make_block: BlockFunc, name: str, shape: tuple, dtype: str, b0: int, b1: int
+) -> None:
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        out: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        out.fill(0)
+        make_block(_WORKER_STATE, b0, b1, out)
+        del out
+    finally:
+        shm.close()
+
+
+def map_blocks(
+    make_block: BlockFunc,
+    state: Mapping[str, Any],
+    bounds: Iterable[tuple[int, int]],
+    block_shape: Callable[[int, int], tuple],
+    dtype: Any = np.float32,
+    workers: int = 1,
+) -> Iterator[np.ndarray]:
+    """Compute blocks of an array, optionally with a pool of worker processes.
+
+    Parameters
+    ----------
+    make_block : BlockFunc
+        Module level function called as `make_block(state, b0, b1, out)`, which fills
+        the zero initialised array `out` with the block from `b0` up to `b1`.
+    state : Mapping[str, Any]
+        Input data used by `make_block`. It is given to each worker once, when the
+        worker is started.
+    bounds : Iterable[tuple[int, int]]
+        The `(b0, b1)` bounds of each block.
+    block_shape : Callable[[int, int], tuple]
+        Function returning the shape of the block from `b0` up to `b1`.
+    dtype : Any
+        Data type of the blocks.
+    workers : int
+        Number of worker processes. With one worker, all blocks are made in the current
+        process.
+
+    Yields
+    ------
+    np.ndarray
+        The blocks, in the same order as `bounds`. A block is only valid until the
+        next block is requested.
+    """
+    dtype = np.dtype(dtype)
+    if workers <= 1:
+        for b0, b1 in bounds:
+            out = np.zeros(block_shape(b0, b1), dtype=dtype)
+            make_block(state, b0, b1, out)
+            yield out
+        return
+    pending: deque[tuple[Future, shared_memory.SharedMemory, tuple]] = deque()
+    # Blocks still referenced by the caller cannot be closed until the next iteration.
+    lingering: list[shared_memory.SharedMemory] = []
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(state,)
+    ) as pool:
+        todo = iter(bounds)
+        try:
+            while True:
+                # Keep all workers busy, while only holding one block per worker
+                for b0, b1 in todo:
+                    shape = block_shape(b0, b1)
+                    size = max(1, int(np.prod(shape)) * dtype.itemsize)
+                    shm = shared_memory.SharedMemory(create=True, size=size)
+                    args = (make_block, shm.name, shape, dtype.str, b0, b1)
+                    pending.append((pool.submit(_fill_shared, *args), shm, shape))
+                    if len(pending) >= workers:
+                        break
+                if not pending:
+                    break
+                future, shm, shape = pending.popleft()
+                future.result()
+                # The memory is freed once the block is also closed
+                shm.unlink()
+                lingering.append(shm)
+                yield np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                lingering = [m for m in lingering if not _try_close(m)]
+        finally:
+            for future, shm, _ in pending:
+                future.cancel()
+                shm.unlink()
+                lingering.append(shm)
+            for shm in lingering:
+                _try_close(shm)
+
+
+def _try_close(shm: shared_memory.SharedMemory) -> bool:
+    try:
+        shm.close()
+    except BufferError:
+        return False
+    return True
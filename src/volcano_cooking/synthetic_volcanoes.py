@@ -8,6 +8,7 @@ The lat/lon location is also included, but considered unimportant and thus the
 same location is used for all volcanoes.
 """
 
+from collections.abc import Iterator, Mapping
 from typing import Optional
 
 from volcano_cooking.modules import create
@@ -35,13 +36,55 @@ from volcano_cooking.modules import create
 # ====================================================================================== #
 
 
-__GENERATORS__: dict[int, type[create.Generate]] = {
-    0: create.GenerateRandomNormal,
-    1: create.GenerateFPP,
-    2: create.GenerateSingleVolcano,
-    3: create.GenerateRegularIntervals,
-    4: create.GenerateFromFile,
-}
+class _Generators(Mapping[int, type["create.Generate"]]):
+    """Generator classes by version, imported when first looked up.
+
+    The generators pull in most of the heavy dependencies, so only their names are
+    known until a generator is used, and listing them with `--lst` imports nothing.
+    """
+
+    def __init__(self, names: dict[int, str]) -> None:
+        self._names = names
+
+    def __getitem__(self, key: int) -> type["create.Generate"]:
+        return getattr(create, self._names[key])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._names
+
+    def name(self, key: int) -> str:
+        """Return the name of a generator without importing it.
+
+        Parameters
+        ----------
+        key : int
+            The version of the generator.
+
+        Returns
+        -------
+        str
+            The name of the generator class
+        """
+        return self._names[key]
+
+
+__GENERATORS__ = _Generators(
+    {
+        0: "GenerateRandomNormal",
+        1: "GenerateFPP",
+        2: "GenerateSingleVolcano",
+        3: "GenerateRegularIntervals",
+        4: "GenerateFromFile",
+        5: "GenerateHawkes",
+        6: "GenerateEmpirical",
+    }
+)
 
 
 def create_volcanoes(
@@ -50,6 +93,10 @@ def create_volcanoes(
     version: int = 0,
     option: int = 0,
     file: Optional[str] = None,
+    workers: int = 1,
+    out_format: str = "netcdf3",
+    seed: Optional[int] = None,
+    large: bool = False,
 ) -> None:
     """Create volcanoes starting at the year 1850.
 
@@ -68,19 +115,32 @@ def create_volcanoes(
         Choose which option to use when generating forcing
     file : Optional[str]
         Read eruption dates and emissions from file.
+    workers : int
+        Number of processes used when writing the forcing file with option 1.
+    out_format : str
+        Format of the forcing file written with option 1.
+    seed : Optional[int]
+        Seed of the random number generator. Fresh entropy is used if not given.
+    large : bool
+        Allow catalogues with int32 years, which are still saved with the CESM2 data
+        types if they fit. Only used with option 0.
 
     Raises
     ------
     IndexError
         If `version` is not a valid index of the generator dictionary.
+    ValueError
+        If `large` is used with option 1.
     """
     # CREATE DATA -------------------------------------------------------------------- #
 
     if version not in __GENERATORS__ or version < 0:
         raise IndexError(
             f"No version exists for index {version}. "
-            + "It must be one of {__GENERATORS__.keys()}."
+            + f"It must be one of {list(__GENERATORS__)}."
         )
+    if large and option == 1:
+        raise ValueError("Large catalogues can only be made with option 0.")
     if file is not None:
         print(f"Generating with '{__GENERATORS__[4].__name__}'...")
         print(
@@ -89,18 +149,109 @@ def create_volcanoes(
             "eruption at an early (and late) time that you know will cover the whole "
             "simulation you are planning."
         )
-        g = __GENERATORS__[4](size, init_year, file)
+        g = __GENERATORS__[4](size, init_year, file, rng=seed, large=large)
     else:
         print(f"Generating with '{__GENERATORS__[version].__name__}'...")
-        g = __GENERATORS__[version](size, init_year)
+        g = __GENERATORS__[version](size, init_year, rng=seed, large=large)
     g.generate()
     all_arrs = g.get_arrays()
 
     # CREATE NETCDF FILE AND SAVE ---------------------------------------------------- #
 
-    frc_cls = create.ReWrite(*all_arrs) if option == 1 else create.Data(*all_arrs)
-    frc_cls.make_dataset()
-    frc_cls.save_to_file()
+    if option == 1:
+        frc_cls = create.ReWrite(*all_arrs)
+        frc_cls.make_dataset()
+        frc_cls.save_to_file(workers=workers, out_format=out_format)
+    else:
+        data = create.Data(*all_arrs, large=large)
+        data.make_dataset()
+        data.save_to_file()
+
+
+def create_ensemble(  # noqa: PLR0913
+    members: int,
+    size: int = 251,
+    init_year: int = 1850,
+    version: int = 0,
+    option: int = 0,
+    file: Optional[str] = None,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    out_format: str = "netcdf3",
+    large: bool = False,
+) -> "create.Ensemble":
+    """Create an ensemble of synthetic volcanoes, with one file per member.
+
+    All members are generated in one batch, and saved to files named after the member
+    index and its seed. Member `i` is the same for all ensembles with the same seed.
+
+    Parameters
+    ----------
+    members : int
+        The number of members of the ensemble
+    size : int
+        The total number of eruptions in each member
+    init_year : int
+        First year in the climate model
+    version : int
+        Choose one of the versions from the '__GENERATORS__' dictionary
+    option : int
+        Choose which option to use when generating forcing
+    file : Optional[str]
+        Read eruption dates and emissions from file.
+    seed : Optional[int]
+        Seed of the ensemble. A random seed is drawn if not given.
+    workers : int
+        Number of processes used to draw the members, and when writing the forcing file
+        with option 1.
+    out_format : str
+        Format of the forcing file written with option 1.
+    large : bool
+        Allow catalogues with int32 years, which are still saved with the CESM2 data
+        types if they fit. Only used with option 0.
+
+    Returns
+    -------
+    create.Ensemble
+        The ensemble, with all members
+
+    Raises
+    ------
+    IndexError
+        If `version` is not a valid index of the generator dictionary.
+    ValueError
+        If `large` is used with option 1.
+    """
+    if version not in __GENERATORS__ or version < 0:
+        raise IndexError(
+            f"No version exists for index {version}. "
+            + f"It must be one of {list(__GENERATORS__)}."
+        )
+    if large and option == 1:
+        raise ValueError("Large catalogues can only be made with option 0.")
+    version = 4 if file is not None else version
+    print(f"Generating {members} members with '{__GENERATORS__[version].__name__}'...")
+    ens = create.Ensemble(
+        __GENERATORS__[version], members, size, init_year, file, seed, large
+    )
+    ens.generate(workers=workers)
+    print(f"Ensemble seed: {ens.seed}")
+    for i in range(members):
+        name = ens.name(i)
+        if option == 1:
+            frc_cls = create.ReWrite(*ens.member(i))
+            frc_cls.make_dataset()
+            frc_cls.save_to_file(
+                workers=workers,
+                out_format=out_format,
+                name=name.replace("synthetic_volcanoes", "VolcanEESMv3.11_SO2_edit"),
+            )
+        else:
+            data = create.Data(*ens.member(i), large=large)
+            data.make_dataset()
+            data.my_frc.attrs.update(Ensemble_Seed=ens.seed, Ensemble_Member=i)
+            data.save_to_file(name=name)
+    return ens
 
 
 def main():
@@ -0,0 +1,92 @@
+"""CLI to check that a forcing file conserves the mass of its source catalogue.
+
+It takes the forcing file as a mandatory input parameter, and exits with a non-zero
+status if the mass at any date does not match the catalogue.
+"""
+
+import sys
+from typing import Optional
+
+import click
+
+from volcano_cooking.modules import create
+
+
+@click.command()
+@click.argument("frc_file", type=click.Path(exists=True))
+@click.argument("in_file", type=click.Path(exists=True), required=False)
+@click.option(
+    "--coords-file",
+    "coords_file",
+    type=click.Path(exists=True),
+    default=None,
+    help="Coordinate file of the grid. Found from the environment variables "
+    + "'RES', 'COORDS1DEG' and 'COORDS2DEG' by default.",
+)
+@click.option(
+    "--first-year",
+    "first_year",
+    type=int,
+    default=850,
+    show_default=True,
+    help="Eruptions in the catalogue before this year are not expected in the file.",
+)
+@click.option(
+    "--last-year",
+    "last_year",
+    type=int,
+    default=2016,
+    show_default=True,
+    help="Eruptions in the catalogue after this year are not expected in the file.",
+)
+@click.option(
+    "--mass-scaling/--no-mass-scaling",
+    default=False,
+    show_default=True,
+    help="The mass of eruptions with more than 15 Tg SO2 was scaled by 1/1.8.",
+)
+@click.option(
+    "--rtol",
+    type=float,
+    default=1e-4,
+    show_default=True,
+    help="Relative tolerance of the mass at each date.",
+)
+def main(  # noqa: PLR0913
+    frc_file: str,
+    in_file: Optional[str],
+    coords_file: Optional[str],
+    first_year: int,
+    last_year: int,
+    mass_scaling: bool,
+    rtol: float,
+) -> None:
+    """Compare the mass in `frc_file` with the catalogue `in_file`.
+
+    The last created catalogue is used if `in_file` is not given.
+    """
+    # The helper scripts pull in matplotlib, so only import them when needed.
+    import volcano_cooking.helper_scripts.functions as fnc
+
+    in_file = fnc.find_last_output("nc") if in_file is None else in_file
+    dates, expected, found = create.verify_frc(
+        frc_file,
+        in_file,
+        coords_file=coords_file,
+        first_year=first_year,
+        last_year=last_year,
+        mass_scaling=mass_scaling,
+        rtol=rtol,
+    )
+    if len(dates) == 0:
+        print(f"The mass at all dates of {frc_file} matches {in_file}.")
+        return
+    print("YYYYMMDD  Expected(Tg)  Found(Tg)  Ratio")
+    for d, e, f in zip(dates, expected, found):
+        ratio = f / e if e else float("inf")
+        print(f"{d:08d}  {e:12.5e}  {f:9.3e}  {ratio:.6f}")
+    sys.exit(f"Mass mismatch at {len(dates)} dates.")
+
+
+if __name__ == "__main__":
+    main()
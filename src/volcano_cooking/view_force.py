@@ -8,8 +8,6 @@ import sys
 
 import click
 
-import volcano_cooking.helper_scripts.view_generated_forcing as v
-
 
 @click.command()
 @click.argument("filename", type=click.Path(exists=True), required=False)
@@ -63,6 +61,9 @@ def main(
         return
     if style not in styles:
         sys.exit(f"Style '{style}' not available. Available styles: {styles}")
+    # Plotting pulls in matplotlib, so only import it when needed.
+    import volcano_cooking.helper_scripts.view_generated_forcing as v
+
     v.view_forcing(in_file=filename, width=width, style=style, dark=dark, save=save)
 
 
@@ -0,0 +1,85 @@
+"""Fixtures shared by the test modules."""
+
+import os
+from typing import Callable
+
+import numpy as np
+import pytest
+import xarray as xr
+from volcano_cooking.modules import create
+
+
+def _make_originals() -> None:
+    """Create small stand-ins for the original forcing and coordinate files."""
+    orig = os.path.join("data", "originals")
+    os.makedirs(orig)
+    lat = np.linspace(-72.0, 72.0, 5)
+    lon = np.linspace(0.0, 360.0, 8, endpoint=False)
+    grid = xr.Dataset(
+        {"gw": ("lat", np.cos(np.deg2rad(lat)))}, coords={"lat": lat, "lon": lon}
+    )
+    grid.to_netcdf(os.path.join(orig, "fv_1.9x2.5_L30.nc"))
+    ds = xr.Dataset(
+        {
+            "stratvolc": (
+                ("time", "altitude", "lat", "lon"),
+                np.zeros((2, 30, len(lat), len(lon)), dtype=np.float32),
+                {"units": "molecules/cm3/s"},
+            ),
+            "date": ("time", np.array([10101, 99991231], dtype=np.int32)),
+            "datesec": ("time", np.array([1800, 84600], dtype=np.int32)),
+        },
+        coords={
+            "altitude": np.arange(30.0),
+            "lat": lat,
+            "lon": lon,
+            "altitude_int": ("altitude_int", np.arange(31.0) - 0.5, {"units": "km"}),
+        },
+        attrs={"title": "", "data_summary": ""},
+    )
+    ds.to_netcdf(
+        os.path.join(orig, "VolcanEESMv3.11_SO2_850-2016_Mscale_Zreduc_2deg_c191125.nc")
+    )
+
+
+@pytest.fixture
+def make_originals() -> Callable[[], None]:
+    """Fixture for creating stand-ins for the files in `data/originals`.
+
+    The files are a 2 degree coordinate file, `fv_1.9x2.5_L30.nc`, on a grid of 5
+    latitudes and 8 longitudes, and a forcing file with 30 altitude levels of 1 km.
+
+    Returns
+    -------
+    Callable[[], None]
+        Creates the files relative to the current directory, such as inside
+        `CliRunner.isolated_filesystem`.
+    """
+    return _make_originals
+
+
+def _write_catalogue(size: int = 50) -> xr.Dataset:
+    """Write a small catalogue in place of the VolcanEESM database."""
+    g = create.GenerateFPP(size, 1850, rng=0)
+    g.generate()
+    ds = create.Data(*g.get_arrays())
+    ds.make_dataset()
+    os.makedirs(os.path.dirname(create.CATALOGUE), exist_ok=True)
+    ds.my_frc.to_netcdf(create.CATALOGUE)
+    return ds.my_frc
+
+
+@pytest.fixture
+def write_catalogue() -> Callable[..., xr.Dataset]:
+    """Fixture for writing a catalogue in place of the VolcanEESM database.
+
+    The catalogue is made by `create.GenerateFPP` from a fixed seed, with 50 eruptions
+    unless another size is given.
+
+    Returns
+    -------
+    Callable[..., xr.Dataset]
+        Writes the catalogue to `create.CATALOGUE`, relative to the current directory,
+        and returns it.
+    """
+    return _write_catalogue
@@ -0,0 +1,43 @@
+"""Test cases for the adjust_emissions_and_heights module."""
+
+import numpy as np
+from volcano_cooking.modules import convert
+
+
+def test_altitude_overlap() -> None:
+    """Test the overlap matrix against the loop over levels in the NCL script."""
+    altitude_int = np.linspace(-0.5, 29.5, 31)
+    rng = np.random.default_rng(1)
+    bots = np.append(rng.uniform(0, 29, 200), [35.0, 12.3, 3.0])
+    tops = np.append(bots[:-3] + rng.uniform(0, 5, 200), [40.0, 12.3, 3.5])
+    overlap, reset = convert.altitude_overlap(bots, tops, altitude_int)
+    assert overlap.shape == (len(bots), 30)
+    assert np.array_equal(np.nonzero(reset)[0], [200, 201])
+    expected = np.zeros(overlap.shape)
+    for i, (bot, top) in enumerate(zip(bots, tops)):
+        for k in range(30):
+            if bot < altitude_int[k + 1] and top >= altitude_int[k]:
+                hi = min(top, altitude_int[k + 1])
+                lo = max(bot, altitude_int[k])
+                expected[i, k] = hi - lo
+    expected[reset, 20:] = 1.0
+    assert np.allclose(overlap.toarray(), expected)
+    overlap, reset = convert.altitude_overlap(bots, tops, altitude_int, 0)
+    assert not np.any(reset)
+    assert overlap[200].nnz == 0
+
+
+def test_adjust_emissions() -> None:
+    """Test that the column emission is in molecules/cm2/s and scales large eruptions."""
+    tes = np.array([1.0, 14.9, 15.0, 30.0])
+    area = np.array([1e16, 2e16, 1e16, 4e16])
+    column_emis = convert.adjust_emissions(tes, area)
+    assert np.array_equal(tes, [1.0, 14.9, 15.0, 30.0])
+    # Back to Tg SO2 over the duration of the emission
+    mass = column_emis * area * convert.EMISSION_DURATION
+    mass *= convert.MW_SO2 / convert.AVOGADRO / 1e9
+    assert np.allclose(mass, [1.0, 14.9, 15.0 / 1.8, 30.0 / 1.8])
+    mass = convert.adjust_emissions(tes, area, mass_scaling=False) * area
+    assert np.allclose(
+        mass * convert.EMISSION_DURATION, tes * 1e9 * 6.02214e26 / 64.0648
+    )
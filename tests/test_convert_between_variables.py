@@ -42,3 +42,28 @@ def test_vei_to_injectionheight() -> None:
     assert out2.dtype == np.float32
     for i, j in zip(out1, out2):
         assert i <= j
+
+
+def test_order_injection_heights() -> None:
+    """Test that minimum and maximum injection heights are put in order."""
+    low = np.array([1, 25, 18], dtype=np.float64)
+    high = np.array([20, 20, 18], dtype=np.float32)
+    out1, out2 = convert.order_injection_heights(low, high)
+    assert out1.dtype == np.float32
+    assert out2.dtype == np.float32
+    assert np.array_equal(out1, [1, 20, 18])
+    assert np.array_equal(out2, [20, 25, 18])
+
+
+def test_seed() -> None:
+    """Test that the random conversions are reproducible from a seed."""
+    vei = np.random.randint(1, 7, 20).astype(np.int8)
+    assert np.array_equal(
+        convert.vei_to_totalemission(vei, rng=2),
+        convert.vei_to_totalemission(vei, rng=np.random.default_rng(2)),
+    )
+    for a, b in zip(
+        convert.vei_to_injectionheights(vei, rng=2),
+        convert.vei_to_injectionheights(vei, rng=2),
+    ):
+        assert np.array_equal(a, b)
@@ -0,0 +1,229 @@
+"""Test cases for the create_cesm_frc module."""
+
+import glob
+import os
+
+import netCDF4
+import numpy as np
+import pytest
+import xarray as xr
+from click.testing import CliRunner
+from volcano_cooking.modules import create
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces.
+
+    Returns
+    -------
+    CliRunner
+        Runner for creating isolated file  system.
+    """
+    return CliRunner()
+
+
+def _make_coords_file(file: str) -> None:
+    lat = np.array([-67.5, -22.5, 22.5, 67.5])
+    lon = np.array([0.0, 90.0, 180.0, 270.0])
+    gw = np.cos(np.deg2rad(lat))
+    ds = xr.Dataset(
+        {"gw": (["lat"], gw)},
+        coords={
+            "lat": ("lat", lat, {"units": "degrees_north"}),
+            "lon": ("lon", lon, {"units": "degrees_east"}),
+        },
+    )
+    ds.to_netcdf(file)
+
+
+def _make_catalogue(tops: list[float]) -> str:
+    size = len(tops)
+    arrs = [
+        np.ones(size, dtype=np.int8),
+        np.array([1850, 1850, 1855, 1900, 2020][:size], dtype=np.int16),
+        np.array([1, 3, 6, 2, 1][:size], dtype=np.int8),
+        np.array([15, 2, 20, 5, 1][:size], dtype=np.int8),
+        np.array([0.0, -30.0, 60.0, 10.0, 0.0][:size], dtype=np.float32),
+        np.array([1.0, -100.0, 175.0, 80.0, 0.0][:size], dtype=np.float32),
+        np.array([1.0, 5.0, 0.3, 20.0, 1.0][:size], dtype=np.float32),
+        np.array([3, 4, 2, 6, 3][:size], dtype=np.int8),
+        np.array([16.0, 15.2, 12.0, 19.0, 17.0][:size], dtype=np.float32),
+        np.array(tops, dtype=np.float32),
+    ]
+    data = create.Data(*arrs)
+    data.make_dataset()
+    data.save_to_file()
+    return glob.glob(os.path.join("data", "output", "synthetic_volcanoes_*.nc"))[0]
+
+
+def _ncl_reference(in_file: str, coords_file: str) -> tuple[np.ndarray, ...]:
+    """Compute the forcing the same way as `createVolcEruptV3.ncl`, loop by loop."""
+    grid = xr.open_dataset(coords_file)
+    lat, lon, gw = grid.lat.data, grid.lon.data, grid.gw.data
+    column_area = np.ones((len(lat), len(lon))) * gw[:, None]
+    column_area *= 4.0 * np.pi * 6.37122e8**2 / len(lon) / np.sum(gw)
+    ds = xr.open_dataset(in_file)
+    so2 = ds.Total_Emission.data.astype(float)
+    year = ds.Year_of_Emission.data.astype(int)
+    month = ds.Month_of_Emission.data.astype(int)
+    day = ds.Day_of_Emission.data.astype(int)
+    top_ = ds.Maximum_Injection_Height.data.astype(float)
+    bot_ = ds.Minimum_Injection_Height.data.astype(float)
+    alt_ind = (so2 >= 3.5) & (top_ > 20.0) & (year >= 850) & (year <= 2016)  # noqa: PLR2004
+    top_[alt_ind] = 20.0
+    bot_[alt_ind] = np.where(bot_[alt_ind] > 18.0, 18.0, bot_[alt_ind])  # noqa: PLR2004
+    in_lon = ds.Longitude.data.astype(float)
+    in_lon = np.where(in_lon >= 0, in_lon, in_lon + 360.0)
+    ind_volcs = np.nonzero((so2 > 0) & (year >= 850) & (year <= 2016))[0]  # noqa: PLR2004
+    n_volc = len(ind_volcs)
+    n_times = n_volc * 4 + 2
+    altitude_int = np.linspace(-0.5, 29.5, 31)
+    stratvolc = np.zeros((n_times, 30, len(lat), len(lon)))
+    date = np.zeros(n_times, dtype=int)
+    datesec = np.zeros(n_times, dtype=int)
+    date[0], datesec[0] = 10101, 1800
+    for t in range(n_volc):
+        tv = ind_volcs[t]
+        t1, t2, t3, t4 = t * 4 + 1, t * 4 + 2, t * 4 + 3, t * 4 + 4
+        date[t1 : t4 + 1] = 10000 * year[tv] + 100 * month[tv] + day[tv]
+        datesec[t1 : t4 + 1] = [43199, 43200, 64799, 64800]
+        top, bot = top_[tv], bot_[tv]
+        if top < bot:
+            top, bot = bot, top
+        mask = np.zeros((len(lat), len(lon)))
+        mask[
+            np.abs(lat - ds.Latitude.data[tv]).argmin(),
+            np.abs(lon - in_lon[tv]).argmin(),
+        ] = 1.0
+        total_area = np.sum(column_area * mask)
+        column_emis = so2[tv] / total_area / 6.0 / 3600.0
+        column_emis = column_emis * 1e9 * 6.02214e26 / 64.0648
+        emis_rate = column_emis / ((top - bot) * 1e5)
+        for k in range(30):
+            if bot < altitude_int[k + 1] and top >= altitude_int[k]:
+                hi = min(top, altitude_int[k + 1])
+                lo = max(bot, altitude_int[k])
+                factor = (hi - lo) / (altitude_int[k + 1] - altitude_int[k])
+                stratvolc[t2, k] = stratvolc[t2, k] + mask * emis_rate * factor
+                stratvolc[t3, k] = stratvolc[t2, k]
+    date[-1], datesec[-1] = 99991231, 23 * 3600 + 1800
+    return date, datesec, stratvolc.astype(np.float32)
+
+
+def test_matches_ncl(runner: CliRunner) -> None:
+    """Test that the forcing file is the same as the one made by the NCL script.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        coords_file = "coords.nc"
+        _make_coords_file(coords_file)
+        # Includes an eruption that is altitude reduced, one with min/max swapped, one
+        # with negative longitude and one beyond the last year.
+        in_file = _make_catalogue([18.0, 25.0, 10.0, 25.0, 18.0])
+        frc = create.CesmFrc(in_file, coords_file)
+        frc.make_dataset()
+        out_file = frc.save_to_file()
+        date, datesec, stratvolc = _ncl_reference(in_file, coords_file)
+        with netCDF4.Dataset(out_file) as f:
+            assert f.data_model == "NETCDF3_64BIT_DATA"
+            assert f.dimensions["time"].isunlimited()
+            assert np.array_equal(f["date"][:], date)
+            assert np.array_equal(f["datesec"][:], datesec)
+            assert np.allclose(f["stratvolc"][:], stratvolc, rtol=1e-6, atol=0)
+            assert f["altitude_int"].units == "km"
+
+
+def test_mass_mismatch(runner: CliRunner) -> None:
+    """Test that eruptions reaching above the model top are reported.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        coords_file = "coords.nc"
+        _make_coords_file(coords_file)
+        in_file = _make_catalogue([18.0, 25.0, 35.0])
+        frc = create.CesmFrc(in_file, coords_file)
+        with pytest.raises(ValueError, match="18550620"):
+            frc.make_dataset()
+        with pytest.raises(FileNotFoundError):
+            create.CesmFrc(in_file, "not_a_file.nc")
+
+
+def test_out_of_range(runner: CliRunner) -> None:
+    """Test that eruptions outside of the valid latitudes and longitudes are reported.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        coords_file = "coords.nc"
+        _make_coords_file(coords_file)
+        in_file = _make_catalogue([18.0, 25.0, 10.0])
+        ds = xr.open_dataset(in_file).load()
+        # Still negative after shifting from -180,180 to 0,360
+        ds.Longitude.data[1] = -400.0
+        ds.to_netcdf("catalogue.nc")
+        frc = create.CesmFrc("catalogue.nc", coords_file)
+        with pytest.raises(ValueError, match="out of range.*18500302"):
+            frc.make_dataset()
+
+
+def test_spread(runner: CliRunner) -> None:
+    """Test VEI based spreading and the spreading of Pinatubo over latitudes.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        coords_file = "coords.nc"
+        lat = np.linspace(-88.75, 88.75, 72)
+        lon = np.arange(0.0, 360.0, 2.5)
+        xr.Dataset(
+            {"gw": (["lat"], np.cos(np.deg2rad(lat)))},
+            coords={"lat": ("lat", lat), "lon": ("lon", lon)},
+        ).to_netcdf(coords_file)
+        in_file = _make_catalogue([18.0, 25.0, 10.0, 25.0])
+        ds = xr.open_dataset(in_file).load()
+        ds.Eruption.attrs["Volcano_Name"] = "A, Pinatubo, B, C"
+        ds.to_netcdf("catalogue.nc")
+        frc = create.CesmFrc(
+            "catalogue.nc", coords_file, vei_spread=True, pin_min_lat=-5
+        )
+        frc.make_dataset()
+        assert "_VEIspread_Pin5S-30S_" in frc.out_file_name()
+        out_file = frc.save_to_file()
+        with netCDF4.Dataset(out_file) as f:
+            stratvolc = f["stratvolc"][:].data
+        out_file = frc.save_to_file("parallel", workers=2)
+        with netCDF4.Dataset(out_file) as f:
+            assert np.array_equal(f["stratvolc"][:].data, stratvolc)
+        # Columns of the VEI 6 eruption, within 937 km of the closest grid column
+        la, lo = np.deg2rad(lat[[np.abs(lat - 10).argmin()]]), np.deg2rad(80.0)
+        cos_d = np.sin(la) * np.sin(np.deg2rad(lat))[:, None] + np.cos(la) * np.cos(
+            np.deg2rad(lat)
+        )[:, None] * np.cos(np.deg2rad(lon) - lo)
+        expected = cos_d >= np.cos(np.sqrt(2.76e6 / np.pi) / 6371.22)
+        vei6 = stratvolc[1 + 4 * 3 + 1].sum(axis=0) > 0
+        assert np.array_equal(vei6, expected)
+        assert frc.n_cols[3] == np.sum(expected) > 1
+        # Pinatubo is spread over the latitudes from 5S to 30S at 100W
+        pin = stratvolc[1 + 4 * 1 + 1].sum(axis=0) > 0
+        assert np.array_equal(np.nonzero(pin.any(axis=0))[0], [104])
+        assert np.array_equal(np.nonzero(pin.any(axis=1))[0], np.arange(23, 34))
+        # Mass is conserved, in Tg SO2
+        area = frc.column_area[:, None]
+        for t, tes in enumerate(frc.tes):
+            mass = np.sum(stratvolc[1 + 4 * t + 1] * area) * 1e5 * 6 * 3600
+            assert np.isclose(mass / 6.02214e26 * 64.0648 / 1e9, tes, rtol=1e-5)
@@ -1,13 +1,20 @@
 """Test cases for the create_data module."""
 
+import glob
 import inspect
 import json
+import os
+from typing import Callable
 
+import netCDF4
 import numpy as np
 import pytest
 import volcano_cooking.modules.create.create_data as cr
+import xarray as xr
 from click.testing import CliRunner
 
+_NOT_GENERATORS = ("Data", "ChunkedData", "Generate", "GenerateChunked")
+
 
 @pytest.fixture
 def runner() -> CliRunner:
@@ -21,21 +28,45 @@ def runner() -> CliRunner:
     return CliRunner()
 
 
-def test_generate_classes(runner: CliRunner) -> None:
+def test_generate_classes(
+    runner: CliRunner, write_catalogue: Callable[..., xr.Dataset]
+) -> None:
     """Test to see if classes are being generated."""
     data = {"dates": ["1850-01-17", "1860-01-01"], "emissions": ["400", "400"]}
     with runner.isolated_filesystem():
         with open("new_file.json", "w") as f:
             json.dump(data, f, indent=2)
+        write_catalogue()
         module_ = "volcano_cooking.modules.create.create_data"
         for n, c in inspect.getmembers(cr, inspect.isclass):
-            if c.__module__ == module_ and n not in ["Data", "Generate"]:
+            if c.__module__ == module_ and n not in _NOT_GENERATORS:
                 c_ = c(20, 20, "new_file.json")
                 assert issubclass(c, cr.Generate)
                 c_.generate()
                 cr.Data(*c_.get_arrays())
 
 
+def test_generate_seed(
+    runner: CliRunner, write_catalogue: Callable[..., xr.Dataset]
+) -> None:
+    """Test that a generator gives the same catalogue from the same seed."""
+    data = {"dates": ["1850-01-17", "1860-01-01"], "emissions": ["400", "400"]}
+    with runner.isolated_filesystem():
+        with open("new_file.json", "w") as f:
+            json.dump(data, f, indent=2)
+        write_catalogue()
+        module_ = "volcano_cooking.modules.create.create_data"
+        for n, c in inspect.getmembers(cr, inspect.isclass):
+            if c.__module__ == module_ and n not in _NOT_GENERATORS:
+                out = []
+                for rng in (3, np.random.default_rng(3)):
+                    c_ = c(20, 20, "new_file.json", rng=rng)
+                    c_.generate()
+                    out.append(c_.get_arrays())
+                for a, b in zip(*out):
+                    assert np.array_equal(a, b)
+
+
 def test_generate_from_file(runner: CliRunner) -> None:
     """Test the json file input."""
     d1 = {"dates": ["1850-01-17"], "emissions": ["400", "400"]}
@@ -88,3 +119,88 @@ def test_generate_from_file(runner: CliRunner) -> None:
                 assert np.array_equal(ds.yoes, np.array([1850, 1860], dtype=np.int16))
                 assert np.array_equal(ds.moes, np.array([1, 1], dtype=np.float32))
                 assert np.array_equal(ds.does, np.array([17, 1], dtype=np.float32))
+
+
+def test_large_catalogue(runner: CliRunner) -> None:
+    """Test that large catalogues use int32 only when the values do not fit."""
+    with runner.isolated_filesystem():
+        g = cr.GenerateFPP(3000, 1850, rng=0, large=True)
+        g.generate()
+        arrs = g.get_arrays()
+        with pytest.raises(ValueError):
+            cr.Data(*arrs)
+        # The years fit in int16, so the CESM2 data types are used
+        assert cr.Data(*arrs, large=True).yoes.dtype == np.int16
+        arrs[0] = arrs[0].astype(np.int32)
+        arrs[1] = arrs[1] + np.arange(len(arrs[1]), dtype=np.int32) * 100
+        ds = cr.Data(*arrs, large=True)
+        assert ds.eruptions.dtype == np.int8
+        assert ds.yoes.dtype == np.int32
+        ds.make_dataset()
+        ds.save_to_file()
+        out = glob.glob(os.path.join("data", "output", "*.nc"))[0]
+        with netCDF4.Dataset(out) as f:
+            assert f["Year_of_Emission"].dtype == np.int32
+            assert f["Year_of_Emission"].chunking() == [len(arrs[1])]
+            assert np.array_equal(f["Year_of_Emission"][:], arrs[1])
+            # The attributes do not grow with the number of eruptions
+            assert f["Eruption"].Volcano_Number == 123456  # noqa: PLR2004
+            assert f["Eruption"].Volcano_Name == "N"
+
+
+def test_chunked_catalogue(runner: CliRunner) -> None:
+    """Test that a catalogue made in chunks is in order and written like `Data`."""
+    with pytest.raises(ValueError, match="chunk = 0, but"):
+        cr.GenerateRandomNormalChunked(100, 1850, chunk=0)
+    chunks = list(
+        cr.GenerateRandomNormalChunked(1000, 1850, rng=4, chunk=97).iter_chunks()
+    )
+    assert [len(c[0]) for c in chunks] == [97] * 10 + [30]
+    arrs = [np.concatenate(a) for a in zip(*chunks)]
+    # The dates are in order, also across chunks
+    keys = arrs[1].astype(int) * 10000 + arrs[2].astype(int) * 100 + arrs[3]
+    assert np.all(np.diff(keys) >= 0)
+    assert arrs[1][0] < 1850  # noqa: PLR2004
+    assert np.all(arrs[8] <= arrs[9])
+    g = cr.GenerateRandomNormalChunked(1000, 1850, rng=4, chunk=97)
+    g.generate()
+    for a, b in zip(g.get_arrays(), arrs):
+        assert np.array_equal(a, b)
+    with runner.isolated_filesystem():
+        w = cr.ChunkedData(
+            cr.GenerateRandomNormalChunked(1000, 1850, rng=4, chunk=97).iter_chunks()
+        )
+        out = w.save_to_file()
+        assert w.size == 1000  # noqa: PLR2004
+        ds = cr.Data(*arrs)
+        with netCDF4.Dataset(out) as f:
+            assert f.dimensions["Eruption_Number"].isunlimited()
+            for name, a in (
+                ("Eruption", ds.eruptions),
+                ("Year_of_Emission", ds.yoes),
+                ("Day_of_Emission", ds.does),
+                ("Total_Emission", ds.tes),
+                ("Minimum_Injection_Height", ds.miihs),
+            ):
+                assert f[name].dtype == a.dtype
+                assert np.array_equal(f[name][:], a)
+
+
+def test_chunked_catalogue_years() -> None:
+    """Test that chunked catalogues stop before the years overflow int16."""
+    # About one eruption every other year, which goes beyond int16 years
+    size = 200_000
+    g = cr.GenerateRandomNormalChunked(size, 1850, rng=0, chunk=50_000)
+    g.generate()
+    assert 0 < g.size == len(g.yoes) < size
+    assert g.yoes.dtype == np.int16
+    assert 1850 - g.yoes[0] + g.yoes[-1] < 9999  # noqa: PLR2004
+    keys = g.yoes.astype(int) * 10000 + g.moes.astype(int) * 100 + g.does
+    assert np.all(np.diff(keys) >= 0)
+    assert len(cr.Data(*g.get_arrays()).yoes) == g.size
+    g = cr.GenerateRandomNormalChunked(size, 1850, rng=0, chunk=50_000, large=True)
+    g.generate()
+    assert g.size == size
+    assert g.yoes[-1] > np.iinfo(np.int16).max
+    keys = g.yoes.astype(int) * 10000 + g.moes.astype(int) * 100 + g.does
+    assert np.all(np.diff(keys) >= 0)
@@ -1,5 +1,8 @@
 """Tests cases for the create_dates module."""
 
+import datetime as dt
+
+import cftime
 import numpy as np
 import pytest
 from volcano_cooking.modules.create import create_dates
@@ -22,11 +25,13 @@ def test_random_dates() -> None:
     assert out1.dtype == np.int16
     assert out2.dtype == np.int8
     assert out3.dtype == np.int8
-    idxs = [np.where(out1 == i)[0] for i in np.unique(out1)]
-    for idx in idxs:
-        for i, (m, d) in enumerate(zip(out2[idx][:-1], out3[idx][:-1])):
-            assert m <= out2[idx][i + 1]
-            assert d <= out3[idx][i + 1]
+    dates = out1.astype(int) * 10000 + out2.astype(int) * 100 + out3
+    assert np.all(np.diff(dates) >= 0)
+    # The same seed gives the same dates
+    for a, b in zip(
+        create_dates.random_dates(s4, 0, 1), create_dates.random_dates(s4, 0, 1)
+    ):
+        assert np.array_equal(a, b)
 
 
 def test_fpp_dates_and_emissions() -> None:
@@ -56,6 +61,84 @@ def test_fpp_dates_and_emissions() -> None:
                 assert d <= out3[idx][i + 1]
 
 
+def test_fpp_collisions() -> None:
+    """Test that all ways of handling pulses on the same day give unique dates."""
+    with pytest.raises(ValueError):
+        create_dates.fpp_dates_and_emissions(100, 850, collision="ignore")
+    out = {
+        c: create_dates.fpp_dates_and_emissions(5000, 850, rng=3, collision=c)
+        for c in create_dates.COLLISIONS
+    }
+    for yoes, moes, does, _ in out.values():
+        dates = yoes.astype(int) * 10000 + moes.astype(int) * 100 + does
+        assert np.all(np.diff(dates) > 0)
+    # Merged pulses keep the total emission, the others keep the number of pulses
+    assert np.isclose(out["merge"][3].sum(), out["nudge"][3].sum())
+    assert len(out["nudge"][3]) == len(out["redraw"][3])
+    assert len(out["merge"][3]) <= len(out["nudge"][3])
+
+
+def test_fpp_redraw_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that pulses still on the same day after the last redraw are nudged."""
+    monkeypatch.setattr(create_dates, "_MAX_REDRAWS", 0)
+    redraw = create_dates.fpp_dates_and_emissions(5000, 850, rng=3, collision="redraw")
+    nudge = create_dates.fpp_dates_and_emissions(5000, 850, rng=3)
+    for r, n in zip(redraw, nudge):
+        assert np.array_equal(r, n)
+
+
+def test_fpp_large() -> None:
+    """Test that large FPP catalogues keep dates beyond the year 9999."""
+    yoes, moes, does, _ = create_dates.fpp_dates_and_emissions(2000, 9000, large=True)
+    assert yoes.dtype == np.int32
+    assert yoes[-1] > 9999  # noqa: PLR2004
+    dates = yoes.astype(int) * 10000 + moes.astype(int) * 100 + does
+    assert np.all(np.diff(dates) > 0)
+
+
+def test_hawkes_dates_and_emissions() -> None:
+    """Test that clustered catalogues have unique dates and keep the total emission."""
+    with pytest.raises(ValueError):
+        create_dates.hawkes_dates_and_emissions(100, 850, collision="redraw")
+    out = {
+        c: create_dates.hawkes_dates_and_emissions(
+            5000, 850, rng=3, collision=c, branching=0.9, scale=0.01
+        )
+        for c in ("merge", "nudge")
+    }
+    for yoes, moes, does, _ in out.values():
+        dates = yoes.astype(int) * 10000 + moes.astype(int) * 100 + does
+        assert np.all(np.diff(dates) > 0)
+    assert len(out["nudge"][3]) == 5000  # noqa: PLR2004
+    assert len(out["merge"][3]) < len(out["nudge"][3])
+    assert np.isclose(out["merge"][3].sum(), out["nudge"][3].sum())
+
+
+def test_noleap_dates() -> None:
+    """Test that the noleap calendar kernel gives the same dates as cftime."""
+    rng = np.random.default_rng(0)
+    # Random times, and times just around the start of each day
+    edges = np.arange(1, 3 * 365) / 365 + np.array([-1e-13, 0, 1e-13])[:, None]
+    ta = np.sort(np.r_[rng.uniform(0, 9000, 5000), edges.ravel()])
+    yoes, moes, does, days = create_dates.noleap_dates(ta, 850)
+    assert yoes.dtype == np.int16
+    assert moes.dtype == np.int8
+    assert does.dtype == np.int8
+    assert np.all(np.diff(days) >= 0)
+    for t, y, m, d in zip(ta, yoes, moes, does):
+        date = cftime.datetime(int(t) + 850, 1, 1, calendar="noleap") + dt.timedelta(
+            days=(t % 1) * 365
+        )
+        assert (date.year, date.month, date.day) == (y, m, d)
+    # Years beyond int16 are not wrapped around
+    with pytest.raises(ValueError, match="large=True"):
+        create_dates.noleap_dates(np.array([40000.5]), 1850)
+    assert create_dates.noleap_dates(np.array([40000.5]), 1850, True)[0] == [41850]
+
+
 if __name__ == "__main__":
     test_random_dates()
     test_fpp_dates_and_emissions()
+    test_fpp_collisions()
+    test_fpp_large()
+    test_noleap_dates()
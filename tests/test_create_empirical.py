@@ -0,0 +1,73 @@
+"""Test cases for module create_empirical."""
+
+import os
+from typing import Callable
+
+import numpy as np
+import pytest
+import volcano_cooking.modules.create.create_empirical as m
+import xarray as xr
+from click.testing import CliRunner
+from volcano_cooking.modules import create
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces.
+
+    Returns
+    -------
+    CliRunner
+        Runner for creating isolated file  system.
+    """
+    return CliRunner()
+
+
+def _rows(catalogue: xr.Dataset) -> np.ndarray:
+    """Stack the resampled variables of a catalogue as in `EmpiricalTables.rows`."""
+    return np.stack([catalogue[v].data for v in m.EMPIRICAL_VARIABLES], axis=1)
+
+
+def test_empirical_tables(
+    runner: CliRunner, write_catalogue: Callable[..., xr.Dataset]
+) -> None:
+    """Test that the sampling tables are made from the catalogue and cached."""
+    with runner.isolated_filesystem():
+        with pytest.raises(FileNotFoundError):
+            m.empirical_tables()
+        rows = _rows(write_catalogue())
+        tables = m.empirical_tables()
+        assert os.path.isfile(m._cache_file(m.CATALOGUE))
+        assert m.empirical_tables() is tables
+        assert np.array_equal(tables.rows, np.unique(rows, axis=0))
+        assert tables.row_cdf[-1] == tables.gap_cdf[-1] == 1
+        assert np.all(tables.gaps > 0)
+        # The cached tables are loaded when the tables are not in memory
+        m._load_tables.cache_clear()
+        cached = m.empirical_tables()
+        assert cached is not tables
+        assert np.array_equal(cached.rows, tables.rows)
+        assert np.array_equal(cached.gap_cdf, tables.gap_cdf)
+        # The tables are made again when the catalogue changes
+        rows = _rows(write_catalogue(80))
+        assert np.array_equal(m.empirical_tables().rows, np.unique(rows, axis=0))
+
+
+def test_generate_empirical(
+    runner: CliRunner, write_catalogue: Callable[..., xr.Dataset]
+) -> None:
+    """Test that eruptions are resampled jointly from the catalogue."""
+    with runner.isolated_filesystem():
+        rows = _rows(write_catalogue())
+        g = create.GenerateEmpirical(5000, 1850, rng=2)
+        g.generate()
+        create.Data(*g.get_arrays())
+        dates = g.yoes.astype(int) * 10000 + g.moes.astype(int) * 100 + g.does
+        assert np.all(np.diff(dates) > 0)
+        drawn = np.stack(
+            [g.veis, g.tes, g.miihs, g.mxihs, g.lats, g.lons], axis=1
+        ).astype(np.float64)
+        found = (drawn[:, None] == rows[None].astype(np.float64)).all(axis=2)
+        assert found.any(axis=1).all()
+        # Every eruption of the catalogue is drawn
+        assert len(np.unique(found.argmax(axis=1))) == len(np.unique(rows, axis=0))
@@ -1,8 +1,14 @@
 """Test cases for module create_frc."""
 
 import inspect
+import tracemalloc
 
+import numpy as np
+import pytest
+import scipy.stats as scp_stats
+import superposedpulses
 import volcano_cooking.modules.create.create_frc as m
+from superposedpulses.forcing import PulseParameters
 
 
 def test_frc_class_method() -> None:
@@ -30,6 +36,110 @@ def test_output() -> None:
     assert len(out1) > len(out3)
 
 
+def test_seed() -> None:
+    """Tests that forcing classes give the same output from the same seed."""
+    for c, kw in (
+        (m.StdFrc, {"total_pulses": 50}),
+        (m.Frc, {"size": 50}),
+        (m.HawkesFrc, {"total_pulses": 50}),
+    ):
+        a = c(rng=5, **kw).get_frc()
+        b = c(rng=np.random.default_rng(5), **kw).get_frc()
+        for i, j in zip(a, b):
+            assert np.array_equal(i, j)
+        assert not np.array_equal(a[1], c(rng=6, **kw).get_frc()[1])
+
+
+def test_std_frc_statistics() -> None:
+    """Tests that StdFrc has the statistics of the StandardForcingGenerator."""
+    for size, fs in ((7, 1), (300, 12), (1000, 365)):
+        times = np.arange(0, (size + 1) / 0.1, 1 / fs)
+        ta, amp = m.StdFrc(fs=fs, total_pulses=size, rng=0).get_frc()
+        assert len(ta) == len(amp) == int(times[-1] * 0.1)
+        assert np.all(np.diff(ta) >= 0)
+        assert 0 <= ta[0] and ta[-1] <= times[-1]
+    f = m.StdFrc(total_pulses=20000, rng=1)
+    ta, amp = f.get_frc()
+    assert scp_stats.kstest(ta / f.duration, "uniform").pvalue > 0.01  # noqa: PLR2004
+    assert scp_stats.kstest(amp, "lomax", args=(1.8,)).pvalue > 0.01  # noqa: PLR2004
+
+
+def test_hawkes_frc() -> None:
+    """Tests that HawkesFrc gives clustered arrival times with the expected rate."""
+    for kw in (
+        {"branching": 1},
+        {"kernel": "gauss"},
+        {"scale": 0},
+        {"total_pulses": 0},
+    ):
+        with pytest.raises(ValueError):
+            m.HawkesFrc(**kw)
+    # Without triggered eruptions, it is a Poisson process
+    ta, amp = m.HawkesFrc(total_pulses=20000, branching=0, rng=0).get_frc()
+    assert len(ta) == len(amp) == 20000  # noqa: PLR2004
+    assert scp_stats.kstest(np.diff(ta) * 0.1, "expon").pvalue > 0.01  # noqa: PLR2004
+    assert scp_stats.kstest(amp, "lomax", args=(1.8,)).pvalue > 0.01  # noqa: PLR2004
+    for kernel in m.KERNELS:
+        f = m.HawkesFrc(total_pulses=20000, branching=0.8, kernel=kernel, rng=1)
+        ta, _ = f.get_frc()
+        assert np.all(np.diff(ta) >= 0)
+        # The mean rate is gamma / (1 - branching)
+        assert np.isclose(len(ta) / ta[-1], 0.5, rtol=0.15)
+        # Clustered gaps vary more than the exponential gaps of a Poisson process
+        gaps = np.diff(ta)
+        assert gaps.std() / gaps.mean() > 1.5  # noqa: PLR2004
+
+
+def test_iter_fpp() -> None:
+    """Tests that the chunked forcing is the same as when made in one piece."""
+    fs, size = 12, 300
+    rng = np.random.default_rng(2)
+    times = np.arange(0, size, 1 / fs)
+    ta = np.sort(rng.uniform(0, times[-1], 40))
+    amp = rng.random(40)
+    model = superposedpulses.PointModel(gamma=0.1, total_duration=size, dt=1 / fs)
+    model.set_custom_forcing_generator(m._forcing_generator(rng))
+    expected = np.zeros(len(times))
+    for pulse in zip(ta, amp, np.ones(40)):
+        model._add_pulse_to_signal(expected, PulseParameters(*pulse))
+
+    def draw(a: float, b: float) -> tuple[np.ndarray, np.ndarray]:
+        mask = (ta >= a) & (ta < b)
+        return ta[mask], amp[mask]
+
+    for chunk in (1, 7, 500, len(times)):
+        t, f = map(
+            np.concatenate, zip(*m._chunked_signal(draw, len(times), 1 / fs, chunk))
+        )
+        assert np.allclose(t, times)
+        assert np.allclose(f, expected, rtol=1e-12, atol=0)
+    with pytest.raises(ValueError):
+        next(m.Frc(size=10).iter_fpp(chunk=0))
+    t, f = map(np.concatenate, zip(*m.Frc(fs=fs, size=size, rng=3).iter_fpp(100)))
+    assert np.allclose(t, times)
+    assert np.all(f >= 0)
+
+
+def test_iter_fpp_memory() -> None:
+    """Tests that the memory of the chunked forcing does not grow with the pulses."""
+    chunk = 2**12
+    # Hourly samples, where a pulse takes many chunks to decay, with many pulses
+    frc = m.Frc(fs=365 * 24, size=20, rng=1)
+    frc.gamma = 50
+    tracemalloc.start()
+    try:
+        n_times = sum(len(f) for _, f in frc.iter_fpp(chunk))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert n_times == 20 * 365 * 24
+    assert peak < 32 * chunk * 8  # noqa: PLR2004
+
+
 if __name__ == "__main__":
     test_frc_class_method()
     test_output()
+    test_seed()
+    test_std_frc_statistics()
+    test_iter_fpp()
+    test_iter_fpp_memory()
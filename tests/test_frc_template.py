@@ -0,0 +1,67 @@
+"""Test cases for the frc_template module."""
+
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+from click.testing import CliRunner
+from volcano_cooking.modules import create
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces.
+
+    Returns
+    -------
+    CliRunner
+        Runner for creating isolated file  system.
+    """
+    return CliRunner()
+
+
+def _make_original(file: str, title: str) -> None:
+    ds = xr.Dataset(
+        {
+            "stratvolc": (
+                ("time", "altitude"),
+                np.ones((4, 3), dtype=np.float32),
+                {"units": "molecules/cm3/s"},
+            ),
+            "date": ("time", np.arange(4, dtype=np.int32)),
+        },
+        coords={"altitude": np.arange(3.0)},
+        attrs={"title": title},
+    )
+    ds.to_netcdf(file, unlimited_dims=["time"])
+
+
+def test_load_template(runner: CliRunner) -> None:
+    """Test that the template is cached and only re-made when the original changes.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        file = "original.nc"
+        assert not create.has_template(file)
+        with pytest.raises(FileNotFoundError):
+            create.load_template(file)
+        _make_original(file, "first")
+        template = create.load_template(file)
+        assert os.path.isfile(create.template_path(file))
+        assert template.sizes["time"] == 0
+        assert template.sizes["altitude"] == 3  # noqa: PLR2004
+        assert template.stratvolc.attrs["units"] == "molecules/cm3/s"
+        assert template.attrs == {"title": "first"}
+        # The original is changed, so the sidecar must be re-made
+        os.remove(file)
+        _make_original(file, "second")
+        assert create.load_template(file).attrs["title"] == "second"
+        # Without the original, the sidecar is used
+        os.remove(file)
+        assert create.has_template(file)
+        assert create.load_template(file).attrs["title"] == "second"
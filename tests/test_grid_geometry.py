@@ -0,0 +1,68 @@
+"""Test cases for the grid_geometry module."""
+
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+from click.testing import CliRunner
+from volcano_cooking.modules import convert
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces.
+
+    Returns
+    -------
+    CliRunner
+        Runner for creating isolated file  system.
+    """
+    return CliRunner()
+
+
+def test_grid_geometry(runner: CliRunner) -> None:
+    """Test the column areas, nearest column lookup and caching of the grid geometry.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        with pytest.raises(FileNotFoundError):
+            convert.grid_geometry("1deg")
+        os.makedirs(os.path.join("data", "originals"))
+        file = os.path.join("data", "originals", "fv_1.9x2.5_L30.nc")
+        lat = np.linspace(-90.0, 90.0, 96)
+        lon = np.arange(0.0, 360.0, 2.5)
+        grid = xr.Dataset(
+            {"gw": ("lat", np.cos(np.deg2rad(lat)))},
+            coords={
+                "lat": ("lat", lat, {"units": "degrees_north"}),
+                "lon": ("lon", lon, {"units": "degrees_east"}),
+            },
+        )
+        grid.to_netcdf(file)
+        geometry = convert.grid_geometry("2deg")
+        assert os.path.isfile(
+            os.path.join("data", "originals", "fv_1.9x2.5_L30_geometry.npz")
+        )
+        assert convert.GridGeometry.from_file(file) is geometry
+        assert geometry.lat_attrs == {"units": "degrees_north"}
+        assert np.isclose(
+            np.sum(geometry.column_area) * len(lon), 4 * np.pi * 6.37122e8**2
+        )
+        rng = np.random.default_rng(2)
+        # Longitudes east of the last grid longitude and outside [0, 360) wrap around
+        edge = [358.75, 359.0, 359.9, 360.0, -0.1, -181.0, 540.0, 718.76]
+        lats = np.append(rng.uniform(-90, 90, 500), np.resize(lat[:3], 3 + len(edge)))
+        lons = np.concatenate((rng.uniform(0, 360, 500), lon[:3] + 1.25, edge))
+        lat_idx, lon_idx = geometry.nearest(lats, lons)
+        assert np.array_equal(lat_idx, np.abs(lats[:, None] - lat).argmin(axis=1))
+        dist = np.mod(lons[:, None] - lon, 360)
+        dist = np.minimum(dist, 360 - dist)
+        assert np.array_equal(lon_idx, dist.argmin(axis=1))
+        assert np.array_equal(lon_idx[-len(edge) :], [0, 0, 0, 0, 0, 72, 72, 0])
+        with pytest.raises(ValueError, match="resolution"):
+            convert.grid_geometry("3deg")
@@ -0,0 +1,70 @@
+"""Test that the command line entry points start without heavy dependencies."""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = (
+    "xarray",
+    "scipy",
+    "matplotlib",
+    "superposedpulses",
+    "cftime",
+    "netCDF4",
+    "pandas",
+)
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "volcano_cooking.__main__",
+        "volcano_cooking.view_force",
+        "volcano_cooking.sparse_to_lin",
+        "volcano_cooking.verify_frc",
+    ],
+)
+def test_import_time(module: str) -> None:
+    """Test that an entry point imports fast, and without the heavy dependencies.
+
+    Parameters
+    ----------
+    module : str
+        The module of the entry point.
+    """
+    code = (
+        f"import sys, {module}; "
+        + f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert out.stdout.strip() == ""
+    cumulative = [
+        int(line.split("|")[1])
+        for line in out.stderr.splitlines()
+        if line.split("|")[-1].strip() == module
+    ]
+    # Generous budget in µs, the heavy dependencies alone take several times longer.
+    assert cumulative[0] < 500_000  # noqa: PLR2004
+
+
+def test_list_generators() -> None:
+    """Test that listing the generators does not import them."""
+    code = (
+        "import sys; from volcano_cooking import synthetic_volcanoes as sv; "
+        + "print([sv.__GENERATORS__.name(k) for k in sv.__GENERATORS__]); "
+        + "print('volcano_cooking.modules.create.create_data' in sys.modules); "
+        + "print(sv.__GENERATORS__[1].__name__)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    names, imported, fpp = out.stdout.splitlines()
+    assert "GenerateFPP" in names
+    assert imported == "False"
+    assert fpp == "GenerateFPP"
@@ -0,0 +1,108 @@
+"""Test cases for the patch_cesm_frc module."""
+
+import glob
+import os
+
+import netCDF4
+import numpy as np
+import pytest
+import xarray as xr
+from click.testing import CliRunner
+from volcano_cooking.modules import create
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces.
+
+    Returns
+    -------
+    CliRunner
+        Runner for creating isolated file  system.
+    """
+    return CliRunner()
+
+
+def _make_catalogue(file: str, dates: list[tuple[int, int, int]]) -> str:
+    size = len(dates)
+    rng = np.random.default_rng(1)
+    tops = rng.uniform(16, 25, size).astype(np.float32)
+    ds = create.Data(
+        np.ones(size, dtype=np.int8),
+        np.array([d[0] for d in dates], dtype=np.int16),
+        np.array([d[1] for d in dates], dtype=np.int8),
+        np.array([d[2] for d in dates], dtype=np.int8),
+        rng.uniform(-60, 60, size).astype(np.float32),
+        rng.uniform(-180, 180, size).astype(np.float32),
+        rng.uniform(0.1, 2, size).astype(np.float32),
+        np.full(size, 4, dtype=np.int8),
+        tops - 2,
+        tops,
+    )
+    ds.make_dataset()
+    ds.my_frc.to_netcdf(file)
+    return file
+
+
+def _frc(in_file: str, out_dir: str, out_format: str = "cdf5") -> str:
+    frc = create.CesmFrc(in_file, "coords.nc")
+    frc.make_dataset()
+    return frc.save_to_file(out_dir, out_format=out_format)
+
+
+def test_patch(runner: CliRunner) -> None:
+    """Test that a patched file is the same as a file made from scratch.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    dates = [(1850, 1, 15), (1853, 6, 20), (1860, 2, 5), (1861, 7, 7), (1870, 1, 1)]
+    edits = {
+        # Moved to a new date, the number of records is the same
+        "move": [dates[0], (1858, 3, 3), *dates[2:]],
+        # Moved past other eruptions, which move towards the start of the file
+        "later": [dates[0], *dates[2:4], (1865, 1, 1), dates[4]],
+        # Moved to the date of another eruption, four records are removed
+        "merge": [dates[0], dates[2], *dates[2:]],
+        # Added at a new date, four records are inserted
+        "add": [*dates[:3], (1860, 12, 24), *dates[3:]],
+    }
+    with runner.isolated_filesystem():
+        lat = np.linspace(-67.5, 67.5, 4)
+        xr.Dataset(
+            {"gw": ("lat", np.cos(np.deg2rad(lat)))},
+            coords={"lat": lat, "lon": np.arange(0.0, 360.0, 45.0)},
+        ).to_netcdf("coords.nc")
+        old_file = _make_catalogue("old.nc", dates)
+        for name, new_dates in edits.items():
+            new_file = _make_catalogue(f"{name}.nc", new_dates)
+            # Eruptions at unchanged dates must be identical in both catalogues
+            with xr.open_dataset(old_file) as o, xr.open_dataset(new_file) as ds:
+                keep = [new_dates.index(d) for d in dates if d in new_dates]
+                n = ds.load()
+                for var in n.data_vars:
+                    n[var][keep] = o[var][[dates.index(new_dates[k]) for k in keep]]
+            n.to_netcdf(new_file)
+            for out_format in ("cdf5", "zlib"):
+                frc_file = _frc(old_file, os.path.join(name, out_format), out_format)
+                expected = _frc(new_file, "expected", out_format)
+                n_records = create.patch_cesm_frc(
+                    frc_file, old_file, new_file, coords_file="coords.nc"
+                )
+                assert n_records == 4  # noqa: PLR2004
+                with netCDF4.Dataset(frc_file) as f, netCDF4.Dataset(expected) as e:
+                    assert f.data_model == e.data_model
+                    assert f["stratvolc"].filters() == e["stratvolc"].filters()
+                    assert f.data_summary == e.data_summary
+                    for var in ("date", "datesec", "stratvolc"):
+                        assert np.array_equal(f[var][:], e[var][:])
+                os.remove(expected)
+        with pytest.raises(ValueError):
+            create.patch_cesm_frc(frc_file, old_file, old_file, coords_file="coords.nc")
+        with pytest.raises(FileNotFoundError):
+            create.patch_cesm_frc(
+                "nope.nc", old_file, old_file, coords_file="coords.nc"
+            )
+        assert not glob.glob(os.path.join("*", "*", "*.patch"))
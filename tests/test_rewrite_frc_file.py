@@ -1,12 +1,15 @@
 """Test cases for the compare_datasets module."""
 
+import glob
 import os
+from typing import Callable
 
 import numpy as np
 import pytest
 import xarray as xr
 from click.testing import CliRunner
 from volcano_cooking import synthetic_volcanoes
+from volcano_cooking.modules import create
 
 
 @pytest.fixture
@@ -57,32 +60,66 @@ def test_forcing_file_indexes(runner: CliRunner) -> None:
             synthetic_volcanoes.create_volcanoes(version=2, option=1)
 
 
-# TODO: Add test for actually creating new, rewritten file.
-# def test_create_volcaoes(runner: CliRunner) -> None:
-#     """Test to see if files are created as expected.
-#
-#     Parameters
-#     ----------
-#     runner: CliRunner
-#         Runner for creating isolated file  system.
-#     """
-#     with runner.isolated_filesystem():
-#         # Create fake source data set
-#         os.mkdir("data")
-#         os.mkdir(os.path.join("data", "originals"))
-#         file = os.path.join(
-#             "data",
-#             "originals",
-#             "VolcanEESMv3.11_SO2_850-2016_Mscale_Zreduc_2deg_c191125.nc",
-#         )
-#         ds1 = xr.Dataset({"a": (["x", "y"], np.ones((2, 2)))})
-#         ds1.to_netcdf(file)
-#         d = os.path.join("data", "output")
-#         now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-#         out_npz = os.path.join(os.getcwd(), d, f"synthetic_volcanoes_{now}.npz")
-#         out_nc = os.path.join(os.getcwd(), d, f"synthetic_volcanoes_{now}.nc")
-#         synthetic_volcanoes.create_volcanoes(version=2, option=1)
-#         assert os.path.isfile(out_nc)
-#         assert os.path.isfile(out_npz)
-#         os.remove(out_nc)
-#         os.remove(out_npz)
+def test_rewrite_sparse(runner: CliRunner, make_originals: Callable[[], None]) -> None:
+    """Test that the re-written file is made from the sparse representation.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    make_originals : Callable[[], None]
+        Creates stand-ins for the files in `data/originals`.
+    """
+    with runner.isolated_filesystem():
+        make_originals()
+        g = create.GenerateRandomNormal(50, 1850)
+        g.generate()
+        frc = create.ReWrite(*g.get_arrays())
+        frc.make_dataset()
+        sparse = frc.sparse_frc
+        size = len(frc.yoes)
+        assert sparse.shape == (size, 30, 5, 8)
+        # Only a few altitude levels in a single column are stored for each eruption
+        assert len(sparse.value) <= size * 30
+        assert sparse.nbytes < np.prod(sparse.shape) * 4
+        dense = sparse.dense(0, size)
+        assert np.array_equal(sparse[3:7, 2], dense[3:7, 2])
+        assert np.array_equal(sparse[-1], dense[-1])
+        assert np.count_nonzero(dense.sum(axis=(0, 1))) == 1
+        frc.save_to_file()
+        out_file = glob.glob(os.path.join("data", "output", "VolcanEESM*.nc"))[0]
+        with xr.open_dataset(out_file, decode_times=False) as f:
+            assert np.array_equal(f.stratvolc.data, dense)
+            assert len(f.date) == size
+
+
+def test_rewrite_lat_lon(runner: CliRunner, make_originals: Callable[[], None]) -> None:
+    """Test that each eruption is placed in the grid column closest to it.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    make_originals : Callable[[], None]
+        Creates stand-ins for the files in `data/originals`.
+    """
+    with runner.isolated_filesystem():
+        make_originals()
+        g = create.GenerateRandomNormal(20, 1850)
+        g.generate()
+        arrays = list(g.get_arrays())
+        size = len(arrays[0])
+        rng = np.random.default_rng(3)
+        arrays[4] = rng.uniform(-90, 90, size).astype(np.float32)
+        arrays[5] = rng.uniform(-180, 180, size).astype(np.float32)
+        frc = create.ReWrite(*arrays)
+        frc.make_dataset()
+        lat = np.linspace(-72.0, 72.0, 5)
+        lon = np.linspace(0.0, 360.0, 8, endpoint=False)
+        dist = np.mod(arrays[5][:, None] - lon, 360)
+        dist = np.minimum(dist, 360 - dist)
+        dense = frc.sparse_frc.dense(0, size)
+        for i in range(size):
+            col = np.nonzero(dense[i].sum(axis=0))
+            assert col[0] == [np.abs(arrays[4][i] - lat).argmin()]
+            assert col[1] == [dist[i].argmin()]
@@ -3,10 +3,14 @@
 import glob
 import json
 import os
+from typing import Callable
 
+import numpy as np
 import pytest
+import xarray as xr
 from click.testing import CliRunner
 from volcano_cooking import synthetic_volcanoes
+from volcano_cooking.modules import create
 
 
 @pytest.fixture
@@ -21,18 +25,23 @@ def runner() -> CliRunner:
     return CliRunner()
 
 
-def test_create_volcaoes(runner: CliRunner) -> None:
+def test_create_volcaoes(
+    runner: CliRunner, write_catalogue: Callable[..., xr.Dataset]
+) -> None:
     """Test to see if files are created as expected.
 
     Parameters
     ----------
     runner : CliRunner
         Runner for creating isolated file  system.
+    write_catalogue : Callable[..., xr.Dataset]
+        Writes a catalogue in place of the VolcanEESM database.
     """
     data = {"dates": ["1850-01-17", "1860-01-01"], "emissions": ["400", "400"]}
     with runner.isolated_filesystem():
         with open("new_file.json", "w") as f:
             json.dump(data, f, indent=2)
+        write_catalogue()
         r = len(synthetic_volcanoes.__GENERATORS__)
         from_file_generator_index = 4
         for v in range(r):
@@ -47,3 +56,45 @@ def test_create_volcaoes(runner: CliRunner) -> None:
             assert os.path.isfile(created_npz)
             os.remove(created_nc)
             os.remove(created_npz)
+
+
+def test_create_ensemble(runner: CliRunner) -> None:
+    """Test that ensemble members are reproducible and saved to their own files.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        ens = synthetic_volcanoes.create_ensemble(4, size=30, seed=7)
+        files = sorted(glob.glob(os.path.join("data", "output", "*.nc")))
+        assert len(files) == 4  # noqa: PLR2004
+        for i, f in enumerate(files):
+            assert os.path.basename(f).startswith(f"synthetic_volcanoes_m{i}_s7_")
+        stacked = ens.stacked()
+        assert stacked[1].shape == (4, 30)
+        # Members only depend on the seed and their index
+        ens_2 = create.Ensemble(
+            synthetic_volcanoes.__GENERATORS__[0], 2, 30, 1850, seed=7
+        )
+        ens_2.generate()
+        for a, b in zip(ens.member(1), ens_2.member(1)):
+            assert np.array_equal(a, b)
+        assert not np.array_equal(ens.member(0)[1], ens.member(1)[1])
+        fpp = create.Ensemble(
+            synthetic_volcanoes.__GENERATORS__[1], 3, 20, 1850, seed=1
+        )
+        fpp.generate()
+        assert len(fpp.arrays[0]) == fpp.ptr[-1]
+        assert len(fpp.member(2)[0]) == fpp.ptr[3] - fpp.ptr[2]
+        # The members do not depend on the number of processes
+        fpp_2 = create.Ensemble(
+            synthetic_volcanoes.__GENERATORS__[1], 3, 20, 1850, seed=1
+        )
+        fpp_2.generate(workers=2)
+        assert np.array_equal(fpp.ptr, fpp_2.ptr)
+        for a, b in zip(fpp.arrays, fpp_2.arrays):
+            assert np.array_equal(a, b)
+    with pytest.raises(ValueError, match="members = 0, but"):
+        create.Ensemble(synthetic_volcanoes.__GENERATORS__[0], 0, 30, 1850)
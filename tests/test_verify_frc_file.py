@@ -0,0 +1,126 @@
+"""Test cases for the verify_frc_file module."""
+
+import glob
+import os
+from typing import Callable
+
+import netCDF4
+import numpy as np
+import pytest
+import xarray as xr
+from click.testing import CliRunner
+from volcano_cooking import verify_frc
+from volcano_cooking.modules import create
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces.
+
+    Returns
+    -------
+    CliRunner
+        Runner for creating isolated file  system.
+    """
+    return CliRunner()
+
+
+def test_verify(runner: CliRunner) -> None:
+    """Test that mass mismatches are found at the right dates.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    with runner.isolated_filesystem():
+        lat = np.linspace(-88.75, 88.75, 72)
+        xr.Dataset(
+            {"gw": ("lat", np.cos(np.deg2rad(lat)))},
+            coords={"lat": lat, "lon": np.arange(0.0, 360.0, 5.0)},
+        ).to_netcdf("coords.nc")
+        size = 6
+        rng = np.random.default_rng(2)
+        tops = rng.uniform(16, 25, size).astype(np.float32)
+        data = create.Data(
+            np.ones(size, dtype=np.int8),
+            np.array([1850, 1850, 1852, 1852, 1900, 2020], dtype=np.int16),
+            np.array([1, 1, 3, 4, 5, 6], dtype=np.int8),
+            np.array([2, 2, 3, 4, 5, 6], dtype=np.int8),
+            rng.uniform(-60, 60, size).astype(np.float32),
+            rng.uniform(-180, 180, size).astype(np.float32),
+            np.array([1.0, 2.0, 20.0, 0.5, 3.0, 1.0], dtype=np.float32),
+            np.array([4, 5, 6, 4, 6, 4], dtype=np.int8),
+            tops - 3,
+            tops,
+        )
+        data.make_dataset()
+        data.my_frc.to_netcdf("catalogue.nc")
+        frc = create.CesmFrc("catalogue.nc", "coords.nc", vei_spread=True)
+        frc.make_dataset()
+        out_file = frc.save_to_file()
+        dates, _, _ = create.verify_frc(
+            out_file, "catalogue.nc", coords_file="coords.nc", last_year=2016
+        )
+        assert len(dates) == 0
+        # The eruption after the last year is missing, and the one above 15 Tg is off
+        dates, expected, found = create.verify_frc(
+            out_file, "catalogue.nc", coords_file="coords.nc", mass_scaling=True
+        )
+        assert np.array_equal(dates, [18520303, 20200606])
+        assert np.allclose(expected, [20 / 1.8, 1.0])
+        assert np.allclose(found, [20, 0.0])
+        # Double one of the two non-zero records of the second date
+        with netCDF4.Dataset(out_file, "a") as f:
+            f["stratvolc"][6] = 2 * f["stratvolc"][6]
+        args = [out_file, "catalogue.nc", "--coords-file", "coords.nc"]
+        result = runner.invoke(verify_frc.main, args)
+        assert result.exit_code != 0
+        assert "18520303   2.00000e+01  3.000e+01  1.500000" in result.output
+        assert "18500102" not in result.output
+        lat = np.linspace(-80, 80, 4)
+        xr.Dataset(
+            {"gw": ("lat", np.cos(np.deg2rad(lat)))},
+            coords={"lat": lat, "lon": np.arange(0.0, 360.0, 90.0)},
+        ).to_netcdf("small.nc")
+        with pytest.raises(IndexError):
+            create.frc_mass(out_file, "small.nc")
+
+
+def test_verify_rewrite(runner: CliRunner, make_originals: Callable[[], None]) -> None:
+    """Test that forcing files made by `ReWrite` conserve the mass of the catalogue.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    make_originals : Callable[[], None]
+        Creates stand-ins for the files in `data/originals`.
+    """
+    with runner.isolated_filesystem():
+        make_originals()
+        g = create.GenerateRandomNormal(20, 1850, rng=1)
+        g.generate()
+        data = create.Data(*g.get_arrays())
+        data.make_dataset()
+        data.save_to_file()
+        frc = create.ReWrite(*g.get_arrays())
+        frc.make_dataset()
+        frc.save_to_file()
+        in_file = glob.glob(os.path.join("data", "output", "synthetic*.nc"))[0]
+        out_file = glob.glob(os.path.join("data", "output", "VolcanEESM*.nc"))[0]
+        with netCDF4.Dataset(out_file) as f:
+            assert np.issubdtype(f["date"].dtype, np.integer)
+            expected_dates = (
+                10000 * g.yoes.astype(int) + 100 * g.moes.astype(int) + g.does
+            )
+            assert np.array_equal(f["date"][:], expected_dates)
+        coords = os.path.join("data", "originals", "fv_1.9x2.5_L30.nc")
+        dates, _, _ = create.verify_frc(
+            out_file, in_file, coords_file=coords, mass_scaling=True
+        )
+        assert len(dates) == 0
+        # Without the mass scaling, only the eruptions above 15 Tg do not match
+        dates, _, _ = create.verify_frc(out_file, in_file, coords_file=coords)
+        big = g.tes >= 15  # noqa: PLR2004
+        assert len(dates) == len(np.unique(expected_dates[big]))
@@ -1,9 +1,11 @@
 """Test cases for module view_force."""
 
 import json
+from typing import Callable
 from unittest.mock import MagicMock, patch
 
 import pytest
+import xarray as xr
 from click.testing import CliRunner
 from volcano_cooking import synthetic_volcanoes, view_force
 
@@ -21,7 +23,9 @@ def runner() -> CliRunner:
 
 
 @patch("matplotlib.pyplot.figure")
-def test_main_succeeds(mock_fig: MagicMock, runner: CliRunner) -> None:
+def test_main_succeeds(
+    mock_fig: MagicMock, runner: CliRunner, write_catalogue: Callable[..., xr.Dataset]
+) -> None:
     """It exits with a status code of zero.
 
     Parameters
@@ -30,6 +34,8 @@ def test_main_succeeds(mock_fig: MagicMock, runner: CliRunner) -> None:
         Suppress call to plt.show().
     runner : CliRunner
         Runner for creating isolated file systems.
+    write_catalogue : Callable[..., xr.Dataset]
+        Writes a catalogue in place of the VolcanEESM database.
     """
     r = len(synthetic_volcanoes.__GENERATORS__)
     data = {"dates": ["1850-01-17", "1860-01-01"], "emissions": ["400", "400"]}
@@ -39,6 +45,7 @@ def test_main_succeeds(mock_fig: MagicMock, runner: CliRunner) -> None:
         with runner.isolated_filesystem():
             with open("new_file.json", "w") as f:
                 json.dump(data, f, indent=2)
+            write_catalogue()
             synthetic_volcanoes.create_volcanoes(version=v, file=file)
             result = runner.invoke(view_force.main)
             mock_fig.assert_called()
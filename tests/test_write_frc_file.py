@@ -0,0 +1,113 @@
+"""Test cases for the write_frc_file module."""
+
+import netCDF4
+import numpy as np
+import pytest
+import xarray as xr
+from click.testing import CliRunner
+from volcano_cooking.modules import create
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces.
+
+    Returns
+    -------
+    CliRunner
+        Runner for creating isolated file  system.
+    """
+    return CliRunner()
+
+
+def test_append_blocks(runner: CliRunner) -> None:
+    """Test that blocks are appended along the unlimited time dimension.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    template = xr.Dataset(
+        {
+            "frc": (("time", "lat"), np.empty((0, 3), dtype=np.float32)),
+            "date": ("time", np.empty(0, dtype=np.int32), {"units": "YYYYMMDD"}),
+        },
+        coords={"lat": ("lat", np.array([-45.0, 0.0, 45.0]))},
+        attrs={"title": "test"},
+    )
+    frc = np.arange(15, dtype=np.float32).reshape(5, 3)
+    with runner.isolated_filesystem():
+        encoding = {"frc": {"_FillValue": -1.0}}
+        with create.FrcWriter("out.nc", template, encoding=encoding) as w:
+            assert w.block_size > 5  # noqa: PLR2004
+            w.append(frc=frc[:2], date=np.array([1, 2]))
+            w.append(frc=frc[2:], date=np.array([3, 4, 5]))
+            with pytest.raises(ValueError):
+                w.append(frc=frc[:1])
+            with pytest.raises(ValueError):
+                w.append(frc=frc[:1], date=np.array([1, 2]))
+        with netCDF4.Dataset("out.nc") as f:
+            assert f.data_model == "NETCDF3_64BIT_OFFSET"
+            assert f.dimensions["time"].isunlimited()
+            assert f.title == "test"
+            assert f["date"].units == "YYYYMMDD"
+            assert f["frc"]._FillValue == -1.0
+            assert np.array_equal(f["frc"][:], frc)
+            assert np.array_equal(f["date"][:], np.arange(1, 6))
+            assert np.array_equal(f["lat"][:], template.lat.data)
+
+
+def _block(state: dict, b0: int, b1: int, out: np.ndarray) -> None:
+    out[:] = state["x"][b0:b1] * 2
+
+
+def test_map_blocks() -> None:
+    """Test that blocks made by worker processes come in order."""
+    x = np.arange(100.0).reshape(50, 2)
+    bounds = [(b0, min(b0 + 7, 50)) for b0 in range(0, 50, 7)]
+    for workers in (1, 3):
+        blocks = create.map_blocks(
+            _block,
+            {"x": x},
+            bounds,
+            lambda b0, b1: (b1 - b0, 2),
+            dtype=np.float64,
+            workers=workers,
+        )
+        assert np.array_equal(np.concatenate([b.copy() for b in blocks]), 2 * x)
+
+
+def test_frc_encoding(runner: CliRunner) -> None:
+    """Test that each output format can be written and read back.
+
+    Parameters
+    ----------
+    runner : CliRunner
+        Runner for creating isolated file  system.
+    """
+    template = xr.Dataset(
+        {"stratvolc": (("time", "lat"), np.empty((0, 3), dtype=np.float32))}
+    )
+    frc = np.random.default_rng(0).uniform(0, 1e3, (4, 3)).astype(np.float32)
+    with runner.isolated_filesystem():
+        for out_format in create.FRC_FORMATS:
+            nc_format, enc = create.frc_encoding(out_format, (3,), vmax=1e3)
+            with create.FrcWriter(
+                "out.nc", template, format=nc_format, encoding={"stratvolc": enc}
+            ) as w:
+                w.append(stratvolc=frc)
+            with netCDF4.Dataset("out.nc") as f:
+                assert f.data_model == nc_format
+                back = f["stratvolc"][:]
+                if out_format == "packed":
+                    assert f["stratvolc"].dtype == np.int16
+                    assert np.allclose(back, frc, rtol=0, atol=1e3 / 2**15)
+                elif out_format == "quantized":
+                    assert np.allclose(back, frc, rtol=1e-3)
+                else:
+                    assert np.array_equal(back, frc)
+        with pytest.raises(ValueError):
+            create.frc_encoding("netcdf5", (3,))
+        with pytest.raises(ValueError):
+            create.frc_encoding("packed", (3,))